@@ -7,6 +7,8 @@ import db.schema
 import db.globals
 from db.init import init_db
 import db.payee
+import db.transaction
+import util
 
 import init_logging
 
@@ -32,17 +34,24 @@ async def create_payees(session):
 
 async def create_transactions(session, account_id, payee_ids):
     idx = 0
+    external_ids = []
     for t in transactions:
         rec = db.schema.Transaction(
-            id=str(uuid.uuid4()),
+            external_id=str(uuid.uuid4()),
             date=datetime.date.fromisoformat(t['date']),
-            amount=t['amount'],
+            amount=util.to_minor_units(t['amount']),
             account_id=account_id,
             payee_id=payee_ids[idx])
         session.add(rec)
+        external_ids.append(rec.external_id)
         idx += 1
         idx = idx % len(payee_ids)
 
+    # the transactions belong to their payee's subcategory (as in the sync)
+    await session.flush()
+    await db.transaction.update_effective_subcategory_ids(
+        session, db.schema.Transaction.external_id.in_(external_ids))
+
     await session.commit()
 
 
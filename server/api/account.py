@@ -3,6 +3,7 @@ from enum import Enum
 import strawberry
 from strawberry.types.info import Info
 import db.schema
+from api.public_id import encode_id, decode_id, ACCOUNT
 from api.transaction import Transaction
 from crypto import Crypto
 
@@ -22,12 +23,13 @@ class Account:
 
     @strawberry.field
     async def transactions(self, info: Info) -> List["Transaction"]:
-        transactions = await info.context.dataloaders["transactions_by_account_id"].load(self.id)
+        transactions = await info.context.dataloaders["transactions_by_account_id"].load(
+            decode_id(ACCOUNT, self.id))
         return [Transaction.from_db(t) for t in transactions]
 
     @staticmethod
     def from_db(obj: db.schema.Account) -> "Account":
-        return Account(id=strawberry.ID(str(obj.id)),
+        return Account(id=encode_id(ACCOUNT, obj.id),
                        name=obj.name,
                        source=obj.source.value,
                        username=Crypto().decrypt(obj.username))
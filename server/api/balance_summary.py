@@ -1,6 +1,7 @@
 from typing import List
 import strawberry
 from api.summary import Summary
+from api.summary_options import SummaryGroupBy
 import summarize.balance_summary
 
 
@@ -14,10 +15,11 @@ class BalanceSummary:
     savings_total_percentage: int
 
     @staticmethod
-    def from_db(obj: summarize.balance_summary.BalanceSummary) -> "BalanceSummary":
+    def from_db(obj: summarize.balance_summary.BalanceSummary,
+                group_by: SummaryGroupBy) -> "BalanceSummary":
         return BalanceSummary(
-            income=Summary.from_db(obj.income),
-            expenses=Summary.from_db(obj.expenses),
+            income=Summary.from_db(obj.income, group_by),
+            expenses=Summary.from_db(obj.expenses, group_by),
             savings=obj.savings,
             savings_total=obj.savings_total,
             savings_percentages=obj.savings_percentages,
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Annotated, List
 import strawberry
 from strawberry.types.info import Info
 import db.schema
+from api.public_id import encode_id, decode_id, CATEGORY
 import api
 
 if TYPE_CHECKING:
@@ -19,13 +20,14 @@ class Category:
     @strawberry.field
     async def subcategories(self, info: Info) \
             -> List[Annotated["Subcategory", strawberry.lazy("api.subcategory")]]:
-        subcategories = await info.context.dataloaders["subcategories_by_category_id"].load(self.id)
+        subcategories = await info.context.dataloaders["subcategories_by_category_id"].load(
+            decode_id(CATEGORY, self.id))
         return [api.subcategory.Subcategory.from_db(s) for s in subcategories]
 
     @staticmethod
     def from_db(obj: db.schema.Category) -> "Category":
         return Category(
-            id=strawberry.ID(str(obj.id)),
+            id=encode_id(CATEGORY, obj.id),
             name=obj.name,
             is_expense=obj.is_expense,
             order=obj.order,
@@ -45,8 +45,8 @@ def _build_id_fn(class_: DbTableClass):
     """ return a dataloader function for getting all objects of
     the given class by the given list of IDs """
 
-    async def get_by_ids(ids: List[str]) -> List[class_]:
-        async with db.globals.session_maker() as session:
+    async def get_by_ids(ids: List[int]) -> List[class_]:
+        async with db.globals.reader_session_maker() as session:
             sql = select(class_).where(class_.id.in_(ids))
             res = await session.execute(sql)
             recs = res.scalars().all()
@@ -64,9 +64,9 @@ def _build_column_fn(class_: DbTableClass, column_name: str):
     """ return a dataloader function for getting all objects of
     the given class whose column value is in the given list of values """
 
-    async def get_by_column(values: List[str]) -> List[class_]:
+    async def get_by_column(values: List[int]) -> List[class_]:
         column = getattr(class_, column_name)
-        async with db.globals.session_maker() as session:
+        async with db.globals.reader_session_maker() as session:
             sql = select(class_).where(column.in_(values))
             res = await session.execute(sql)
             recs = res.scalars().all()
@@ -8,6 +8,7 @@ from api.payee import Payee
 from api.update_payee_input import UpdatePayeeInput
 from api.transaction import Transaction
 from api.count import Count
+from api.public_id import encode_id, decode_id, ACCOUNT, CATEGORY, SUBCATEGORY, PAYEE, TRANSACTION
 import db.globals
 import db.category
 import db.subcategory
@@ -15,6 +16,8 @@ import db.payee
 import db.account
 import db.transaction
 import db.schema
+import db.data_version
+import summarize.summary_warm_up
 
 # ---------------------------------------------------------------
 # account
@@ -32,6 +35,7 @@ async def create_account(
             source=db.schema.AccountSource(source.value),
             username=username,
             password=password)
+        await db.data_version.bump_data_version(session)
         return Account.from_db(rec)
 
 
@@ -45,17 +49,19 @@ async def update_account(
     async with db.globals.session_maker() as session:
         rec = await db.account.update_account(
             session=session,
-            account_id=account_id,
+            account_id=decode_id(ACCOUNT, account_id),
             name=name,
             source=db.schema.AccountSource(source.value),
             username=username,
             password=password)
+        await db.data_version.bump_data_version(session)
         return Account.from_db(rec)
 
 
 async def delete_account(account_id: strawberry.ID) -> Count:
     async with db.globals.session_maker() as session:
-        count = await db.account.delete_account(session, account_id)
+        count = await db.account.delete_account(session, decode_id(ACCOUNT, account_id))
+        await db.data_version.bump_data_version(session)
         return Count(count=count)
 
 # ---------------------------------------------------------------
@@ -72,6 +78,7 @@ async def create_category(
             name=name,
             is_expense=is_expense,
             exclude_from_reports=exclude_from_reports)
+        await db.data_version.bump_data_version(session)
         return Category.from_db(rec)
 
 
@@ -83,25 +90,31 @@ async def update_category(
 
     async with db.globals.session_maker() as session:
         rec = await db.category.update_category(
-            session, category_id, name, is_expense, exclude_from_reports)
+            session, decode_id(CATEGORY, category_id), name, is_expense, exclude_from_reports)
+        await db.data_version.bump_data_version(session)
         return Category.from_db(rec)
 
 
 async def delete_category(category_id: strawberry.ID) -> Count:
     async with db.globals.session_maker() as session:
-        count = await db.category.delete_category(session, category_id)
+        count = await db.category.delete_category(session, decode_id(CATEGORY, category_id))
+        await db.data_version.bump_data_version(session)
         return Count(count=count)
 
 
 async def move_category_up(category_id: strawberry.ID) -> Category:
     async with db.globals.session_maker() as session:
-        rec = await db.category.move_category(session, category_id, is_down=False)
+        rec = await db.category.move_category(
+            session, decode_id(CATEGORY, category_id), is_down=False)
+        await db.data_version.bump_data_version(session)
         return Category.from_db(rec)
 
 
 async def move_category_down(category_id: strawberry.ID) -> Category:
     async with db.globals.session_maker() as session:
-        rec = await db.category.move_category(session, category_id, is_down=True)
+        rec = await db.category.move_category(
+            session, decode_id(CATEGORY, category_id), is_down=True)
+        await db.data_version.bump_data_version(session)
         return Category.from_db(rec)
 
 # ---------------------------------------------------------------
@@ -115,7 +128,8 @@ async def create_subcategory(
         rec = await db.subcategory.create_subcategory(
             session=session,
             name=name,
-            category_id=category_id)
+            category_id=decode_id(CATEGORY, category_id))
+        await db.data_version.bump_data_version(session)
         return Subcategory.from_db(rec)
 
 
@@ -126,13 +140,17 @@ async def update_subcategory(
 
     async with db.globals.session_maker() as session:
         rec = await db.subcategory.update_subcategory(
-            session, subcategory_id, name, category_id)
+            session, decode_id(SUBCATEGORY, subcategory_id), name, decode_id(CATEGORY, category_id))
+        await db.data_version.bump_data_version(session)
         return Subcategory.from_db(rec)
 
 
 async def delete_subcategory(subcategory_id: strawberry.ID) -> Count:
     async with db.globals.session_maker() as session:
-        count = await db.utils.delete(session, db.schema.Subcategory, subcategory_id)
+        count = await db.utils.delete(
+            session, db.schema.Subcategory, decode_id(SUBCATEGORY, subcategory_id))
+        # payees and transactions of this subcategory became uncategorized
+        await db.data_version.bump_data_version(session)
         return Count(count=count)
 
 # ---------------------------------------------------------------
@@ -147,8 +165,9 @@ async def create_payee(
         rec = await db.payee.create_payee(
             session=session,
             name=name,
-            subcategory_id=subcategory_id,
+            subcategory_id=decode_id(SUBCATEGORY, subcategory_id),
             note=note)
+        await db.data_version.bump_data_version(session)
         return Payee.from_db(rec)
 
 
@@ -161,10 +180,12 @@ async def update_payee(
     async with db.globals.session_maker() as session:
         rec = await db.payee.update_payee(
             session=session,
-            payee_id=payee_id,
+            payee_id=decode_id(PAYEE, payee_id),
             name=name,
-            subcategory_id=subcategory_id,
+            subcategory_id=decode_id(SUBCATEGORY, subcategory_id),
             note=note)
+        await db.data_version.bump_data_version(session)
+        summarize.summary_warm_up.schedule_warm_up()
         return Payee.from_db(rec)
 
 
@@ -178,7 +199,12 @@ async def update_payees(
         )
         if res is not None:
             raise StrawberryGraphQLError(message="failed to update one or more payees",
-                                         extensions=res)
+                                         extensions={encode_id(PAYEE, id_): error
+                                                     for id_, error in res.items()})
+        await db.data_version.bump_data_version(session)
+
+    # categorizing payees re-categorizes all of their transactions
+    summarize.summary_warm_up.schedule_warm_up()
 
     return None
 
@@ -195,8 +221,9 @@ async def update_transaction(
     async with db.globals.session_maker() as session:
         rec = await db.transaction.update_transaction(
             session=session,
-            transaction_id=transaction_id,
+            transaction_id=decode_id(TRANSACTION, transaction_id),
             override_subcategory=override_subcategory,
-            subcategory_id=subcategory_id,
+            subcategory_id=decode_id(SUBCATEGORY, subcategory_id),
             note=note)
+        await db.data_version.bump_data_version(session)
         return Transaction.from_db(rec)
@@ -14,3 +14,12 @@ class PaginationWindow(Generic[T]):
     total_items_count: int = strawberry.field(
         description="Total number of items in the filtered dataset."
     )
+
+    next_cursor: str | None = strawberry.field(
+        description="Cursor for fetching the next pagination window "
+                    "(null if there are no more items)."
+    )
+
+    has_more: bool = strawberry.field(
+        description="Whether there are more items after this pagination window."
+    )
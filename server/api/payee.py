@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Annotated, Optional, List
 import strawberry
 from strawberry.types.info import Info
 import db.schema
+from api.public_id import encode_id, decode_id, PAYEE, SUBCATEGORY
 import api
 
 if TYPE_CHECKING:
@@ -21,20 +22,22 @@ class Payee:
             -> Optional[Annotated["Subcategory", strawberry.lazy("api.subcategory")]]:
         if self.subcategory_id is None:
             return None
-        subcategory = await info.context.dataloaders["subcategory_by_id"].load(self.subcategory_id)
+        subcategory = await info.context.dataloaders["subcategory_by_id"].load(
+            decode_id(SUBCATEGORY, self.subcategory_id))
         return api.subcategory.Subcategory.from_db(subcategory)
 
     @strawberry.field
     async def transactions(self, info: Info) \
             -> List[Annotated["Transaction", strawberry.lazy("api.transaction")]]:
-        transactions = await info.context.dataloaders["transactions_by_payee_id"].load(self.id)
+        transactions = await info.context.dataloaders["transactions_by_payee_id"].load(
+            decode_id(PAYEE, self.id))
         return [api.transaction.Transaction.from_db(t) for t in transactions]
 
     @staticmethod
     def from_db(obj: db.schema.Payee) -> "Payee":
         return Payee(
-            id=strawberry.ID(str(obj.id)),
+            id=encode_id(PAYEE, obj.id),
             name=obj.name,
-            subcategory_id=obj.subcategory_id,
+            subcategory_id=encode_id(SUBCATEGORY, obj.subcategory_id),
             note=obj.note,
         )
@@ -5,6 +5,17 @@ import db.payees_filter
 @strawberry.input
 class PayeesFilter:
     categorized: bool | None
+    search: str | None = strawberry.field(
+        description="only payees with a name or note that contains words that "
+                    "start with every word in the search")
+
+    def __init__(self,
+                 categorized: bool | None = None,
+                 search: str | None = None):
+        self.categorized = categorized
+        self.search = search
 
     def to_db_filter(self) -> db.payees_filter.PayeesFilter:
-        return db.payees_filter.PayeesFilter(categorized=self.categorized)
+        return db.payees_filter.PayeesFilter(
+            categorized=self.categorized,
+            search=self.search)
@@ -0,0 +1,36 @@
+import base64
+import strawberry
+
+# The API doesn't expose the integer primary keys of the db as-is. Each ID is
+# encoded together with the name of its type ("Payee:12" => "UGF5ZWU6MTI"),
+# so that IDs stay opaque to clients and an ID of one type can't be passed
+# where an ID of another type is expected.
+
+ACCOUNT = "Account"
+CATEGORY = "Category"
+SUBCATEGORY = "Subcategory"
+PAYEE = "Payee"
+TRANSACTION = "Transaction"
+
+
+def encode_id(type_name: str, id_: int | None) -> strawberry.ID | None:
+    """ Return the public ID of the db record of the given type with the given ID """
+    if id_ is None:
+        return None
+    data = f'{type_name}:{id_}'.encode('utf-8')
+    return strawberry.ID(base64.urlsafe_b64encode(data).decode('ascii').rstrip('='))
+
+
+def decode_id(type_name: str, public_id: str | None) -> int | None:
+    """ Return the db ID of the record of the given type with the given public ID """
+    if public_id is None:
+        return None
+    try:
+        padding = '=' * (-len(public_id) % 4)
+        data = base64.urlsafe_b64decode((public_id + padding).encode('ascii')).decode('utf-8')
+        (decoded_type_name, id_) = data.split(':')
+        if decoded_type_name == type_name:
+            return int(id_)
+    except ValueError:
+        pass
+    raise Exception(f"invalid {type_name} ID '{public_id}'")
@@ -1,17 +1,16 @@
 from typing import List
 import strawberry
 from api.pagination_window import PaginationWindow
-from api.query_resolvers import get_transactions, get_resolver_fn, get_all_accounts, \
-    summary, balance_summary, get_all_categories, get_all_subcategories
+from api.query_resolvers import get_transactions, get_payees, get_all_accounts, \
+    summary, summaries, balance_summary, get_all_categories, get_all_subcategories, get_summary_cache_stats
 from api.category import Category
 from api.subcategory import Subcategory
 from api.payee import Payee
 from api.transaction import Transaction
-from api.payees_filter import PayeesFilter
 from api.account import Account
 from api.summary import Summary
 from api.balance_summary import BalanceSummary
-import db.schema
+from api.summary_cache_stats import SummaryCacheStats
 
 
 @strawberry.type
@@ -30,8 +29,8 @@ class Query:
         description="get all subcategories")
 
     payees: PaginationWindow[Payee] = strawberry.field(
-        resolver=get_resolver_fn(Payee, PayeesFilter, db.schema.Payee, "name"),
-        description="get payees")
+        resolver=get_payees,
+        description="get payees (ranked by relevance when searching)")
 
     transactions: PaginationWindow[Transaction] = strawberry.field(
         resolver=get_transactions,
@@ -39,8 +38,17 @@ class Query:
 
     summary: Summary = strawberry.field(
         resolver=summary,
-        description="get summary")
+        description="get summary (cached until the data changes, unless bypassCache)")
+
+    summaries: List[Summary] = strawberry.field(
+        resolver=summaries,
+        description="get several summaries at once, in the order of the requests - loaded "
+                    "together from the union of their date ranges (each cached as by summary)")
 
     balance_summary: BalanceSummary = strawberry.field(
         resolver=balance_summary,
-        description="get balance summary")
+        description="get balance summary (cached until the data changes, unless bypassCache)")
+
+    summary_cache_stats: SummaryCacheStats = strawberry.field(
+        resolver=get_summary_cache_stats,
+        description="get the counters of the summary cache")
@@ -1,80 +1,89 @@
-from typing import TypeVar, List
+from typing import List
 from datetime import date
+from strawberry.types.info import Info
 from api.pagination_window import PaginationWindow
+from api.selection import is_field_selected
 from api.account import Account
 from api.category import Category
 from api.subcategory import Subcategory
 from api.transaction import Transaction
 from api.transactions_filter import TransactionsFilter
+from api.payee import Payee
+from api.payees_filter import PayeesFilter
 from api.summary import Summary
 from api.balance_summary import BalanceSummary
+from api.summary_cache_stats import SummaryCacheStats
 from api.summary_options import SummaryOptions, SummaryGroupBy
+from api.summary_request import SummaryRequest
 import db.globals
 import db.utils
 import db.transaction
+import db.payee
 import db.schema
 from summarize.transactions_summarizer import TransactionsSummarizer
 from summarize.balance_summarizer import BalanceSummarizer
+from summarize.batch_summarizer import BatchSummarizer
 import summarize.options
-
-ApiClass = TypeVar("ApiClass")
-
-
-def get_resolver_fn(
-        api_class: ApiClass,
-        filter_class: type | None,
-        db_class: type,
-        default_order_by: str):
-
-    async def resolve(
-            order_by: str | None = default_order_by,
-            filter: filter_class | None = None,
-            limit: int = None,
-            offset: int = 0) -> PaginationWindow[api_class]:
-
-        db_filter = None if filter is None else filter.to_db_filter()
-
-        async with db.globals.session_maker() as session:
-            window = await db.utils.get(
-                session, db_class, order_by, db_filter, limit, offset)
-
-            return PaginationWindow[api_class](
-                items=[api_class.from_db(item) for item in window.items],
-                total_items_count=window.total_items_count)
-
-    return resolve
+import summarize.summary_cache
+import summarize.summary_warm_up
 
 
 async def get_transactions(
+        info: Info,
         order_by: str | None = "date",
         filter: TransactionsFilter | None = None,
         limit: int = None,
-        offset: int = 0) -> PaginationWindow[Transaction]:
+        offset: int = 0,
+        cursor: str | None = None) -> PaginationWindow[Transaction]:
     db_filter = None if filter is None else filter.to_db_filter()
 
-    async with db.globals.session_maker() as session:
+    async with db.globals.reader_session_maker() as session:
         window = await db.transaction.get_transactions(
-            session, order_by, db_filter, limit, offset)
+            session, order_by, db_filter, limit, offset, cursor,
+            with_count=is_field_selected(info, "totalItemsCount"))
 
         return PaginationWindow[Transaction](
             items=[Transaction.from_db(item) for item in window.items],
-            total_items_count=window.total_items_count)
+            total_items_count=window.total_items_count,
+            next_cursor=window.next_cursor,
+            has_more=window.has_more)
+
+
+async def get_payees(
+        info: Info,
+        order_by: str | None = "name",
+        filter: PayeesFilter | None = None,
+        limit: int = None,
+        offset: int = 0,
+        cursor: str | None = None) -> PaginationWindow[Payee]:
+    db_filter = None if filter is None else filter.to_db_filter()
+
+    async with db.globals.reader_session_maker() as session:
+        window = await db.payee.get_payees(
+            session, order_by, db_filter, limit, offset, cursor,
+            with_count=is_field_selected(info, "totalItemsCount"))
+
+        return PaginationWindow[Payee](
+            items=[Payee.from_db(item) for item in window.items],
+            total_items_count=window.total_items_count,
+            next_cursor=window.next_cursor,
+            has_more=window.has_more)
 
 
 async def get_all_accounts(order_by: str | None = "name") -> List[Account]:
-    async with db.globals.session_maker() as session:
+    async with db.globals.reader_session_maker() as session:
         recs = await db.utils.get_all(session, db.schema.Account, order_by)
         return [Account.from_db(rec) for rec in recs]
 
 
 async def get_all_categories(order_by: str | None = "order") -> List[Category]:
-    async with db.globals.session_maker() as session:
+    async with db.globals.reader_session_maker() as session:
         recs = await db.utils.get_all(session, db.schema.Category, order_by)
         return [Category.from_db(rec) for rec in recs]
 
 
 async def get_all_subcategories(order_by: str | None = "name") -> List[Subcategory]:
-    async with db.globals.session_maker() as session:
+    async with db.globals.reader_session_maker() as session:
         recs = await db.utils.get_all(session, db.schema.Subcategory, order_by)
         return [Subcategory.from_db(rec) for rec in recs]
 
@@ -82,25 +91,79 @@ async def get_all_subcategories(order_by: str | None = "name") -> List[Subcatego
 async def summary(
         start_date: date,
         end_date: date,
-        options: SummaryOptions) -> Summary:
-    summarizer = TransactionsSummarizer()
-    async with db.globals.session_maker() as session:
+        options: SummaryOptions,
+        bypass_cache: bool = False) -> Summary:
+
+    async def make_summary(session):
+        summarizer = TransactionsSummarizer()
         res = await summarizer.execute(
             session,
             start_date,
             end_date,
             options.convert())
-    return Summary.from_db(res)
+        return Summary.from_db(res, options.group_by)
+
+    async with db.globals.reader_session_maker() as session:
+        key = summarize.summary_cache.make_summary_key(start_date, end_date, options)
+        if not bypass_cache:
+            summarize.summary_warm_up.record(key, make_summary)
+        return await summarize.summary_cache.get_summary(
+            session, key, lambda: make_summary(session), bypass_cache)
+
+
+async def summaries(requests: List[SummaryRequest],
+                    bypass_cache: bool = False) -> List[Summary]:
+
+    async def make_summaries(keys):
+        # the requests whose summaries aren't cached
+        missing = [key_to_request[key] for key in keys]
+        res = await BatchSummarizer.execute(session, [r.convert() for r in missing])
+        return [Summary.from_db(s, r.options.group_by) for s, r in zip(res, missing)]
+
+    async with db.globals.reader_session_maker() as session:
+        keys = [summarize.summary_cache.make_summary_key(r.start_date, r.end_date, r.options)
+                for r in requests]
+        key_to_request = dict(zip(keys, requests))
+        if not bypass_cache:
+            # warmed up one by one, as with summary()
+            for key, r in key_to_request.items():
+                summarize.summary_warm_up.record(key, _make_request_summary_fn(r))
+        return await summarize.summary_cache.get_summaries(
+            session, keys, make_summaries, bypass_cache)
 
 
 async def balance_summary(start_date: date,
                           end_date: date,
-                          group_by: SummaryGroupBy) -> BalanceSummary:
-    summarizer = BalanceSummarizer()
-    async with db.globals.session_maker() as session:
+                          group_by: SummaryGroupBy,
+                          bypass_cache: bool = False) -> BalanceSummary:
+
+    async def make_summary(session):
+        summarizer = BalanceSummarizer()
         res = await summarizer.execute(
             session,
             start_date,
             end_date,
             summarize.options.SummaryGroupBy(group_by.value))
-    return BalanceSummary.from_db(res)
+        return BalanceSummary.from_db(res, group_by)
+
+    async with db.globals.reader_session_maker() as session:
+        key = summarize.summary_cache.make_balance_summary_key(start_date, end_date, group_by)
+        if not bypass_cache:
+            summarize.summary_warm_up.record(key, make_summary)
+        return await summarize.summary_cache.get_summary(
+            session, key, lambda: make_summary(session), bypass_cache)
+
+
+def _make_request_summary_fn(request: SummaryRequest):
+    """ Return a function that makes the summary of the given request,
+    using the given session """
+
+    async def make_summary(session):
+        res = await TransactionsSummarizer.execute(session, *request.convert())
+        return Summary.from_db(res, request.options.group_by)
+
+    return make_summary
+
+
+async def get_summary_cache_stats() -> SummaryCacheStats:
+    return SummaryCacheStats.from_db(summarize.summary_cache.get_stats())
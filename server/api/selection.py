@@ -0,0 +1,19 @@
+from typing import List
+from strawberry.types.info import Info
+from strawberry.types.nodes import Selection, FragmentSpread, InlineFragment
+
+
+def is_field_selected(info: Info, field_name: str) -> bool:
+    """ Return whether the given field (by its GraphQL name) is selected
+    directly under the field that is being resolved """
+    return any(_is_selected(f.selections, field_name) for f in info.selected_fields)
+
+
+def _is_selected(selections: List[Selection], field_name: str) -> bool:
+    for s in selections:
+        if isinstance(s, (FragmentSpread, InlineFragment)):
+            if _is_selected(s.selections, field_name):
+                return True
+        elif s.name == field_name:
+            return True
+    return False
@@ -3,6 +3,7 @@ import strawberry
 from strawberry.types.info import Info
 import api
 import db.schema
+from api.public_id import encode_id, decode_id, CATEGORY, SUBCATEGORY
 
 if TYPE_CHECKING:
     from api.payee import Payee
@@ -18,19 +19,21 @@ class Subcategory:
     @strawberry.field
     async def category(self, info: Info) \
             -> Annotated["Category", strawberry.lazy("api.category")]:
-        category = await info.context.dataloaders["category_by_id"].load(self.category_id)
+        category = await info.context.dataloaders["category_by_id"].load(
+            decode_id(CATEGORY, self.category_id))
         return api.category.Category.from_db(category)
 
     @strawberry.field
     async def payees(self, info: Info) \
             -> List[Annotated["Payee", strawberry.lazy("api.payee")]]:
-        payees = await info.context.dataloaders["payees_by_subcategory_id"].load(self.id)
+        payees = await info.context.dataloaders["payees_by_subcategory_id"].load(
+            decode_id(SUBCATEGORY, self.id))
         return [Payee.from_db(p) for p in payees]
 
     @staticmethod
     def from_db(obj: db.schema.Subcategory) -> "Subcategory":
         return Subcategory(
-            id=strawberry.ID(str(obj.id)),
+            id=encode_id(SUBCATEGORY, obj.id),
             name=obj.name,
-            category_id=obj.category_id
+            category_id=encode_id(CATEGORY, obj.category_id)
         )
@@ -0,0 +1,46 @@
+import logging
+from inspect import isawaitable
+from strawberry.extensions import Extension
+import summarize.tracing
+
+# requests that take longer than this (in seconds) are logged with their stages
+SLOW_REQUEST_SECONDS = 1
+
+
+class SummarizeTracingExtension(Extension):
+    """ Traces every request: its top-level fields, and the stages of making
+    summaries within them (see summarize.tracing). The trace is returned in
+    the "summarizeTrace" of the response's extensions. """
+
+    def on_request_start(self):
+        self._trace = summarize.tracing.start_trace()
+
+    def on_request_end(self):
+        summarize.tracing.end_trace(self._trace)
+
+        if self._trace.seconds > SLOW_REQUEST_SECONDS:
+            logging.warning(f'Slow request ({self._trace.seconds * 1000:.2f} ms, '
+                            f'operation: {self.execution_context.operation_name}):\n'
+                            f'{self._trace.format()}')
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        # only the top-level fields are stages (the fields within them don't
+        # make summaries)
+        if info.path.prev is not None:
+            return _next(root, info, *args, **kwargs)
+
+        return self._resolve_top_level_field(_next, root, info, *args, **kwargs)
+
+    @staticmethod
+    async def _resolve_top_level_field(_next, root, info, *args, **kwargs):
+        with summarize.tracing.stage(info.path.key):
+            res = _next(root, info, *args, **kwargs)
+            if isawaitable(res):
+                res = await res
+            return res
+
+    def get_results(self):
+        if not self._trace.stages:
+            return {}
+
+        return {'summarizeTrace': self._trace.to_dict()}
@@ -1,7 +1,18 @@
 from typing import List
 import strawberry
 import summarize.summary
+from summarize.matrix_summary import MatrixSummary
 from api.summary_for_one_group import SummaryForOneGroup
+from api.summary_options import SummaryGroupBy
+from api.public_id import CATEGORY, SUBCATEGORY, PAYEE, ACCOUNT
+
+# type of the db record that each group is, by the summary's group_by
+_GROUP_TYPE_NAMES = {
+    SummaryGroupBy.category: CATEGORY,
+    SummaryGroupBy.subcategory: SUBCATEGORY,
+    SummaryGroupBy.payee: PAYEE,
+    SummaryGroupBy.account: ACCOUNT,
+}
 
 
 @strawberry.type
@@ -12,10 +23,31 @@ class Summary:
     sum_total: float
 
     @staticmethod
-    def from_db(obj: summarize.summary.Summary) -> "Summary":
+    def from_db(obj: summarize.summary.Summary | MatrixSummary,
+                group_by: SummaryGroupBy) -> "Summary":
+        group_type_name = _GROUP_TYPE_NAMES[group_by]
+        if isinstance(obj, MatrixSummary):
+            return Summary._from_matrix(obj, group_type_name)
+
+        return Summary(
+            buckets=obj.buckets,
+            groups=[SummaryForOneGroup.from_db(g, group_type_name)
+                    for g_id, g in obj.groups.items()],
+            bucket_totals=obj.bucket_totals,
+            sum_total=obj.sum_total
+        )
+
+    @staticmethod
+    def _from_matrix(obj: MatrixSummary, group_type_name: str) -> "Summary":
+        # convert whole rows, rather than cell by cell
+        data = obj.data.tolist()
+        group_totals = obj.group_totals.tolist()
         return Summary(
             buckets=obj.buckets,
-            groups=[SummaryForOneGroup.from_db(g) for g_id, g in obj.groups.items()],
+            groups=[SummaryForOneGroup.from_values(
+                        g_id, name, g_data, g_total, group_type_name)
+                    for g_id, name, g_data, g_total
+                    in zip(obj.group_ids, obj.group_names, data, group_totals)],
             bucket_totals=obj.bucket_totals,
             sum_total=obj.sum_total
         )
@@ -0,0 +1,27 @@
+import strawberry
+import summarize.summary_cache
+
+
+@strawberry.type(description="Counters of the in-process cache of summary results.")
+class SummaryCacheStats:
+
+    hits: int = strawberry.field(
+        description="How many summaries were found in the cache.")
+
+    misses: int = strawberry.field(
+        description="How many summaries had to be computed.")
+
+    warmed: int = strawberry.field(
+        description="How many summaries were computed ahead of a request for them.")
+
+    size: int = strawberry.field(
+        description="How many summaries are cached.")
+
+    @staticmethod
+    def from_db(obj: summarize.summary_cache.SummaryCacheStats) -> "SummaryCacheStats":
+        return SummaryCacheStats(
+            hits=obj.hits,
+            misses=obj.misses,
+            warmed=obj.warmed,
+            size=obj.size
+        )
@@ -1,6 +1,7 @@
 from typing import List
 import strawberry
 import summarize.summary_for_one_group
+from api.public_id import encode_id
 
 
 @strawberry.type
@@ -11,10 +12,20 @@ class SummaryForOneGroup:
     total: float
 
     @staticmethod
-    def from_db(obj: summarize.summary_for_one_group.SummaryForOneGroup) -> "SummaryForOneGroup":
+    def from_db(obj: summarize.summary_for_one_group.SummaryForOneGroup,
+                group_type_name: str) -> "SummaryForOneGroup":
+        return SummaryForOneGroup.from_values(
+            obj.group_id, obj.name, obj.data, obj.total, group_type_name)
+
+    @staticmethod
+    def from_values(group_id: int, name: str, data: List[float], total: float,
+                    group_type_name: str) -> "SummaryForOneGroup":
+        # the "Other" group (see MergeUnderThreshold) has no db record
+        public_group_id = strawberry.ID("0") if group_id == 0 \
+            else encode_id(group_type_name, group_id)
         return SummaryForOneGroup(
-            group_id=obj.group_id,
-            name=obj.name,
-            data=obj.data,
-            total=obj.total
+            group_id=public_group_id,
+            name=name,
+            data=data,
+            total=total
         )
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 import strawberry
 import summarize.options
 
@@ -7,11 +8,17 @@ import summarize.options
 class SummaryGroupBy(Enum):
     category = "category"
     subcategory = "subcategory"
+    payee = "payee"
+    account = "account"
 
 
 @strawberry.enum
 class SummaryBucketBy(Enum):
+    day = "day"
+    week = "week"
     month = "month"
+    quarter = "quarter"
+    year = "year"
     range = "range"
 
 
@@ -21,11 +28,31 @@ class SummaryOptions:
     group_by: SummaryGroupBy
     bucket_by: SummaryBucketBy
     merge_under_threshold: bool
+    merge_threshold_percentage: int = strawberry.field(
+        default=10,
+        description="Merge the smallest groups of every bucket that together are at most "
+                    "this percentage of the bucket into 'Other' (if merge_under_threshold)")
+    top_k: Optional[int] = strawberry.field(
+        default=None,
+        description="Keep only the top_k groups with the largest totals, and merge the rest into 'Other' "
+                    "(after merge_under_threshold, but before it when grouped by payee or account)")
+    rolling_window: Optional[int] = strawberry.field(
+        default=None,
+        description="Sum every bucket together with the buckets before it, rolling_window buckets "
+                    "in all (e.g. 12 for the rolling 12 months)")
+    years_ago: int = strawberry.field(
+        default=0,
+        description="Sum the dates of every bucket this many years earlier (e.g. 1 for a "
+                    "year-over-year comparison)")
 
     def convert(self):
         return summarize.options.SummaryOptions(
             is_expense=self.is_expense,
             group_by=self.group_by,
             bucket_by=self.bucket_by,
-            merge_under_threshold=self.merge_under_threshold
+            merge_under_threshold=self.merge_under_threshold,
+            merge_threshold_percentage=self.merge_threshold_percentage,
+            top_k=self.top_k,
+            rolling_window=self.rolling_window,
+            years_ago=self.years_ago
         )
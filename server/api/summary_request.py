@@ -0,0 +1,13 @@
+from datetime import date
+import strawberry
+from api.summary_options import SummaryOptions
+
+
+@strawberry.input
+class SummaryRequest:
+    start_date: date
+    end_date: date
+    options: SummaryOptions
+
+    def convert(self):
+        return self.start_date, self.end_date, self.options.convert()
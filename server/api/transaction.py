@@ -3,6 +3,8 @@ from datetime import date
 import strawberry
 from strawberry.types.info import Info
 import db.schema
+import util
+from api.public_id import encode_id, decode_id, ACCOUNT, PAYEE, SUBCATEGORY, TRANSACTION
 import api
 
 if TYPE_CHECKING:
@@ -20,16 +22,21 @@ class Transaction:
     payee_id: strawberry.ID
     override_subcategory: bool
     subcategory_id: strawberry.ID | None
+    effective_subcategory_id: strawberry.ID | None = strawberry.field(
+        description="The subcategory that the transaction belongs to: subcategory_id "
+                    "if override_subcategory, otherwise the payee's subcategory_id.")
     note: str
 
     @strawberry.field
     async def payee(self, info: Info) -> Annotated["Payee", strawberry.lazy("api.payee")]:
-        payee = await info.context.dataloaders["payee_by_id"].load(self.payee_id)
+        payee = await info.context.dataloaders["payee_by_id"].load(
+            decode_id(PAYEE, self.payee_id))
         return api.payee.Payee.from_db(payee)
 
     @strawberry.field
     async def account(self, info: Info) -> Annotated["Account", strawberry.lazy("api.account")]:
-        account = await info.context.dataloaders["account_by_id"].load(self.account_id)
+        account = await info.context.dataloaders["account_by_id"].load(
+            decode_id(ACCOUNT, self.account_id))
         return api.account.Account.from_db(account)
 
     @strawberry.field
@@ -37,19 +44,30 @@ class Transaction:
             -> Optional[Annotated["Subcategory", strawberry.lazy("api.subcategory")]]:
         if self.subcategory_id is None:
             return None
-        s = await info.context.dataloaders["subcategory_by_id"].load(self.subcategory_id)
+        s = await info.context.dataloaders["subcategory_by_id"].load(
+            decode_id(SUBCATEGORY, self.subcategory_id))
+        return api.subcategory.Subcategory.from_db(s)
+
+    @strawberry.field
+    async def effective_subcategory(self, info: Info) \
+            -> Optional[Annotated["Subcategory", strawberry.lazy("api.subcategory")]]:
+        if self.effective_subcategory_id is None:
+            return None
+        s = await info.context.dataloaders["subcategory_by_id"].load(
+            decode_id(SUBCATEGORY, self.effective_subcategory_id))
         return api.subcategory.Subcategory.from_db(s)
 
     @staticmethod
     def from_db(obj: db.schema.Transaction) \
             -> "Transaction":
         return Transaction(
-            id=strawberry.ID(str(obj.id)),
+            id=encode_id(TRANSACTION, obj.id),
             date=obj.date,
-            amount=obj.amount,
-            account_id=obj.account_id,
-            payee_id=obj.payee_id,
+            amount=util.from_minor_units(obj.amount),
+            account_id=encode_id(ACCOUNT, obj.account_id),
+            payee_id=encode_id(PAYEE, obj.payee_id),
             override_subcategory=obj.override_subcategory,
-            subcategory_id=obj.subcategory_id,
+            subcategory_id=encode_id(SUBCATEGORY, obj.subcategory_id),
+            effective_subcategory_id=encode_id(SUBCATEGORY, obj.effective_subcategory_id),
             note=obj.note
         )
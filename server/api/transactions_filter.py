@@ -1,19 +1,73 @@
+from typing import List
+from datetime import date
 import strawberry
 import db.transactions_filter
+from api.public_id import decode_id, PAYEE, ACCOUNT, SUBCATEGORY, CATEGORY
+import util
 
 
 @strawberry.input
 class TransactionsFilter:
     categorized: bool | None
     payee_id: strawberry.ID | None
+    search: str | None = strawberry.field(
+        description="only transactions with a note that contains words that "
+                    "start with every word in the search (still in the given order, "
+                    "not ranked by relevance as payees are)")
+    start_date: date | None = strawberry.field(
+        description="only transactions on or after this date")
+    end_date: date | None = strawberry.field(
+        description="only transactions on or before this date")
+    min_amount: float | None = strawberry.field(
+        description="only transactions with an amount greater than or equal to this one")
+    max_amount: float | None = strawberry.field(
+        description="only transactions with an amount less than or equal to this one")
+    account_ids: List[strawberry.ID] | None = strawberry.field(
+        description="only transactions of these accounts")
+    subcategory_ids: List[strawberry.ID] | None = strawberry.field(
+        description="only transactions that belong to these subcategories")
+    category_ids: List[strawberry.ID] | None = strawberry.field(
+        description="only transactions that belong to subcategories of these categories")
 
     def __init__(self,
                  categorized: bool | None = None,
-                 payee_id: str | None = None):
+                 payee_id: str | None = None,
+                 search: str | None = None,
+                 start_date: date | None = None,
+                 end_date: date | None = None,
+                 min_amount: float | None = None,
+                 max_amount: float | None = None,
+                 account_ids: List[str] | None = None,
+                 subcategory_ids: List[str] | None = None,
+                 category_ids: List[str] | None = None):
         self.categorized = categorized
         self.payee_id = payee_id
+        self.search = search
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.account_ids = account_ids
+        self.subcategory_ids = subcategory_ids
+        self.category_ids = category_ids
 
     def to_db_filter(self) -> db.transactions_filter.TransactionsFilter:
         return db.transactions_filter.TransactionsFilter(
             categorized=self.categorized,
-            payee_id=self.payee_id)
+            payee_id=decode_id(PAYEE, self.payee_id),
+            search=self.search,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            min_amount=_to_minor_units(self.min_amount),
+            max_amount=_to_minor_units(self.max_amount),
+            account_ids=_decode_ids(ACCOUNT, self.account_ids),
+            subcategory_ids=_decode_ids(SUBCATEGORY, self.subcategory_ids),
+            category_ids=_decode_ids(CATEGORY, self.category_ids))
+
+
+def _to_minor_units(amount: float | None) -> int | None:
+    return None if amount is None else util.to_minor_units(amount)
+
+
+def _decode_ids(type_name: str, public_ids: List[str] | None) -> List[int] | None:
+    return None if public_ids is None else [decode_id(type_name, i) for i in public_ids]
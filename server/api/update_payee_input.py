@@ -1,5 +1,6 @@
 import strawberry
 import db.schema
+from api.public_id import decode_id, PAYEE, SUBCATEGORY
 
 
 @strawberry.input
@@ -9,5 +10,5 @@ class UpdatePayeeInput:
 
     def to_db(self):
         return db.schema.Payee(
-            id=self.id,
-            subcategory_id=self.subcategory_id)
+            id=decode_id(PAYEE, self.id),
+            subcategory_id=decode_id(SUBCATEGORY, self.subcategory_id))
@@ -6,8 +6,10 @@ from starlette.middleware.cors import CORSMiddleware
 from api.query import Query
 from api.mutation import Mutation
 from api.context import Context
+from api.summarize_tracing_extension import SummarizeTracingExtension
 from init_logging import init_logging
 from db.init import init_db
+import summarize.summary_warm_up
 
 
 def get_context():
@@ -17,7 +19,7 @@ def get_context():
 init_db()
 init_logging()
 
-schema = Schema(query=Query, mutation=Mutation)
+schema = Schema(query=Query, mutation=Mutation, extensions=[SummarizeTracingExtension])
 graphql_app = GraphQLRouter(schema, context_getter=get_context)
 
 app = FastAPI()
@@ -34,6 +36,13 @@ app.add_middleware(
 app.include_router(graphql_app, prefix="/graphql")
 
 
+@app.on_event("startup")
+async def start_summary_warm_up():
+    # warm up the summary cache whenever the data changes (including by a
+    # sync, which runs in a process of its own)
+    summarize.summary_warm_up.start_watching()
+
+
 @app.get("/")
 async def root():
     return RedirectResponse(url="/graphql")
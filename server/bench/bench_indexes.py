@@ -0,0 +1,193 @@
+""" Benchmark the transactions indexes.
+
+Builds a DB with synthetic transactions, times the main transaction
+queries without the indexes, migrates the DB and times them again.
+
+Run from the server directory:
+    python -m bench.bench_indexes [transactions_count]
+"""
+import sys
+import time
+import uuid
+import random
+import asyncio
+import datetime
+import sqlite3
+import tempfile
+import statistics
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import db.schema
+import db.globals
+import db.migrations
+import db.transaction
+from db.transactions_filter import TransactionsFilter
+from summarize.transactions_source import TransactionsSource
+from api.dataloaders import get_all_dataloaders
+
+ACCOUNTS_COUNT = 4
+PAYEES_COUNT = 5000
+SUBCATEGORIES_COUNT = 100
+FIRST_DATE = datetime.date(2013, 1, 1)
+DAYS_COUNT = 10 * 365
+REPEAT = 5
+
+
+def create_db(filename, transactions_count):
+    sync_engine = create_engine(f'sqlite+pysqlite:///{filename}')
+    db.schema.Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    rnd = random.Random(0)
+    conn = sqlite3.connect(filename)
+
+    category_id = 1
+    conn.execute(
+        'INSERT INTO categories VALUES (?, ?, ?, ?, ?)',
+        (category_id, 'category', True, 1, False))
+
+    subcategory_ids = list(range(1, SUBCATEGORIES_COUNT + 1))
+    conn.executemany(
+        'INSERT INTO subcategories VALUES (?, ?, ?)',
+        [(s, f'subcategory{i}', category_id) for i, s in enumerate(subcategory_ids)])
+
+    account_ids = list(range(1, ACCOUNTS_COUNT + 1))
+    conn.executemany(
+        'INSERT INTO accounts VALUES (?, ?, ?, ?, ?, ?)',
+        [(a, f'account{i}', 'max', '', '', None) for i, a in enumerate(account_ids)])
+
+    payee_ids = list(range(1, PAYEES_COUNT + 1))
+    payee_subcategory_ids = {p: rnd.choice(subcategory_ids) for p in payee_ids}
+    conn.executemany(
+        'INSERT INTO payees VALUES (?, ?, ?, ?)',
+        [(p, f'payee{i}', payee_subcategory_ids[p], '') for i, p in enumerate(payee_ids)])
+
+    def transactions():
+        for i in range(transactions_count):
+            date = FIRST_DATE + datetime.timedelta(days=rnd.randrange(DAYS_COUNT))
+            payee_id = rnd.choice(payee_ids)
+            yield (i + 1,
+                   uuid.uuid4().hex,
+                   date.isoformat(),
+                   -rnd.randrange(1, 100000),
+                   rnd.choice(account_ids),
+                   payee_id,
+                   False,
+                   None,
+                   payee_subcategory_ids[payee_id],
+                   '')
+
+    conn.executemany(
+        'INSERT INTO transactions '
+        '(id, external_id, date, amount, account_id, payee_id, override_subcategory, '
+        'subcategory_id, effective_subcategory_id, note) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', transactions())
+    conn.commit()
+    conn.close()
+
+    return account_ids, payee_ids
+
+
+# the indexes created by the first migration step
+INDEXES = [
+    'ix_transactions_date',
+    'ix_transactions_account_id_date',
+    'ix_transactions_payee_id',
+    'ix_transactions_subcategory_id',
+]
+
+
+def drop_indexes(filename):
+    conn = sqlite3.connect(filename)
+    for index in INDEXES:
+        conn.execute(f'DROP INDEX {index}')
+    conn.commit()
+    conn.close()
+
+
+def create_indexes(filename):
+    conn = sqlite3.connect(filename)
+    db.migrations.MIGRATIONS[0](conn)
+    conn.commit()
+    conn.close()
+
+
+async def time_query(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def run_queries(account_ids, payee_ids):
+    month_start = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT // 2)
+    month_end = month_start + datetime.timedelta(days=30)
+    sync_start = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT - 30)
+
+    async def summary_month():
+        async with db.globals.session_maker() as session:
+            await TransactionsSource._load_transactions_data(session, month_start, month_end)
+
+    async def sync_transaction_ids():
+        async with db.globals.session_maker() as session:
+            await db.transaction.get_all_transaction_external_ids(session, account_ids[0], sync_start)
+
+    async def transactions_by_payee_id():
+        await get_all_dataloaders()["transactions_by_payee_id"].load_many(payee_ids[:20])
+
+    async def payee_filter_page():
+        async with db.globals.session_maker() as session:
+            await db.transaction.get_transactions(
+                session, 'date', TransactionsFilter(categorized=None, payee_id=payee_ids[0]), 50)
+
+    async def categorized_filter_page():
+        async with db.globals.session_maker() as session:
+            await db.transaction.get_transactions(
+                session, 'date', TransactionsFilter(categorized=True, payee_id=None), 50)
+
+    queries = {
+        'summary, one month': summary_month,
+        'sync, account transaction IDs': sync_transaction_ids,
+        'dataloader, transactions of 20 payees': transactions_by_payee_id,
+        'transactions filtered by payee, first page': payee_filter_page,
+        'categorized transactions, first page': categorized_filter_page,
+    }
+
+    return {name: await time_query(fn) for name, fn in queries.items()}
+
+
+async def bench(filename, account_ids, payee_ids):
+    db.globals.engine = create_async_engine(f'sqlite+aiosqlite:///{filename}')
+    db.globals.session_maker = sessionmaker(
+        bind=db.globals.engine, class_=AsyncSession, expire_on_commit=False)
+    db.globals.reader_session_maker = db.globals.session_maker
+    res = await run_queries(account_ids, payee_ids)
+    await db.globals.engine.dispose()
+    return res
+
+
+async def main():
+    transactions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = f'{tmp_dir}/kitmi.db'
+
+        print(f'Creating a DB with {transactions_count} transactions')
+        account_ids, payee_ids = create_db(filename, transactions_count)
+
+        drop_indexes(filename)
+        before = await bench(filename, account_ids, payee_ids)
+
+        create_indexes(filename)
+        after = await bench(filename, account_ids, payee_ids)
+
+    print(f'{"query":45} {"before (ms)":>12} {"after (ms)":>12}')
+    for name in before:
+        print(f'{name:45} {before[name]:12.1f} {after[name]:12.1f}')
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
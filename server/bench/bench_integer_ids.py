@@ -0,0 +1,222 @@
+""" Benchmark integer IDs against the string (UUID) IDs used before.
+
+Builds a DB with synthetic data in the old layout (string primary keys,
+schema version 3), times join-heavy queries, migrates the DB to integer
+IDs and times the same queries again.
+
+Run from the server directory:
+    python -m bench.bench_integer_ids [transactions_count]
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import datetime
+import sqlite3
+import tempfile
+import statistics
+import db.migrations
+
+ACCOUNTS_COUNT = 4
+CATEGORIES_COUNT = 10
+PAYEES_COUNT = 5000
+SUBCATEGORIES_COUNT = 100
+FIRST_DATE = datetime.date(2013, 1, 1)
+DAYS_COUNT = 10 * 365
+REPEAT = 5
+
+# the layout of the DB at schema version 3, before moving to integer IDs
+OLD_SCHEMA = [
+    'CREATE TABLE accounts ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, source VARCHAR(5) NOT NULL, '
+    'username VARCHAR NOT NULL, password VARCHAR NOT NULL, last_synced DATE, '
+    'PRIMARY KEY (id), UNIQUE (name))',
+
+    'CREATE TABLE categories ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, is_expense BOOLEAN NOT NULL, '
+    '"order" INTEGER NOT NULL, exclude_from_reports BOOLEAN NOT NULL, '
+    'PRIMARY KEY (id), UNIQUE (name))',
+
+    'CREATE TABLE subcategories ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, category_id INTEGER NOT NULL, '
+    'PRIMARY KEY (id), UNIQUE (name), '
+    'FOREIGN KEY(category_id) REFERENCES categories (id))',
+
+    'CREATE TABLE payees ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, subcategory_id INTEGER, note VARCHAR, '
+    'PRIMARY KEY (id), UNIQUE (name), '
+    'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)',
+
+    'CREATE TABLE transactions ('
+    'id VARCHAR NOT NULL, date DATE NOT NULL, amount FLOAT NOT NULL, '
+    'account_id INTEGER NOT NULL, payee_id INTEGER NOT NULL, '
+    'override_subcategory BOOLEAN NOT NULL, subcategory_id INTEGER, note VARCHAR, '
+    'effective_subcategory_id INTEGER REFERENCES subcategories (id) ON DELETE SET NULL, '
+    'PRIMARY KEY (id), '
+    'FOREIGN KEY(account_id) REFERENCES accounts (id), '
+    'FOREIGN KEY(payee_id) REFERENCES payees (id), '
+    'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)',
+
+    'CREATE TABLE data_version (id INTEGER NOT NULL, version INTEGER NOT NULL, PRIMARY KEY (id))',
+
+    'CREATE INDEX ix_transactions_date ON transactions (date)',
+    'CREATE INDEX ix_transactions_account_id_date ON transactions (account_id, date)',
+    'CREATE INDEX ix_transactions_payee_id ON transactions (payee_id)',
+    'CREATE INDEX ix_transactions_subcategory_id ON transactions (subcategory_id)',
+    'CREATE INDEX ix_transactions_effective_subcategory_id_date '
+    'ON transactions (effective_subcategory_id, date)',
+
+    'PRAGMA user_version = 3',
+]
+
+
+def create_old_db(filename, transactions_count):
+    rnd = random.Random(0)
+    conn = sqlite3.connect(filename)
+    for statement in OLD_SCHEMA:
+        conn.execute(statement)
+
+    category_ids = [str(uuid.uuid4()) for _ in range(CATEGORIES_COUNT)]
+    conn.executemany(
+        'INSERT INTO categories VALUES (?, ?, ?, ?, ?)',
+        [(c, f'category{i}', True, i, False) for i, c in enumerate(category_ids)])
+
+    subcategory_ids = [str(uuid.uuid4()) for _ in range(SUBCATEGORIES_COUNT)]
+    conn.executemany(
+        'INSERT INTO subcategories VALUES (?, ?, ?)',
+        [(s, f'subcategory{i}', rnd.choice(category_ids)) for i, s in enumerate(subcategory_ids)])
+
+    account_ids = [str(uuid.uuid4()) for _ in range(ACCOUNTS_COUNT)]
+    conn.executemany(
+        'INSERT INTO accounts VALUES (?, ?, ?, ?, ?, ?)',
+        [(a, f'account{i}', 'max', '', '', None) for i, a in enumerate(account_ids)])
+
+    payee_ids = [str(uuid.uuid4()) for _ in range(PAYEES_COUNT)]
+    payee_subcategory_ids = {p: rnd.choice(subcategory_ids) for p in payee_ids}
+    conn.executemany(
+        'INSERT INTO payees VALUES (?, ?, ?, ?)',
+        [(p, f'payee{i}', payee_subcategory_ids[p], '') for i, p in enumerate(payee_ids)])
+
+    def transactions():
+        for i in range(transactions_count):
+            date = FIRST_DATE + datetime.timedelta(days=rnd.randrange(DAYS_COUNT))
+            payee_id = rnd.choice(payee_ids)
+            yield (uuid.uuid4().hex,
+                   date.isoformat(),
+                   -rnd.randrange(1, 100000) / 100,
+                   rnd.choice(account_ids),
+                   payee_id,
+                   False,
+                   None,
+                   '',
+                   payee_subcategory_ids[payee_id])
+
+    conn.executemany(
+        'INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', transactions())
+    conn.commit()
+    conn.close()
+
+
+def get_queries(conn, fk):
+    """ Return the queries to time, by name. fk(column) is how a foreign key
+    column is compared to the primary key it references. """
+
+    def sample_ids(table, count):
+        return [r[0] for r in conn.execute(
+            f'SELECT id FROM {table} ORDER BY rowid LIMIT {count}')]
+
+    def placeholders(values):
+        return ', '.join('?' * len(values))
+
+    year_start = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT // 2)
+    year_end = year_start + datetime.timedelta(days=365)
+    category_id = sample_ids('categories', 1)[0]
+    payee_ids = sample_ids('payees', 100)
+    payee_ids_20 = payee_ids[:20]
+
+    return {
+        'summary, one year by category': (
+            'SELECT s.category_id, sum(t.amount) FROM transactions t '
+            f'JOIN subcategories s ON s.id = {fk("t.effective_subcategory_id")} '
+            'WHERE t.date BETWEEN ? AND ? GROUP BY s.category_id',
+            (year_start.isoformat(), year_end.isoformat())),
+
+        'categorized filter, count': (
+            'SELECT count(*) FROM transactions WHERE effective_subcategory_id IS NOT NULL',
+            ()),
+
+        'categorized filter with payees, first page': (
+            'SELECT t.*, p.name FROM transactions t '
+            f'JOIN payees p ON p.id = {fk("t.payee_id")} '
+            'WHERE t.effective_subcategory_id IS NOT NULL '
+            'ORDER BY t.date DESC, t.id DESC LIMIT 50',
+            ()),
+
+        'transactions of one category': (
+            'SELECT count(*) FROM transactions t '
+            f'JOIN subcategories s ON s.id = {fk("t.effective_subcategory_id")} '
+            'WHERE s.category_id = ?',
+            (category_id,)),
+
+        'dataloader, 100 payees by ID': (
+            f'SELECT * FROM payees WHERE id IN ({placeholders(payee_ids)})',
+            payee_ids),
+
+        'dataloader, transactions of 20 payees': (
+            f'SELECT * FROM transactions WHERE payee_id IN ({placeholders(payee_ids_20)})',
+            payee_ids_20),
+    }
+
+
+def get_compacted_size(filename):
+    conn = sqlite3.connect(filename)
+    conn.execute('VACUUM')
+    conn.close()
+    return os.path.getsize(filename)
+
+
+def time_query(conn, sql, params):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def bench(filename, fk):
+    conn = sqlite3.connect(filename)
+    res = {name: time_query(conn, sql, params)
+           for name, (sql, params) in get_queries(conn, fk).items()}
+    conn.close()
+    return res
+
+
+def main():
+    transactions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = f'{tmp_dir}/kitmi.db'
+
+        print(f'Creating a DB with {transactions_count} transactions')
+        create_old_db(filename, transactions_count)
+        size_before = get_compacted_size(filename)
+
+        # the foreign key columns are declared INTEGER while the string
+        # primary keys aren't, so (as the app did) compare them as strings
+        before = bench(filename, lambda column: f'CAST({column} AS VARCHAR)')
+
+        db.migrations.migrate(filename)
+        size_after = get_compacted_size(filename)
+
+        after = bench(filename, lambda column: column)
+
+    print(f'{"query":45} {"before (ms)":>12} {"after (ms)":>12}')
+    for name in before:
+        print(f'{name:45} {before[name]:12.1f} {after[name]:12.1f}')
+    print(f'{"DB file size (MB)":45} {size_before / 2**20:12.1f} {size_after / 2**20:12.1f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+""" Benchmark the summary sources.
+
+Builds a DB with synthetic transactions and times summaries made from
+every transaction (TransactionsSource) against summaries of sums made in
+the db (AggregatedTransactionsSource), of sums read from the monthly
+rollup (MonthlyRollupSource) and of totals taken from the cumulative daily
+sums (PrefixSumSource, timed once its index is built), checking that all
+give the same result.
+
+Run from the server directory:
+    python -m bench.bench_summary [transactions_count]
+"""
+import sys
+import time
+import asyncio
+import datetime
+import tempfile
+import statistics
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import db.globals
+import summarize.options
+import summarize.summarizer
+from summarize.transactions_source import TransactionsSource
+from summarize.aggregated_transactions_source import AggregatedTransactionsSource
+from summarize.monthly_rollup_source import MonthlyRollupSource
+from summarize.prefix_sum_source import PrefixSumSource
+import summarize.prefix_sum_index
+from bench.bench_indexes import create_db, FIRST_DATE, DAYS_COUNT
+
+REPEAT = 5
+
+
+def get_summaries():
+    """ Return the summaries to time: name => (start_date, end_date, options) """
+
+    def options(group_by, bucket_by):
+        return summarize.options.SummaryOptions(
+            is_expense=True,
+            group_by=summarize.options.SummaryGroupBy(group_by),
+            bucket_by=summarize.options.SummaryBucketBy(bucket_by),
+            merge_under_threshold=False)
+
+    last_date = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT - 1)
+    month_start = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT // 2)
+    month_end = month_start + datetime.timedelta(days=30)
+    year_end = month_start + datetime.timedelta(days=364)
+
+    return {
+        '10 years, monthly, by subcategory': (FIRST_DATE, last_date, options('subcategory', 'month')),
+        '10 years, monthly, by category': (FIRST_DATE, last_date, options('category', 'month')),
+        '10 years, one range, by subcategory': (FIRST_DATE, last_date, options('subcategory', 'range')),
+        '5 years from mid-month, monthly': (month_start, last_date, options('subcategory', 'month')),
+        'one month, by subcategory': (month_start, month_end, options('subcategory', 'range')),
+        '10 years, yearly, by subcategory': (FIRST_DATE, last_date, options('subcategory', 'year')),
+        '10 years, quarterly, by subcategory': (FIRST_DATE, last_date, options('subcategory', 'quarter')),
+        'one year, weekly, by subcategory': (month_start, year_end, options('subcategory', 'week')),
+        'one month, daily, by subcategory': (month_start, month_end, options('subcategory', 'day')),
+        '90 days, one range, by category': (last_date - datetime.timedelta(days=89), last_date,
+                                            options('category', 'range')),
+    }
+
+
+async def summarize_with(source_class, start_date, end_date, options):
+    async with db.globals.session_maker() as session:
+        source = source_class(session, start_date, end_date, options)
+        await source.load()
+    return summarize.summarizer.Summarizer.execute(source)
+
+
+async def time_summary(source_class, start_date, end_date, options):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        summary = await summarize_with(source_class, start_date, end_date, options)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, summary
+
+
+async def main():
+    transactions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = f'{tmp_dir}/kitmi.db'
+
+        print(f'Creating a DB with {transactions_count} transactions')
+        create_db(filename, transactions_count)
+
+        db.globals.engine = create_async_engine(f'sqlite+aiosqlite:///{filename}')
+        db.globals.session_maker = sessionmaker(
+            bind=db.globals.engine, class_=AsyncSession, expire_on_commit=False)
+
+        source_classes = [TransactionsSource, AggregatedTransactionsSource, MonthlyRollupSource,
+                          PrefixSumSource]
+
+        start = time.perf_counter()
+        async with db.globals.session_maker() as session:
+            await summarize.prefix_sum_index.get_index(session)
+        print(f'Built the prefix sum index in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        print(f'{"summary":40} {"per transaction (ms)":>21} {"aggregated (ms)":>16} '
+              f'{"rollup (ms)":>12} {"prefix sums (ms)":>17}')
+        for name, (start_date, end_date, options) in get_summaries().items():
+            timings = []
+            expected_groups = None
+            for source_class in source_classes:
+                if source_class is MonthlyRollupSource and not source_class.supports(options):
+                    timings.append(None)
+                    continue
+
+                (timing, summary) = await time_summary(source_class, start_date, end_date, options)
+                timings.append(timing)
+
+                groups = {g_id: g.data for g_id, g in summary.groups.items()}
+                if expected_groups is None:
+                    expected_groups = groups
+                elif groups != expected_groups:
+                    raise Exception(f'{name}: the summaries are different')
+
+            rollup_timing = '-' if timings[2] is None else f'{timings[2]:.1f}'
+            print(f'{name:40} {timings[0]:21.1f} {timings[1]:16.1f} {rollup_timing:>12} '
+                  f'{timings[3]:17.1f}')
+
+        await db.globals.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
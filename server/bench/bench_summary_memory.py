@@ -0,0 +1,83 @@
+""" Benchmark the peak memory of summaries made from every transaction.
+
+Builds a DB with synthetic transactions and measures (with tracemalloc)
+the peak memory of loading and summarizing a 10-year monthly summary with
+TransactionsSource loading all the transactions at once, against streaming
+them in chunks, checking that both give the same result.
+
+Run from the server directory:
+    python -m bench.bench_summary_memory [transactions_count]
+"""
+import sys
+import time
+import asyncio
+import datetime
+import tempfile
+import tracemalloc
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import db.globals
+import summarize.options
+from summarize.matrix_summarizer import MatrixSummarizer
+from summarize.transactions_source import TransactionsSource
+from bench.bench_indexes import create_db, FIRST_DATE, DAYS_COUNT
+
+CHUNK_SIZES = [None, 100000, 10000, 1000]
+
+
+async def measure(chunk_size):
+    """ Return (peak memory in MB, time in seconds, summary) """
+
+    options = summarize.options.SummaryOptions(
+        is_expense=True,
+        group_by=summarize.options.SummaryGroupBy.subcategory,
+        bucket_by=summarize.options.SummaryBucketBy.month,
+        merge_under_threshold=False)
+    last_date = FIRST_DATE + datetime.timedelta(days=DAYS_COUNT - 1)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    async with db.globals.session_maker() as session:
+        source = TransactionsSource(session, FIRST_DATE, last_date, options, chunk_size)
+        await source.load()
+        summary = MatrixSummarizer.execute(source)
+
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / 2**20, elapsed, summary
+
+
+async def main():
+    transactions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = f'{tmp_dir}/kitmi.db'
+
+        print(f'Creating a DB with {transactions_count} transactions')
+        create_db(filename, transactions_count)
+
+        db.globals.engine = create_async_engine(f'sqlite+aiosqlite:///{filename}')
+        db.globals.session_maker = sessionmaker(
+            bind=db.globals.engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f'{"chunk size":>12} {"peak memory (MB)":>17} {"time (s)":>9}')
+        expected = None
+        for chunk_size in CHUNK_SIZES:
+            (peak, elapsed, summary) = await measure(chunk_size)
+
+            if expected is None:
+                expected = summary
+            elif summary.data.tolist() != expected.data.tolist():
+                raise Exception(f'chunk size {chunk_size}: the summaries are different')
+
+            name = 'all at once' if chunk_size is None else chunk_size
+            print(f'{name:>12} {peak:17.1f} {elapsed:9.1f}')
+
+        await db.globals.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,7 +27,7 @@ async def create_account(
 
 async def update_account(
         session: AsyncSession,
-        account_id: str,
+        account_id: int,
         name: str | None = None,
         source: AccountSource | None = None,
         username: str | None = None,
@@ -49,7 +49,7 @@ async def update_account(
 
 async def delete_account(
         session: AsyncSession,
-        account_id: str) -> int:
+        account_id: int) -> int:
     # check if this account has any transactions
     sql = sqlalchemy.select(Transaction).\
         where(Transaction.account_id == account_id).limit(1)
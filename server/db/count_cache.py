@@ -0,0 +1,31 @@
+from typing import Dict, Hashable
+from sqlalchemy.ext.asyncio import AsyncSession
+import db.data_version
+
+# In-process cache of COUNT(*) query results, e.g. the total number of
+# uncategorized transactions. All cached counts were computed at _version
+# of the data; they're dropped as soon as the data version changes.
+_version = None
+_counts: Dict[Hashable, int] = {}
+
+
+async def get_count(session: AsyncSession, key: Hashable, sql) -> int:
+    """ Return the result of the given count query. The key identifies the
+    query (e.g. table name and filter) for caching. """
+
+    global _version
+
+    version = await db.data_version.get_data_version(session)
+    if version != _version:
+        _counts.clear()
+        _version = version
+
+    count = _counts.get(key)
+    if count is None:
+        count = (await session.execute(sql)).scalar()
+
+        # don't cache the count if the data changed while it was computed
+        if version == _version:
+            _counts[key] = count
+
+    return count
@@ -0,0 +1,23 @@
+import json
+import base64
+import datetime
+from typing import Any, Tuple
+
+
+def encode_cursor(order_by_value: Any, id_: Any) -> str:
+    """ Return an opaque cursor that points right after the item with the
+    given value of the ordering attribute and the given id """
+    data = json.dumps([order_by_value, id_], default=str)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, order_by_column) -> Tuple[Any, Any]:
+    """ Return the (order_by_value, id) encoded in the given cursor.
+    The value is converted back to the python type of the given column. """
+    try:
+        (value, id_) = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if value is not None and order_by_column.type.python_type is datetime.date:
+            value = datetime.date.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise Exception('invalid cursor')
+    return value, id_
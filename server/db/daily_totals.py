@@ -0,0 +1,67 @@
+# The daily_totals table (db.schema.DailyTotal) holds the sum and count of
+# the categorized transactions per day and effective subcategory. The
+# summaries of arbitrary date ranges are made from its cumulative sums (see
+# summarize.prefix_sum_index), so that the total of any range is two
+# lookups rather than a scan of its transactions.
+#
+# Like monthly_rollup (see db.monthly_rollup), it's kept up-to-date
+# incrementally by the triggers below. New DB files get the triggers
+# through db.schema (after create_all), existing DB files through
+# db.migrations. The triggers are dropped together with the transactions
+# table, so a migration step that rebuilds it has to create them again (and
+# rebuild the totals).
+
+
+def _add(row):
+    return (
+        "INSERT INTO daily_totals (date, subcategory_id, sum, count) "
+        f"VALUES ({row}.date, {row}.effective_subcategory_id, {row}.amount, 1) "
+        "ON CONFLICT (date, subcategory_id) DO UPDATE "
+        "SET sum = sum + excluded.sum, count = count + excluded.count; ")
+
+
+def _subtract(row):
+    where = f"WHERE date = {row}.date " \
+            f"AND subcategory_id = {row}.effective_subcategory_id"
+    return (
+        f"UPDATE daily_totals SET sum = sum - {row}.amount, count = count - 1 {where}; "
+        f"DELETE FROM daily_totals {where} AND count = 0; ")
+
+
+# an update of any of these columns moves a transaction between rows
+_CHANGED = "(old.date IS NOT new.date OR old.amount IS NOT new.amount " \
+           "OR old.effective_subcategory_id IS NOT new.effective_subcategory_id)"
+
+_UPDATE_OF = "AFTER UPDATE OF date, amount, effective_subcategory_id ON transactions"
+
+DAILY_TOTALS_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS daily_totals_insert AFTER INSERT ON transactions "
+    "WHEN new.effective_subcategory_id IS NOT NULL BEGIN "
+    + _add("new") +
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS daily_totals_delete AFTER DELETE ON transactions "
+    "WHEN old.effective_subcategory_id IS NOT NULL BEGIN "
+    + _subtract("old") +
+    "END",
+
+    f"CREATE TRIGGER IF NOT EXISTS daily_totals_update_old {_UPDATE_OF} "
+    f"WHEN old.effective_subcategory_id IS NOT NULL AND {_CHANGED} BEGIN "
+    + _subtract("old") +
+    "END",
+
+    f"CREATE TRIGGER IF NOT EXISTS daily_totals_update_new {_UPDATE_OF} "
+    f"WHEN new.effective_subcategory_id IS NOT NULL AND {_CHANGED} BEGIN "
+    + _add("new") +
+    "END",
+]
+
+# sum up the transactions that existed before the triggers were created
+DAILY_TOTALS_POPULATE = [
+    "DELETE FROM daily_totals",
+
+    "INSERT INTO daily_totals (date, subcategory_id, sum, count) "
+    "SELECT date, effective_subcategory_id, sum(amount), count(*) "
+    "FROM transactions WHERE effective_subcategory_id IS NOT NULL "
+    "GROUP BY 1, 2",
+]
@@ -0,0 +1,28 @@
+import sqlalchemy
+import sqlalchemy.dialects.sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import DataVersion
+
+# the ID of the single row in the data_version table
+_ROW_ID = 1
+
+
+async def get_data_version(session: AsyncSession) -> int:
+    sql = sqlalchemy.select(DataVersion.version).where(DataVersion.id == _ROW_ID)
+    version = (await session.execute(sql)).scalar()
+    return 0 if version is None else version
+
+
+async def bump_data_version(session: AsyncSession) -> None:
+    """ Mark all results computed from the current data as stale.
+    Call this after committing any write (every mutation, and a sync that
+    stored transactions). """
+
+    # INSERT INTO data_version ... ON CONFLICT DO UPDATE SET version = version + 1
+    stmt = sqlalchemy.dialects.sqlite.insert(DataVersion) \
+        .values(id=_ROW_ID, version=1) \
+        .on_conflict_do_update(
+            index_elements=[DataVersion.id],
+            set_={'version': DataVersion.version + 1})
+    await session.execute(stmt)
+    await session.commit()
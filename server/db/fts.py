@@ -0,0 +1,109 @@
+import sqlalchemy
+
+# Full-text search (FTS5) over payee names and notes and over transaction
+# notes.
+#
+# The FTS tables are external content tables - they only hold the index,
+# and are kept up-to-date with payees/transactions by the triggers below.
+# Transactions without a note (nearly all of them) aren't indexed at all,
+# so that storing synced transactions doesn't write to the index: the
+# content of transactions_fts is a view of the transactions that have one.
+#
+# New DB files get these through db.schema (after create_all), existing
+# DB files through db.migrations. The triggers are dropped together with
+# their table, so a migration step that rebuilds payees or transactions
+# has to create them again.
+
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS payees_fts USING fts5("
+    "name, note, content='payees', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS payees_fts_insert AFTER INSERT ON payees BEGIN "
+    "INSERT INTO payees_fts (rowid, name, note) VALUES (new.id, new.name, new.note); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS payees_fts_delete AFTER DELETE ON payees BEGIN "
+    "INSERT INTO payees_fts (payees_fts, rowid, name, note) "
+    "VALUES ('delete', old.id, old.name, old.note); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS payees_fts_update AFTER UPDATE OF name, note ON payees BEGIN "
+    "INSERT INTO payees_fts (payees_fts, rowid, name, note) "
+    "VALUES ('delete', old.id, old.name, old.note); "
+    "INSERT INTO payees_fts (rowid, name, note) VALUES (new.id, new.name, new.note); "
+    "END",
+
+    "CREATE VIEW IF NOT EXISTS transactions_with_note AS "
+    "SELECT id, note FROM transactions WHERE coalesce(note, '') != ''",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "note, content='transactions_with_note', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions "
+    "WHEN coalesce(new.note, '') != '' BEGIN "
+    "INSERT INTO transactions_fts (rowid, note) VALUES (new.id, new.note); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions "
+    "WHEN coalesce(old.note, '') != '' BEGIN "
+    "INSERT INTO transactions_fts (transactions_fts, rowid, note) "
+    "VALUES ('delete', old.id, old.note); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update_old AFTER UPDATE OF note ON transactions "
+    "WHEN coalesce(old.note, '') != '' BEGIN "
+    "INSERT INTO transactions_fts (transactions_fts, rowid, note) "
+    "VALUES ('delete', old.id, old.note); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update_new AFTER UPDATE OF note ON transactions "
+    "WHEN coalesce(new.note, '') != '' BEGIN "
+    "INSERT INTO transactions_fts (rowid, note) VALUES (new.id, new.note); "
+    "END",
+]
+
+# index the rows that existed before the FTS tables were created
+FTS_POPULATE = [
+    "INSERT INTO payees_fts (payees_fts) VALUES ('rebuild')",
+    "INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')",
+]
+
+payees_fts = sqlalchemy.table(
+    "payees_fts", sqlalchemy.column("rowid"), sqlalchemy.column("payees_fts"))
+
+transactions_fts = sqlalchemy.table(
+    "transactions_fts", sqlalchemy.column("rowid"), sqlalchemy.column("transactions_fts"))
+
+# bm25 weights of the payees_fts columns: a match in the name
+# counts much more than a match in the note
+PAYEES_RANK_WEIGHTS = (10.0, 1.0)
+
+
+def to_match_query(search: str) -> str | None:
+    """ Return an FTS5 query that matches the rows that contain every word
+    of the given search, each word as a prefix (so that "sup mar" matches
+    "Super Market"). Return None if the search has no words. """
+    words = search.split()
+    if len(words) == 0:
+        return None
+
+    # quote every word, so that FTS5 query syntax in the search is ignored
+    return ' '.join('"' + w.replace('"', '""') + '"*' for w in words)
+
+
+def match_payees(match_query: str):
+    """ Return a where clause on payees_fts that matches the given FTS5 query """
+    return payees_fts.c.payees_fts.match(match_query)
+
+
+def payees_rank():
+    """ Return the rank of a payees_fts row matched by match_payees()
+    (lower is better) """
+    return sqlalchemy.func.bm25(sqlalchemy.literal_column("payees_fts"), *PAYEES_RANK_WEIGHTS)
+
+
+def match_transactions(match_query: str):
+    """ Return a where clause on transactions_fts that matches the given FTS5 query """
+    return transactions_fts.c.transactions_fts.match(match_query)
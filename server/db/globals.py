@@ -1,5 +1,11 @@
-# global DB engine
+# global DB engine (a single connection, for writes)
 engine = None
 
-# global DB session maker
+# global DB session maker (for writes)
 session_maker = None
+
+# global DB engine for read-only queries (a pool of connections)
+reader_engine = None
+
+# global DB session maker for read-only queries
+reader_session_maker = None
@@ -1,32 +1,72 @@
 from pathlib import Path
 from sqlalchemy import event, create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 import crypto
 import db.name
 import db.globals
 import db.schema
+import db.migrations
+import db.profile
 
 
 def init_db() -> None:
 
     crypto.Crypto.generate_key()
     _create_db_file(db.name.DB_FILENAME)
+    db.migrations.migrate(db.name.DB_FILENAME)
 
-    print(f'Creating DB engine ({db.name.DB_FILENAME})')
+    profile = db.profile.get_profile(db.name.DB_PROFILE)
 
-    db.globals.engine = create_async_engine(
-        f'sqlite+aiosqlite:///{db.name.DB_FILENAME}')
+    print(f'Creating DB engines ({db.name.DB_FILENAME}, profile: {db.name.DB_PROFILE})')
+
+    # all writes go through a single connection
+    db.globals.engine = _create_engine(profile, 1, read_only=False)
+    db.globals.session_maker = _create_session_maker(db.globals.engine)
+
+    # read-only queries use a pool of reader connections
+    db.globals.reader_engine = _create_engine(profile, profile.readers_count, read_only=True)
+    db.globals.reader_session_maker = _create_session_maker(db.globals.reader_engine)
+
+
+def _create_engine(profile: db.profile.DbProfile, pool_size: int, read_only: bool):
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{db.name.DB_FILENAME}',
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0)
+
+    # set the pragmas on every new connection
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        pragmas = {
+            # add enforcement for foreign keys
+            'foreign_keys': 'ON',
+            'synchronous': profile.synchronous,
+            'cache_size': profile.cache_size,
+            'mmap_size': profile.mmap_size,
+            'temp_store': profile.temp_store,
+        }
+
+        if read_only:
+            pragmas['query_only'] = 'ON'
+        else:
+            # journal_mode is persistent, the writer takes care of it
+            pragmas['journal_mode'] = profile.journal_mode
 
-    # add enforcement for foreign keys
-    @event.listens_for(db.globals.engine.sync_engine, "connect")
-    def enable_sqlite_fks(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for name, value in pragmas.items():
+            if value is not None:
+                cursor.execute(f"PRAGMA {name}={value}")
         cursor.close()
 
-    db.globals.session_maker = sessionmaker(
-        bind=db.globals.engine,
+    return engine
+
+
+def _create_session_maker(engine):
+    return sessionmaker(
+        bind=engine,
         class_=AsyncSession,
         expire_on_commit=False,
         autocommit=False,
@@ -41,4 +81,9 @@ def _create_db_file(filename):
         print(f'Creating DB ({filename})')
         sync_engine = create_engine(f'sqlite+pysqlite:///{filename}')
         db.schema.Base.metadata.create_all(sync_engine)
+
+        # the schema is already up-to-date, no need to migrate it
+        with sync_engine.begin() as conn:
+            conn.exec_driver_sql(
+                f'PRAGMA user_version = {db.migrations.LATEST_VERSION}')
         sync_engine.dispose()
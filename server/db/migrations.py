@@ -0,0 +1,277 @@
+import sqlite3
+import db.fts
+import db.monthly_rollup
+import db.daily_totals
+
+# Versioned migrations for existing DB files.
+#
+# The schema version of a DB file is kept in SQLite's user_version pragma.
+# A new DB file is created directly from db.schema and stamped with
+# LATEST_VERSION. An existing DB file gets every step above its version
+# applied, in order, each step in its own transaction.
+
+
+def _add_transactions_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS ix_transactions_date '
+        'ON transactions (date)')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS ix_transactions_account_id_date '
+        'ON transactions (account_id, date)')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS ix_transactions_payee_id '
+        'ON transactions (payee_id)')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS ix_transactions_subcategory_id '
+        'ON transactions (subcategory_id)')
+
+
+def _add_data_version(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS data_version ('
+        'id INTEGER NOT NULL, '
+        'version INTEGER NOT NULL, '
+        'PRIMARY KEY (id))')
+
+
+def _add_effective_subcategory_id(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'ALTER TABLE transactions ADD COLUMN effective_subcategory_id INTEGER '
+        'REFERENCES subcategories (id) ON DELETE SET NULL')
+    conn.execute(
+        'UPDATE transactions SET effective_subcategory_id = '
+        'CASE WHEN override_subcategory THEN subcategory_id '
+        'ELSE (SELECT payees.subcategory_id FROM payees '
+        'WHERE payees.id = CAST(transactions.payee_id AS VARCHAR)) END')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS ix_transactions_effective_subcategory_id_date '
+        'ON transactions (effective_subcategory_id, date)')
+
+
+def _create_transactions_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute('CREATE INDEX ix_transactions_date ON transactions (date)')
+    conn.execute('CREATE INDEX ix_transactions_account_id_date ON transactions (account_id, date)')
+    conn.execute('CREATE INDEX ix_transactions_payee_id ON transactions (payee_id)')
+    conn.execute('CREATE INDEX ix_transactions_subcategory_id ON transactions (subcategory_id)')
+    conn.execute(
+        'CREATE INDEX ix_transactions_effective_subcategory_id_date '
+        'ON transactions (effective_subcategory_id, date)')
+
+
+def _use_integer_ids(conn: sqlite3.Connection) -> None:
+    # Rebuild the tables with INTEGER primary keys instead of string UUIDs.
+    # Every row keeps its rowid as its new ID, and the foreign keys are
+    # mapped from the old string IDs to the rowids of the referenced rows.
+    # The old string ID of a transaction (as given by its source) is kept
+    # as its external_id.
+    # Foreign keys aren't enforced on this connection, so the tables can be
+    # dropped and renamed in any order.
+
+    def new_id(table, column):
+        return f'(SELECT rowid FROM {table} WHERE id = CAST(t.{column} AS VARCHAR))'
+
+    conn.execute(
+        'CREATE TABLE accounts_new ('
+        'id INTEGER NOT NULL, '
+        'name VARCHAR NOT NULL, '
+        'source VARCHAR(5) NOT NULL, '
+        'username VARCHAR NOT NULL, '
+        'password VARCHAR NOT NULL, '
+        'last_synced DATE, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (name))')
+    conn.execute(
+        'INSERT INTO accounts_new '
+        'SELECT rowid, name, source, username, password, last_synced FROM accounts')
+
+    conn.execute(
+        'CREATE TABLE categories_new ('
+        'id INTEGER NOT NULL, '
+        'name VARCHAR NOT NULL, '
+        'is_expense BOOLEAN NOT NULL, '
+        '"order" INTEGER NOT NULL, '
+        'exclude_from_reports BOOLEAN NOT NULL, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (name))')
+    conn.execute(
+        'INSERT INTO categories_new '
+        'SELECT rowid, name, is_expense, "order", exclude_from_reports FROM categories')
+
+    conn.execute(
+        'CREATE TABLE subcategories_new ('
+        'id INTEGER NOT NULL, '
+        'name VARCHAR NOT NULL, '
+        'category_id INTEGER NOT NULL, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (name), '
+        'FOREIGN KEY(category_id) REFERENCES categories (id))')
+    conn.execute(
+        'INSERT INTO subcategories_new '
+        f'SELECT t.rowid, t.name, {new_id("categories", "category_id")} '
+        'FROM subcategories t')
+
+    conn.execute(
+        'CREATE TABLE payees_new ('
+        'id INTEGER NOT NULL, '
+        'name VARCHAR NOT NULL, '
+        'subcategory_id INTEGER, '
+        'note VARCHAR, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (name), '
+        'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)')
+    conn.execute(
+        'INSERT INTO payees_new '
+        f'SELECT t.rowid, t.name, {new_id("subcategories", "subcategory_id")}, t.note '
+        'FROM payees t')
+
+    conn.execute(
+        'CREATE TABLE transactions_new ('
+        'id INTEGER NOT NULL, '
+        'external_id VARCHAR NOT NULL, '
+        'date DATE NOT NULL, '
+        'amount FLOAT NOT NULL, '
+        'account_id INTEGER NOT NULL, '
+        'payee_id INTEGER NOT NULL, '
+        'override_subcategory BOOLEAN NOT NULL, '
+        'subcategory_id INTEGER, '
+        'note VARCHAR, '
+        'effective_subcategory_id INTEGER, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (external_id), '
+        'FOREIGN KEY(account_id) REFERENCES accounts (id), '
+        'FOREIGN KEY(payee_id) REFERENCES payees (id), '
+        'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL, '
+        'FOREIGN KEY(effective_subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)')
+    conn.execute(
+        'INSERT INTO transactions_new '
+        'SELECT t.rowid, t.id, t.date, t.amount, '
+        f'{new_id("accounts", "account_id")}, '
+        f'{new_id("payees", "payee_id")}, '
+        't.override_subcategory, '
+        f'{new_id("subcategories", "subcategory_id")}, '
+        't.note, '
+        f'{new_id("subcategories", "effective_subcategory_id")} '
+        'FROM transactions t')
+
+    tables = ['accounts', 'categories', 'subcategories', 'payees', 'transactions']
+    for table in tables:
+        conn.execute(f'DROP TABLE {table}')
+    for table in tables:
+        conn.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+
+    # the transactions indexes were dropped with the old table
+    _create_transactions_indexes(conn)
+
+    if conn.execute('PRAGMA foreign_key_check').fetchone() is not None:
+        raise Exception('foreign key constraint failed while migrating to integer IDs')
+
+
+def _use_integer_amounts(conn: sqlite3.Connection) -> None:
+    # Rebuild the transactions table with an INTEGER amount column (in minor
+    # units), rather than only converting the values, so that the column
+    # doesn't keep REAL affinity and SUM() over it stays an exact integer.
+
+    conn.execute(
+        'CREATE TABLE transactions_new ('
+        'id INTEGER NOT NULL, '
+        'external_id VARCHAR NOT NULL, '
+        'date DATE NOT NULL, '
+        'amount INTEGER NOT NULL, '
+        'account_id INTEGER NOT NULL, '
+        'payee_id INTEGER NOT NULL, '
+        'override_subcategory BOOLEAN NOT NULL, '
+        'subcategory_id INTEGER, '
+        'note VARCHAR, '
+        'effective_subcategory_id INTEGER, '
+        'PRIMARY KEY (id), '
+        'UNIQUE (external_id), '
+        'FOREIGN KEY(account_id) REFERENCES accounts (id), '
+        'FOREIGN KEY(payee_id) REFERENCES payees (id), '
+        'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL, '
+        'FOREIGN KEY(effective_subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)')
+    conn.execute(
+        'INSERT INTO transactions_new '
+        'SELECT id, external_id, date, CAST(ROUND(amount * 100) AS INTEGER), account_id, '
+        'payee_id, override_subcategory, subcategory_id, note, effective_subcategory_id '
+        'FROM transactions')
+    conn.execute('DROP TABLE transactions')
+    conn.execute('ALTER TABLE transactions_new RENAME TO transactions')
+    _create_transactions_indexes(conn)
+
+
+def _add_full_text_search(conn: sqlite3.Connection) -> None:
+    for statement in db.fts.FTS_DDL + db.fts.FTS_POPULATE:
+        conn.execute(statement)
+
+
+def _add_monthly_rollup(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'CREATE TABLE monthly_rollup ('
+        'month VARCHAR NOT NULL, '
+        'subcategory_id INTEGER NOT NULL, '
+        'account_id INTEGER NOT NULL, '
+        'sum INTEGER NOT NULL, '
+        'count INTEGER NOT NULL, '
+        'PRIMARY KEY (month, subcategory_id, account_id))')
+    for statement in db.monthly_rollup.ROLLUP_DDL + db.monthly_rollup.ROLLUP_POPULATE:
+        conn.execute(statement)
+
+
+def _add_daily_totals(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        'CREATE TABLE daily_totals ('
+        'date DATE NOT NULL, '
+        'subcategory_id INTEGER NOT NULL, '
+        'sum INTEGER NOT NULL, '
+        'count INTEGER NOT NULL, '
+        'PRIMARY KEY (date, subcategory_id))')
+    for statement in db.daily_totals.DAILY_TOTALS_DDL + db.daily_totals.DAILY_TOTALS_POPULATE:
+        conn.execute(statement)
+
+
+# Step N (1-based) upgrades a DB file from version N-1 to version N.
+# Only ever append to this list.
+MIGRATIONS = [
+    _add_transactions_indexes,
+    _add_data_version,
+    _add_effective_subcategory_id,
+    _use_integer_ids,
+    _use_integer_amounts,
+    _add_full_text_search,
+    _add_monthly_rollup,
+    _add_daily_totals,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def set_version(conn: sqlite3.Connection, version: int) -> None:
+    # pragmas don't accept bound parameters
+    conn.execute(f'PRAGMA user_version = {int(version)}')
+
+
+def migrate(filename: str) -> None:
+    """ Apply all pending migration steps to the given DB file """
+
+    # isolation_level=None - transactions are managed explicitly below
+    conn = sqlite3.connect(filename, isolation_level=None)
+    try:
+        version = get_version(conn)
+        for step_idx in range(version, LATEST_VERSION):
+            step = MIGRATIONS[step_idx]
+            print(f'Migrating DB to version {step_idx + 1} ({step.__name__})')
+
+            conn.execute('BEGIN')
+            try:
+                step(conn)
+                set_version(conn, step_idx + 1)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+    finally:
+        conn.close()
@@ -0,0 +1,76 @@
+# The monthly_rollup table (db.schema.MonthlyRollup) holds the sum and count
+# of the categorized transactions per month, effective subcategory and
+# account, so that monthly summaries don't have to read every transaction.
+#
+# It is kept up-to-date incrementally by the triggers below: storing synced
+# transactions, recategorizing transactions or payees (which update
+# effective_subcategory_id) and deleting subcategories (which sets it to
+# NULL) each add to / subtract from only the rows they affect.
+# Transactions with no effective subcategory aren't rolled up.
+#
+# New DB files get the triggers through db.schema (after create_all),
+# existing DB files through db.migrations. The triggers are dropped
+# together with the transactions table, so a migration step that rebuilds
+# it has to create them again (and rebuild the rollup).
+
+# transactions dates are stored as 'YYYY-MM-DD', so their month ('YYYY-MM')
+# is a prefix
+_MONTH = "substr({row}.date, 1, 7)"
+
+
+def _add(row):
+    return (
+        "INSERT INTO monthly_rollup (month, subcategory_id, account_id, sum, count) "
+        f"VALUES ({_MONTH.format(row=row)}, {row}.effective_subcategory_id, "
+        f"{row}.account_id, {row}.amount, 1) "
+        "ON CONFLICT (month, subcategory_id, account_id) DO UPDATE "
+        "SET sum = sum + excluded.sum, count = count + excluded.count; ")
+
+
+def _subtract(row):
+    where = f"WHERE month = {_MONTH.format(row=row)} " \
+            f"AND subcategory_id = {row}.effective_subcategory_id " \
+            f"AND account_id = {row}.account_id"
+    return (
+        f"UPDATE monthly_rollup SET sum = sum - {row}.amount, count = count - 1 {where}; "
+        f"DELETE FROM monthly_rollup {where} AND count = 0; ")
+
+
+# an update of any of these columns moves a transaction between rollup rows
+_CHANGED = "(old.date IS NOT new.date OR old.amount IS NOT new.amount " \
+           "OR old.account_id IS NOT new.account_id " \
+           "OR old.effective_subcategory_id IS NOT new.effective_subcategory_id)"
+
+_UPDATE_OF = "AFTER UPDATE OF date, amount, account_id, effective_subcategory_id ON transactions"
+
+ROLLUP_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS monthly_rollup_insert AFTER INSERT ON transactions "
+    "WHEN new.effective_subcategory_id IS NOT NULL BEGIN "
+    + _add("new") +
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS monthly_rollup_delete AFTER DELETE ON transactions "
+    "WHEN old.effective_subcategory_id IS NOT NULL BEGIN "
+    + _subtract("old") +
+    "END",
+
+    f"CREATE TRIGGER IF NOT EXISTS monthly_rollup_update_old {_UPDATE_OF} "
+    f"WHEN old.effective_subcategory_id IS NOT NULL AND {_CHANGED} BEGIN "
+    + _subtract("old") +
+    "END",
+
+    f"CREATE TRIGGER IF NOT EXISTS monthly_rollup_update_new {_UPDATE_OF} "
+    f"WHEN new.effective_subcategory_id IS NOT NULL AND {_CHANGED} BEGIN "
+    + _add("new") +
+    "END",
+]
+
+# roll up the transactions that existed before the triggers were created
+ROLLUP_POPULATE = [
+    "DELETE FROM monthly_rollup",
+
+    "INSERT INTO monthly_rollup (month, subcategory_id, account_id, sum, count) "
+    "SELECT substr(date, 1, 7), effective_subcategory_id, account_id, sum(amount), count(*) "
+    "FROM transactions WHERE effective_subcategory_id IS NOT NULL "
+    "GROUP BY 1, 2, 3",
+]
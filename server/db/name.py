@@ -5,3 +5,6 @@ if db_path is None:
     db_path = "."
 
 DB_FILENAME = f'{db_path}/kitmi.db'
+
+# name of the SQLite connection profile (see db.profile.PROFILES)
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
@@ -6,5 +6,10 @@ T = TypeVar("T")
 
 @dataclass
 class PaginationWindow(Generic[T]):
-    total_items_count: int
+    # None if the count wasn't requested
+    total_items_count: int | None
     items: List[T]
+
+    # cursor of the next pagination window (None if this is the last one)
+    next_cursor: str | None = None
+    has_more: bool = False
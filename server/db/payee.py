@@ -1,8 +1,70 @@
 from typing import List, Dict
+import dataclasses
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy.dialects.sqlite
-from db.schema import Payee
+from db.schema import Payee, Transaction
+from db.payees_filter import PayeesFilter
+from db.pagination_window import PaginationWindow
 import db.utils
+import db.transaction
+import db.count_cache
+import db.fts
+
+
+async def get_payees(
+        session: AsyncSession,
+        order_by: str,
+        db_filter: PayeesFilter | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        cursor: str | None = None,
+        with_count: bool = True) -> PaginationWindow:
+    """
+    Get one pagination window of payees, same as db.utils.get().
+    When the filter has a search, the payees are ranked by how well they
+    match it (best first, then by the given attribute) and the window
+    can only be given by offset.
+    """
+
+    match_query = None if db_filter is None else db_filter.get_match_query()
+    if match_query is None:
+        return await db.utils.get(
+            session, Payee, order_by, db_filter, limit, offset, cursor, with_count)
+
+    if cursor is not None:
+        raise Exception('cursor is not supported with search, use offset')
+
+    # get the items in the pagination window, ranked
+    matches = sqlalchemy.select(
+        db.fts.payees_fts.c.rowid, db.fts.payees_rank().label('rank')). \
+        where(db.fts.match_payees(match_query)). \
+        subquery()
+
+    sql = sqlalchemy.select(Payee).join(matches, matches.c.rowid == Payee.id)
+    sql = dataclasses.replace(db_filter, search=None).apply(sql)
+    sql = sql.order_by(matches.c.rank, getattr(Payee, order_by), Payee.id)
+    if offset:
+        sql = sql.offset(offset)
+    if limit is not None:
+        sql = sql.limit(limit + 1)
+
+    res = await session.execute(sql)
+    items = res.scalars().all()
+
+    # get the total items count
+    total_items_count = None
+    if with_count:
+        sql = sqlalchemy.select([sqlalchemy.func.count()]).select_from(Payee)
+        sql = db_filter.apply(sql)
+        total_items_count = await db.count_cache.get_count(
+            session, (Payee.__tablename__, repr(db_filter)), sql)
+
+    # a ranked window has no cursor
+    has_more = limit is not None and len(items) > limit
+    return PaginationWindow(
+        items=items[:limit] if has_more else items,
+        total_items_count=total_items_count,
+        has_more=has_more)
 
 
 async def create_payees_ignore_conflict(session, names):
@@ -23,7 +85,7 @@ async def create_payees_ignore_conflict(session, names):
 async def create_payee(
         session: AsyncSession,
         name: str,
-        subcategory_id: str | None = None,
+        subcategory_id: int | None = None,
         note: str = "") -> Payee:
 
     # don't allow empty name for payee
@@ -56,8 +118,15 @@ async def update_payee(
     if note is not None:
         values['note'] = note
 
-    return await db.utils.update_values(
-        session, Payee, payee_id, values)
+    rec = await db.utils.update_values(
+        session, Payee, payee_id, values, do_commit=False)
+
+    # the payee's subcategory applies to its non-overridden transactions
+    await db.transaction.update_effective_subcategory_ids(
+        session, Transaction.payee_id == payee_id)
+    await session.commit()
+
+    return rec
 
 
 async def update_payees(
@@ -70,7 +139,16 @@ async def update_payees(
     # dict of payee ID => values
     payees_id_to_values = {p.id: {'subcategory_id': p.subcategory_id} for p in payees}
 
-    return await db.utils.update_many_values(
-        session, Payee, payees_id_to_values)
+    failed_ids = await db.utils.update_many_values(
+        session, Payee, payees_id_to_values, do_commit=False)
+    if failed_ids is not None:
+        return failed_ids
+
+    # the payees' subcategories apply to their non-overridden transactions
+    await db.transaction.update_effective_subcategory_ids(
+        session, Transaction.payee_id.in_(payees_id_to_values.keys()))
+    await session.commit()
+
+    return None
 
 
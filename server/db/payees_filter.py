@@ -1,11 +1,15 @@
 from dataclasses import dataclass
+import sqlalchemy
 from db.i_db_filter import IDbFilter
 from db.schema import Payee
+import db.fts
 
 
 @dataclass
 class PayeesFilter(IDbFilter):
     categorized: bool | None
+    # words that the name or note of the payees should start with
+    search: str | None = None
 
     def apply(self, stmt):
         if self.categorized is not None:
@@ -13,4 +17,15 @@ class PayeesFilter(IDbFilter):
                 stmt = stmt.where(Payee.subcategory_id != None)
             else:
                 stmt = stmt.where(Payee.subcategory_id == None)
+
+        match_query = self.get_match_query()
+        if match_query is not None:
+            matches = sqlalchemy.select(db.fts.payees_fts.c.rowid). \
+                where(db.fts.match_payees(match_query))
+            stmt = stmt.where(Payee.id.in_(matches))
+
         return stmt
+
+    def get_match_query(self) -> str | None:
+        """ Return the FTS5 query for the search, or None if not searching """
+        return None if self.search is None else db.fts.to_match_query(self.search)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DbProfile:
+    """ SQLite connection settings. None means: keep SQLite's default. """
+
+    # PRAGMA journal_mode (set once, by the writer connection)
+    journal_mode: str | None
+
+    # PRAGMA synchronous
+    synchronous: str | None
+
+    # PRAGMA cache_size (negative values are in KiB, positive in pages)
+    cache_size: int | None
+
+    # PRAGMA mmap_size (bytes)
+    mmap_size: int | None
+
+    # PRAGMA temp_store
+    temp_store: str | None
+
+    # number of connections in the pool used by read-only queries
+    readers_count: int
+
+
+PROFILES = {
+    # WAL lets API readers run while a sync is writing, and with
+    # synchronous=NORMAL commits don't fsync (the WAL is synced on
+    # checkpoints instead)
+    'wal': DbProfile(
+        journal_mode='WAL',
+        synchronous='NORMAL',
+        cache_size=-64000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store='MEMORY',
+        readers_count=4),
+
+    # SQLite defaults (rollback journal, fsync on every commit)
+    'legacy': DbProfile(
+        journal_mode=None,
+        synchronous=None,
+        cache_size=None,
+        mmap_size=None,
+        temp_store=None,
+        readers_count=1),
+}
+
+
+def get_profile(name: str) -> DbProfile:
+    profile = PROFILES.get(name)
+    if profile is None:
+        raise Exception(f"unknown DB profile '{name}' (expected one of: {', '.join(PROFILES)})")
+    return profile
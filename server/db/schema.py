@@ -1,8 +1,10 @@
 import enum
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, Enum, Date, ForeignKey, Boolean, Float
-import uuid
+from sqlalchemy import Column, Integer, String, Enum, Date, ForeignKey, Boolean, Index, DDL, event
+import db.fts
+import db.monthly_rollup
+import db.daily_totals
 
 Base = declarative_base()
 
@@ -14,7 +16,7 @@ class AccountSource(enum.Enum):
 
 class Account(Base):
     __tablename__ = "accounts"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     source = Column(Enum(AccountSource), nullable=False)
     username = Column(String, nullable=False)
@@ -27,7 +29,7 @@ class Account(Base):
 
 class Category(Base):
     __tablename__ = "categories"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     is_expense = Column(Boolean, nullable=False)
     order = Column(Integer, nullable=False)
@@ -39,7 +41,7 @@ class Category(Base):
 
 class Subcategory(Base):
     __tablename__ = "subcategories"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     category_id = Column(
         Integer, ForeignKey(Category.id), nullable=False)
@@ -50,7 +52,7 @@ class Subcategory(Base):
 
 class Payee(Base):
     __tablename__ = "payees"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
     subcategory_id = Column(
         Integer, ForeignKey(Subcategory.id, ondelete='SET NULL'), nullable=True)
@@ -64,9 +66,13 @@ class Payee(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
-    id = Column(String, primary_key=True)
+    id = Column(Integer, primary_key=True)
+    # the ID given to the transaction when it was fetched from its source,
+    # used to avoid storing the same transaction twice
+    external_id = Column(String, nullable=False, unique=True)
     date = Column(Date, nullable=False)
-    amount = Column(Float, nullable=False)
+    # in minor units (agorot), see util.to_minor_units()
+    amount = Column(Integer, nullable=False)
     account_id = Column(
         Integer, ForeignKey(Account.id), nullable=False)
     payee_id = Column(
@@ -77,7 +83,83 @@ class Transaction(Base):
     note = Column(String, default="")
     payee = relationship("Payee", back_populates="transactions")
 
+    # The subcategory that the transaction actually belongs to: subcategory_id
+    # if override_subcategory, otherwise the payee's subcategory_id.
+    # Kept up-to-date by db.transaction.update_effective_subcategory_ids()
+    effective_subcategory_id = Column(
+        Integer, ForeignKey(Subcategory.id, ondelete='SET NULL'), nullable=True)
+
+    # when changing these, add a matching step to db.migrations
+    __table_args__ = (
+        Index('ix_transactions_date', 'date'),
+        Index('ix_transactions_account_id_date', 'account_id', 'date'),
+        Index('ix_transactions_payee_id', 'payee_id'),
+        Index('ix_transactions_subcategory_id', 'subcategory_id'),
+        Index('ix_transactions_effective_subcategory_id_date', 'effective_subcategory_id', 'date'),
+    )
+
     def __repr__(self):
-        return f'<Transaction id={self.id} date={self.date} amount={self.amount} ' \
+        return f'<Transaction id={self.id} external_id={self.external_id} ' \
+               f'date={self.date} amount={self.amount} ' \
                f'account_id={self.account_id} payee_id={self.payee_id} ' \
-               f'subcategory_id={self.subcategory_id} note={self.note}>'
+               f'subcategory_id={self.subcategory_id} ' \
+               f'effective_subcategory_id={self.effective_subcategory_id} note={self.note}>'
+
+
+# Single-row table. The version is bumped whenever the data is written, so
+# that results cached in-process can be invalidated (also when the write was
+# done by another process, e.g. kitmi.py sync).
+class DataVersion(Base):
+    __tablename__ = "data_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DataVersion version={self.version}>'
+
+
+# Sum and count of the categorized transactions per month, subcategory
+# (effective_subcategory_id) and account. Kept up-to-date by triggers on
+# transactions (see db.monthly_rollup).
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollup"
+    # 'YYYY-MM'
+    month = Column(String, primary_key=True)
+    subcategory_id = Column(Integer, primary_key=True, autoincrement=False)
+    account_id = Column(Integer, primary_key=True, autoincrement=False)
+    # in minor units
+    sum = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<MonthlyRollup month={self.month} subcategory_id={self.subcategory_id} ' \
+               f'account_id={self.account_id} sum={self.sum} count={self.count}>'
+
+
+# Sum and count of the categorized transactions per day and subcategory
+# (effective_subcategory_id). Kept up-to-date by triggers on transactions
+# (see db.daily_totals).
+class DailyTotal(Base):
+    __tablename__ = "daily_totals"
+    date = Column(Date, primary_key=True)
+    subcategory_id = Column(Integer, primary_key=True, autoincrement=False)
+    # in minor units
+    sum = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<DailyTotal date={self.date} subcategory_id={self.subcategory_id} ' \
+               f'sum={self.sum} count={self.count}>'
+
+
+# the full-text search tables and their triggers (see db.fts)
+for statement in db.fts.FTS_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(statement))
+
+# the triggers that maintain monthly_rollup
+for statement in db.monthly_rollup.ROLLUP_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(statement))
+
+# the triggers that maintain daily_totals
+for statement in db.daily_totals.DAILY_TOTALS_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(statement))
@@ -4,17 +4,18 @@ import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.schema import Transaction, Payee
 import db.utils
+import db.count_cache
 from db.transactions_filter import TransactionsFilter
 from db.pagination_window import PaginationWindow
 
 
-async def get_all_transaction_ids(
+async def get_all_transaction_external_ids(
         session: AsyncSession,
-        account_id: str,
-        start_date: datetime.date) -> List[Transaction]:
-    """ Get the IDs of all transactions from the db that belong
+        account_id: int,
+        start_date: datetime.date) -> List[str]:
+    """ Get the external IDs of all transactions from the db that belong
     to the given account ID and are newer than the given date. """
-    sql = sqlalchemy.select(Transaction.id). \
+    sql = sqlalchemy.select(Transaction.external_id). \
         where(Transaction.account_id == account_id)
     if start_date is not None:
         sql = sql.where(Transaction.date >= start_date)
@@ -28,23 +29,22 @@ async def get_transactions(
         order_by: str,
         db_filter: TransactionsFilter | None = None,
         limit: int | None = None,
-        offset: int = 0) -> PaginationWindow:
+        offset: int = 0,
+        cursor: str | None = None,
+        with_count: bool = True) -> PaginationWindow:
     """
     Get one pagination window of transactions for the given limit
-    and offset, ordered by the given attribute and filtered using the
-    given filters
+    and offset (or cursor), ordered by the given attribute and filtered
+    using the given filters.
+    The total items count is only computed if with_count is True.
     """
 
-    order_by_column = getattr(Transaction, order_by)
-
-    if order_by == 'date':
-        order_by_column = order_by_column.desc()
-
     # get the items in the pagination window
-    sql = sqlalchemy.select(Transaction) if db_filter is None or db_filter.categorized is None \
-        else sqlalchemy.select(Transaction, Payee)
+    sql = sqlalchemy.select(Transaction)
 
-    sql = sql.order_by(order_by_column).limit(limit).offset(offset)
+    # when ordered by date, the newest transactions come first
+    sql = db.utils.paginate(
+        sql, Transaction, order_by, order_by == 'date', limit, offset, cursor)
 
     if db_filter:
         sql = db_filter.apply(sql)
@@ -53,27 +53,24 @@ async def get_transactions(
     items = res.scalars().all()
 
     # get the total items count
-    sql = sqlalchemy.select([sqlalchemy.func.count()])
-
-    sql = sql.select_from(Transaction) if db_filter is None or db_filter.categorized is None \
-        else sql.select_from(Transaction, Payee)
+    total_items_count = None
+    if with_count:
+        sql = sqlalchemy.select([sqlalchemy.func.count()]).select_from(Transaction)
 
-    if db_filter:
-        sql = db_filter.apply(sql)
+        if db_filter:
+            sql = db_filter.apply(sql)
 
-    res = await session.execute(sql)
-    total_items_count = res.scalar()
+        total_items_count = await db.count_cache.get_count(
+            session, (Transaction.__tablename__, repr(db_filter)), sql)
 
-    return PaginationWindow(
-        items=items,
-        total_items_count=total_items_count
-    )
+    return db.utils.make_pagination_window(
+        items, order_by, limit, total_items_count)
 
 
 async def update_transaction(
         session: AsyncSession,
-        transaction_id: str,
-        subcategory_id: str | None,
+        transaction_id: int,
+        subcategory_id: int | None,
         override_subcategory: bool | None = None,
         note: str | None = None) -> db.schema.Transaction:
 
@@ -87,5 +84,30 @@ async def update_transaction(
     if note is not None:
         values['note'] = note
 
-    return await db.utils.update_values(
-        session, Transaction, transaction_id, values)
+    rec = await db.utils.update_values(
+        session, Transaction, transaction_id, values, do_commit=False)
+
+    await update_effective_subcategory_ids(session, Transaction.id == transaction_id)
+    await session.commit()
+
+    await session.refresh(rec)
+    return rec
+
+
+async def update_effective_subcategory_ids(session: AsyncSession, where_clause) -> None:
+    """ Recalculate effective_subcategory_id for the transactions that match
+    the given where clause. Call this (before committing) whenever the
+    subcategory_id or override_subcategory of transactions, or the
+    subcategory_id of their payees, change. """
+
+    payee_subcategory_id = sqlalchemy.select(Payee.subcategory_id). \
+        where(Payee.id == Transaction.payee_id). \
+        scalar_subquery()
+
+    sql = sqlalchemy.update(Transaction). \
+        where(where_clause). \
+        values(effective_subcategory_id=sqlalchemy.case(
+            (Transaction.override_subcategory == True, Transaction.subcategory_id),
+            else_=payee_subcategory_id)). \
+        execution_options(synchronize_session=False)
+    await session.execute(sql)
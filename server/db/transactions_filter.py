@@ -1,33 +1,70 @@
+from typing import List
 from dataclasses import dataclass
-from sqlalchemy import case
+import datetime
+import sqlalchemy
 from db.i_db_filter import IDbFilter
-from db.schema import Transaction, Payee
+from db.schema import Transaction, Subcategory
+import db.fts
 
 
 @dataclass
 class TransactionsFilter(IDbFilter):
     categorized: bool | None
-    payee_id: str | None
+    payee_id: int | None
+    # words that the note of the transactions should start with
+    search: str | None = None
+    # inclusive
+    start_date: datetime.date | None = None
+    end_date: datetime.date | None = None
+    # inclusive, in minor units
+    min_amount: int | None = None
+    max_amount: int | None = None
+    account_ids: List[int] | None = None
+    # by the subcategory that the transactions belong to
+    # (effective_subcategory_id)
+    subcategory_ids: List[int] | None = None
+    category_ids: List[int] | None = None
 
     def apply(self, stmt):
 
         if self.categorized is not None:
-            # need the payee's subcategory for this
-            stmt = stmt.join(Transaction.payee)
             if self.categorized:
-                stmt = stmt.where(
-                    case(
-                        (Transaction.override_subcategory == True, Transaction.subcategory_id != None),
-                        (Transaction.override_subcategory == False, Payee.subcategory_id != None)
-                    ))
+                stmt = stmt.where(Transaction.effective_subcategory_id != None)
             else:
-                stmt = stmt.where(
-                    case(
-                        (Transaction.override_subcategory == True, Transaction.subcategory_id == None),
-                        (Transaction.override_subcategory == False, Payee.subcategory_id == None)
-                    ))
+                stmt = stmt.where(Transaction.effective_subcategory_id == None)
 
         if self.payee_id is not None:
             stmt = stmt.where(Transaction.payee_id == self.payee_id)
 
+        match_query = None if self.search is None else db.fts.to_match_query(self.search)
+        if match_query is not None:
+            matches = sqlalchemy.select(db.fts.transactions_fts.c.rowid). \
+                where(db.fts.match_transactions(match_query))
+            stmt = stmt.where(Transaction.id.in_(matches))
+
+        if self.start_date is not None:
+            stmt = stmt.where(Transaction.date >= self.start_date)
+
+        if self.end_date is not None:
+            stmt = stmt.where(Transaction.date <= self.end_date)
+
+        if self.min_amount is not None:
+            stmt = stmt.where(Transaction.amount >= self.min_amount)
+
+        if self.max_amount is not None:
+            stmt = stmt.where(Transaction.amount <= self.max_amount)
+
+        if self.account_ids is not None:
+            stmt = stmt.where(Transaction.account_id.in_(self.account_ids))
+
+        if self.subcategory_ids is not None:
+            stmt = stmt.where(Transaction.effective_subcategory_id.in_(self.subcategory_ids))
+
+        if self.category_ids is not None:
+            # (a subquery rather than a join, so that the
+            # effective_subcategory_id index can still be used)
+            subcategory_ids = sqlalchemy.select(Subcategory.id). \
+                where(Subcategory.category_id.in_(self.category_ids))
+            stmt = stmt.where(Transaction.effective_subcategory_id.in_(subcategory_ids))
+
         return stmt
@@ -1,9 +1,12 @@
 from typing import TypeVar, Dict, Any, List
+from collections import defaultdict
 import sqlalchemy
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.i_db_filter import IDbFilter
 from db.pagination_window import PaginationWindow
+import db.cursor
+import db.count_cache
 
 
 T = TypeVar("T")
@@ -40,20 +43,19 @@ async def get(
         order_by: str,
         db_filter: IDbFilter | None = None,
         limit: int | None = None,
-        offset: int = 0) -> PaginationWindow:
+        offset: int = 0,
+        cursor: str | None = None,
+        with_count: bool = True) -> PaginationWindow:
     """
     Get one pagination window on the given db class for the given limit
-    and offset, ordered by the given attribute and filtered using the
-    given filters
+    and offset (or cursor), ordered by the given attribute and filtered
+    using the given filters.
+    The total items count is only computed if with_count is True.
     """
 
-    order_by_column = getattr(class_, order_by)
-
     # get the items in the pagination window
-    sql = sqlalchemy.select(class_).order_by(order_by_column).offset(offset)
-
-    if limit is not None:
-        sql = sql.limit(limit)
+    sql = sqlalchemy.select(class_)
+    sql = paginate(sql, class_, order_by, False, limit, offset, cursor)
 
     if db_filter:
         sql = db_filter.apply(sql)
@@ -61,15 +63,98 @@ async def get(
     items = res.scalars().all()
 
     # get the total items count
-    sql = sqlalchemy.select([sqlalchemy.func.count()]).select_from(class_)
-    if db_filter:
-        sql = db_filter.apply(sql)
-    res = await session.execute(sql)
-    total_items_count = res.scalar()
+    total_items_count = None
+    if with_count:
+        sql = sqlalchemy.select([sqlalchemy.func.count()]).select_from(class_)
+        if db_filter:
+            sql = db_filter.apply(sql)
+        total_items_count = await db.count_cache.get_count(
+            session, (class_.__tablename__, repr(db_filter)), sql)
+
+    return make_pagination_window(items, order_by, limit, total_items_count)
+
+
+def paginate(sql, class_: T, order_by: str, descending: bool,
+             limit: int | None, offset: int, cursor: str | None):
+    """
+    Order the given select by the given attribute (and by id, to break ties)
+    and limit it to one pagination window.
+
+    If a cursor is given, the window starts right after the item that the
+    cursor points to (keyset pagination - deep windows cost the same as the
+    first one). Otherwise, the window starts at the given offset.
+
+    One extra item is selected, for make_pagination_window() to know
+    whether there are more items after the window.
+    """
+
+    order_by_column = getattr(class_, order_by)
+
+    if cursor is not None:
+        (value, id_) = db.cursor.decode_cursor(cursor, order_by_column)
+        sql = sql.where(_after_cursor(order_by_column, class_.id, value, id_, descending))
+    elif offset:
+        sql = sql.offset(offset)
+
+    if descending:
+        sql = sql.order_by(order_by_column.desc(), class_.id.desc())
+    else:
+        sql = sql.order_by(order_by_column, class_.id)
+
+    if limit is not None:
+        sql = sql.limit(limit + 1)
+
+    return sql
+
+
+def _after_cursor(order_by_column, id_column, value, id_, descending: bool):
+    """ Return the where clause of the items that come after the item with
+    the given value and id, in the order of paginate().
+
+    SQLite orders NULLs first (last when descending), and a comparison with
+    NULL is never true, so the items whose value is NULL are handled apart
+    from the row-value comparison. """
+
+    id_literal = sqlalchemy.literal(id_, id_column.type)
+
+    if value is None:
+        same_value_after = sqlalchemy.and_(
+            order_by_column.is_(None),
+            id_column < id_literal if descending else id_column > id_literal)
+        if descending:
+            # only NULLs come after NULLs
+            return same_value_after
+        return sqlalchemy.or_(same_value_after, order_by_column.is_not(None))
+
+    key = sqlalchemy.tuple_(order_by_column, id_column)
+    start = sqlalchemy.tuple_(sqlalchemy.literal(value, order_by_column.type), id_literal)
+    if descending:
+        # the NULLs come after all values
+        return sqlalchemy.or_(key < start, order_by_column.is_(None))
+    return key > start
+
+
+def make_pagination_window(
+        items: List[T],
+        order_by: str,
+        limit: int | None,
+        total_items_count: int | None) -> PaginationWindow:
+    """ Create a pagination window from items selected using paginate() """
+
+    has_more = limit is not None and len(items) > limit
+    next_cursor = None
+
+    if has_more:
+        items = items[:limit]
+        last = items[-1] if items else None
+        if last is not None:
+            next_cursor = db.cursor.encode_cursor(getattr(last, order_by), last.id)
 
     return PaginationWindow(
         items=items,
-        total_items_count=total_items_count
+        total_items_count=total_items_count,
+        next_cursor=next_cursor,
+        has_more=has_more
     )
 
 KeyType = TypeVar("KeyType")
@@ -92,7 +177,8 @@ async def update_values(
         session: AsyncSession,
         class_: T,
         item_id: KeyType,
-        values: Dict[str, Any]):
+        values: Dict[str, Any],
+        do_commit: bool = True):
     # update the db
     sql = sqlalchemy.update(class_).\
         where(class_.id == item_id).\
@@ -100,7 +186,8 @@ async def update_values(
 
     try:
         await session.execute(sql)
-        await session.commit()
+        if do_commit:
+            await session.commit()
     except IntegrityError as e:
         if "FOREIGN KEY" in str(e.orig):
             raise Exception(f'Foreign key constraint failed.')
@@ -118,28 +205,78 @@ async def update_values(
 async def update_many_values(
         session: AsyncSession,
         class_: T,
-        id_to_values: Dict[str, Dict[str, Any]]) -> Dict[str, str] | None:
+        id_to_values: Dict[str, Dict[str, Any]],
+        do_commit: bool = True) -> Dict[str, str] | None:
+    """
+    Update many records of the given db class in bulk.
+    id_to_values maps the ID of each record to the values to set on it.
 
-    failed_ids = {}
-    for id_, values in id_to_values.items():
-        # update the db
+    Foreign key values are validated up front, with one query per
+    referenced table. If any of them is invalid, nothing is updated, and
+    a dict of ID => error is returned for the failed records.
+    """
 
-        sql = sqlalchemy.update(class_).\
-            where(class_.id == id_).\
-            values(**values)
+    failed_ids = await _validate_foreign_keys(session, class_, id_to_values)
+    if len(failed_ids) > 0:
+        return failed_ids
+
+    # executemany() runs the same statement for every set of parameters, so
+    # group the records by the columns that they update
+    columns_to_params = defaultdict(list)
+    for id_, values in id_to_values.items():
+        params = {f'new_{column}': value for column, value in values.items()}
+        params['item_id'] = id_
+        columns_to_params[tuple(sorted(values))].append(params)
+
+    table = class_.__table__
+    for columns, params in columns_to_params.items():
+        # UPDATE ... SET column = :new_column, ... WHERE id = :item_id
+        sql = sqlalchemy.update(table).\
+            where(table.c.id == sqlalchemy.bindparam('item_id')).\
+            values({column: sqlalchemy.bindparam(f'new_{column}') for column in columns})
         try:
-            res = await session.execute(sql)
+            await session.execute(sql, params)
         except IntegrityError as e:
             if "FOREIGN KEY" in str(e.orig):
-                failed_ids[id_] = 'Foreign key constraint failed.'
+                raise Exception(f'Foreign key constraint failed.')
+            raise
 
-    if len(failed_ids) > 0:
-        return failed_ids
-
-    await session.commit()
+    if do_commit:
+        await session.commit()
     return None
 
 
+async def _validate_foreign_keys(
+        session: AsyncSession,
+        class_: T,
+        id_to_values: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """ Return a dict of ID => error for each record in id_to_values that
+    refers (via a foreign key column) to a record that doesn't exist """
+
+    # the foreign key columns that are updated, and the values given for them
+    column_to_values = defaultdict(set)
+    for values in id_to_values.values():
+        for column_name, value in values.items():
+            if value is not None and class_.__table__.c[column_name].foreign_keys:
+                column_to_values[column_name].add(value)
+
+    # the values that don't exist in the referenced table, per column
+    column_to_missing_values = {}
+    for column_name, values in column_to_values.items():
+        fk = next(iter(class_.__table__.c[column_name].foreign_keys))
+        sql = sqlalchemy.select(fk.column).where(fk.column.in_(values))
+        found = set((await session.execute(sql)).scalars().all())
+        column_to_missing_values[column_name] = values - found
+
+    failed_ids = {}
+    for id_, values in id_to_values.items():
+        for column_name, missing_values in column_to_missing_values.items():
+            if values.get(column_name) in missing_values:
+                failed_ids[id_] = 'Foreign key constraint failed.'
+
+    return failed_ids
+
+
 async def delete(session: AsyncSession, class_: T, id_: KeyType, do_commit: bool = True) -> int:
     sql = sqlalchemy.delete(class_).\
         where(class_.id == id_)
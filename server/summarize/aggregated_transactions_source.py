@@ -0,0 +1,117 @@
+import sqlalchemy
+import db.schema
+import summarize.options
+import summarize.tracing
+from summarize.summary_items import SummaryItems
+from summarize.summary_accumulator import SummaryAccumulator
+from summarize.transactions_source import TransactionsSource
+
+# julianday() of the day before 0001-01-01, whose ordinal is 1
+_JULIAN_DAY_OF_ORDINAL_0 = 1721424.5
+
+
+class AggregatedTransactionsSource(TransactionsSource):
+    """ Concrete class - the summary source for transactions that sums
+    the transactions inside the db. There's one item per bucket and
+    subcategory, instead of one item per transaction. """
+
+    @staticmethod
+    def supports(options: summarize.options.SummaryOptions) -> bool:
+        """ Return whether the buckets of a summary with the given options
+        can be computed in the db """
+        return options.bucket_by.name in ('day', 'week', 'month', 'quarter', 'year', 'range')
+
+    async def load(self):
+
+        # init _category_id_to_name
+        await self._load_categories()
+
+        # init _subcategory_id_to_name and _subcategory_id_to_category_id
+        await self._load_subcategories()
+
+        # init _accumulator
+        self._accumulator = SummaryAccumulator(self.get_groups(), len(self._buckets))
+
+        # get the sums from the db
+        sums = await self._load_sums()
+
+        with summarize.tracing.stage('_accumulate_sums') as stage:
+            self._accumulate_sums(sums)
+            stage.items = len(sums)
+
+    async def _load_sums(self):
+        """ Return (subcategory_id, bucket number, sum of amounts) for every
+        subcategory included in the summary and every bucket (the bucket
+        number is None when bucket_by is 'range') that has transactions
+        between start_date and end_date """
+        return await self._load_sums_of_transactions(self._start_date, self._end_date)
+
+    async def _load_sums_of_transactions(self, start_date, end_date):
+        """ Same as _load_sums(), for the transactions between the given
+        dates """
+
+        transaction = db.schema.Transaction
+        subcategory_ids = self._subcategory_id_to_category_id.keys()
+
+        bucket_number = self._get_bucket_number_sql(transaction.date)
+
+        sql = sqlalchemy.select(
+            transaction.effective_subcategory_id,
+            bucket_number,
+            sqlalchemy.func.sum(transaction.amount)) \
+            .where(transaction.date >= start_date) \
+            .where(transaction.date <= end_date) \
+            .where(transaction.effective_subcategory_id.in_(subcategory_ids)) \
+            .group_by(transaction.effective_subcategory_id, bucket_number)
+
+        with summarize.tracing.stage('_load_sums_of_transactions') as stage:
+            res = (await self._session.execute(sql)).all()
+            stage.rows = len(res)
+        return res
+
+    def _get_bucket_number_sql(self, date):
+        """ Return the SQL expression of the bucket number of the given date
+        column (same as util.get_bucket_number_fn()), or NULL if bucket_by is
+        'range'. Dates are stored as 'YYYY-MM-DD' strings; for month, quarter
+        and year the column may also hold 'YYYY-MM' months. """
+
+        bucket_by = self._options.bucket_by.name
+        if bucket_by == 'range':
+            return sqlalchemy.null()
+
+        if bucket_by in ('day', 'week'):
+            # the date's ordinal (as in datetime.date.toordinal())
+            number = sqlalchemy.cast(
+                sqlalchemy.func.julianday(date) - _JULIAN_DAY_OF_ORDINAL_0, sqlalchemy.Integer)
+            if bucket_by == 'week':
+                number = (number - 1) / 7
+            return number
+
+        year = sqlalchemy.cast(sqlalchemy.func.substr(date, 1, 4), sqlalchemy.Integer)
+        if bucket_by == 'year':
+            return year
+
+        month = sqlalchemy.cast(sqlalchemy.func.substr(date, 6, 2), sqlalchemy.Integer) - 1
+        if bucket_by == 'quarter':
+            return year * 4 + month / 3
+
+        return year * 12 + month
+
+    def _accumulate_sums(self, sums):
+        """ Sum the (subcategory, bucket number) sums into _accumulator """
+
+        items = SummaryItems()
+        for (subcategory_id, bucket_number, amount) in sums:
+
+            # the group_id of this item
+            group_id = subcategory_id
+            if self._is_group_by_category():
+                group_id = self._subcategory_id_to_category_id[subcategory_id]
+
+            bucket_idx = 0
+            if not self._is_bucket_by_range():
+                bucket_idx = bucket_number - self._first_bucket_number
+
+            items.add(group_id, bucket_idx, amount)
+
+        self._accumulator.add_items(items)
@@ -1,7 +1,9 @@
 import datetime
+import numpy
 import summarize.balance_summary
 import summarize.transactions_summarizer
 import summarize.options
+import summarize.tracing
 
 
 class BalanceSummarizer:
@@ -16,29 +18,44 @@ class BalanceSummarizer:
         summarizer = summarize.transactions_summarizer.TransactionsSummarizer()
 
         options = summarize.options.SummaryOptions(
-            is_expense=False,
+            is_expense=None,
             group_by=group_by,
             bucket_by=summarize.options.SummaryBucketBy.month,
             merge_under_threshold=False
         )
 
-        # fill the income summary
-        summary.income = await summarizer.execute(session, start_date, end_date, options)
+        if group_by.name in ('category', 'subcategory'):
+            # load both income and expenses in a single pass over the range
+            source = summarizer.make_source(session, start_date, end_date, options)
+            await summarizer.load_source(source)
+            (income_source, expenses_source) = source.split_by_is_expense()
 
-        # fill the expenses summary
-        options.is_expense = True
-        summary.expenses = await summarizer.execute(session, start_date, end_date, options)
+            # fill the income summary
+            options.is_expense = False
+            with summarize.tracing.stage('income'):
+                summary.income = summarizer.summarize(income_source, options)
 
-        # fill the savings and savings_percentages
-        income_and_expenses = zip(summary.income.bucket_totals, summary.expenses.bucket_totals)
-        summary.savings = []
-        summary.savings_percentages = []
+            # fill the expenses summary
+            options.is_expense = True
+            with summarize.tracing.stage('expenses'):
+                summary.expenses = summarizer.summarize(expenses_source, options)
+        else:
+            # by payee or account - the top groups of the income and of the
+            # expenses (see SparseTransactionsSource)
+            options.is_expense = False
+            with summarize.tracing.stage('income'):
+                summary.income = await summarizer.execute(session, start_date, end_date, options)
 
-        for income, expense in income_and_expenses:
-            saving = income - expense
-            summary.savings.append(saving)
-            saving_percentage = int(100 * saving / income) if income != 0 else 0
-            summary.savings_percentages.append(saving_percentage)
+            options.is_expense = True
+            with summarize.tracing.stage('expenses'):
+                summary.expenses = await summarizer.execute(session, start_date, end_date, options)
+
+        # fill the savings and savings_percentages, for all buckets at once
+        income = numpy.array(summary.income.bucket_totals)
+        expenses = numpy.array(summary.expenses.bucket_totals)
+        savings = income - expenses
+        summary.savings = savings.tolist()
+        summary.savings_percentages = self._get_percentages(savings, income).tolist()
 
         # fill savings_total
         summary.savings_total = summary.income.sum_total - summary.expenses.sum_total
@@ -48,3 +65,11 @@ class BalanceSummarizer:
             if summary.income.sum_total != 0 else 0
 
         return summary
+
+    @staticmethod
+    def _get_percentages(savings, income):
+        """ Return the savings as (truncated) percentages of the income,
+        0 where there's no income """
+        has_income = income != 0
+        percentages = 100 * savings / numpy.where(has_income, income, 1)
+        return numpy.where(has_income, percentages, 0).astype(int)
@@ -0,0 +1,104 @@
+import datetime
+import typing
+import summarize.options
+import summarize.tracing
+from summarize.matrix_summary import MatrixSummary
+from summarize.transactions_summarizer import TransactionsSummarizer
+
+# a summary to make: (start_date, end_date, options)
+SummaryRequest = typing.Tuple[datetime.date, datetime.date, summarize.options.SummaryOptions]
+
+
+class BatchSummarizer:
+    """ Makes several summaries at once (e.g. the summaries of a dashboard).
+
+    Rather than loading every summary from the db, the sums of the union of
+    their date ranges are loaded once and every summary is made from them
+    (see TransactionsSource.derive()): per month (from the monthly rollup)
+    for the summaries that are made of whole months, and per day for the
+    summaries by day or week. Only a summary by month (or coarser) that cuts
+    a month of the others is loaded on its own. """
+
+    @staticmethod
+    async def execute(session,
+                      requests: typing.List[SummaryRequest]) -> typing.List[MatrixSummary]:
+        """ Return the summaries of the given requests, in the same order """
+
+        res = [None] * len(requests)
+
+        for base_bucket_by, request_idxs in BatchSummarizer._plan(requests):
+            if base_bucket_by is None:
+                # made on its own
+                (i,) = request_idxs
+                res[i] = await TransactionsSummarizer.execute(session, *requests[i])
+                continue
+
+            start_date = min(requests[i][0] for i in request_idxs)
+            end_date = max(requests[i][1] for i in request_idxs)
+
+            # load the sums of all expenses and income, per subcategory
+            options = summarize.options.SummaryOptions(
+                is_expense=None,
+                group_by=summarize.options.SummaryGroupBy.subcategory,
+                bucket_by=base_bucket_by,
+                merge_under_threshold=False
+            )
+            source = TransactionsSummarizer.make_source(session, start_date, end_date, options)
+            await TransactionsSummarizer.load_source(source)
+
+            for i in request_idxs:
+                (r_start_date, r_end_date, r_options) = requests[i]
+                with summarize.tracing.stage('derive') as stage:
+                    derived = source.derive(r_start_date, r_end_date, r_options)
+                    stage.items = derived.get_data().size
+                res[i] = TransactionsSummarizer.summarize(derived, r_options)
+
+        return res
+
+    @staticmethod
+    def _plan(requests):
+        """ Return a list of (base bucket_by (month or day), the indexes of
+        the requests to make from one load of the sums per base bucket).
+        The base bucket_by is None for a request that's made on its own. """
+
+        # rolling and years-ago buckets aren't made of the sums of their own
+        # dates, and payees / accounts aren't made of subcategories, so they
+        # can't be derived
+        own_idxs = [i for i, (_, _, options) in enumerate(requests)
+                    if options.rolling_window is not None or options.years_ago != 0
+                    or options.group_by.name not in ('category', 'subcategory')]
+
+        # the requests whose buckets are made of months
+        month_idxs = [i for i, (_, _, options) in enumerate(requests)
+                      if options.bucket_by.name not in ('day', 'week') and i not in own_idxs]
+
+        # ... and that don't cut a month of the union of their ranges
+        # (dropping any other request doesn't change where it begins/ends)
+        if len(month_idxs) > 0:
+            start_date = min(requests[i][0] for i in month_idxs)
+            end_date = max(requests[i][1] for i in month_idxs)
+            month_idxs = [i for i in month_idxs if
+                          BatchSummarizer._is_made_of_months(*requests[i][:2], start_date, end_date)]
+
+        day_idxs = [i for i, (_, _, options) in enumerate(requests)
+                    if options.bucket_by.name in ('day', 'week') and i not in own_idxs]
+
+        # any other request is made of the months of its own range
+        other_idxs = [i for i in range(len(requests)) if i not in month_idxs + day_idxs + own_idxs]
+
+        plan = [(summarize.options.SummaryBucketBy.month, month_idxs),
+                (summarize.options.SummaryBucketBy.day, day_idxs)] + \
+               [(summarize.options.SummaryBucketBy.month, [i]) for i in other_idxs] + \
+               [(None, [i]) for i in own_idxs]
+        return [(bucket_by, idxs) for bucket_by, idxs in plan if len(idxs) > 0]
+
+    @staticmethod
+    def _is_made_of_months(start_date, end_date, union_start_date, union_end_date):
+        """ Return whether the range from start_date to end_date is made of
+        the months of the union range (only the union's first/last months
+        may be partial) """
+        if start_date.day != 1 and start_date != union_start_date:
+            return False
+        if (end_date + datetime.timedelta(days=1)).day != 1 and end_date != union_end_date:
+            return False
+        return True
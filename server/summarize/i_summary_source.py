@@ -1,6 +1,7 @@
 import abc
 import typing
-import summarize.summary_source_item
+import numpy
+from summarize.summary_items import SummaryItems
 
 
 class ISummarySource(abc.ABC):
@@ -19,5 +20,12 @@ class ISummarySource(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def get_items(self) -> typing.List[summarize.summary_source_item.SummarySourceItem]:
+    def get_items(self) -> SummaryItems:
         pass
+
+    def get_data(self) -> numpy.ndarray | None:
+        """ Return the sums as a groups x buckets array (rows in the order of
+        get_groups()) for a source that pushes its items into a
+        SummaryAccumulator while loading, in which case get_items() is empty.
+        None otherwise. """
+        return None
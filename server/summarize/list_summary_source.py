@@ -0,0 +1,35 @@
+import typing
+import numpy
+import summarize.i_summary_source
+from summarize.summary_items import SummaryItems
+
+
+class ListSummarySource(summarize.i_summary_source.ISummarySource):
+    """ Concrete class - a summary source for groups, buckets and items (or
+    sums) that were already loaded (e.g. by
+    TransactionsSource.split_by_is_expense()) """
+
+    def __init__(self,
+                 groups: typing.Dict[int, str],
+                 buckets: typing.List[str],
+                 items: SummaryItems,
+                 data: numpy.ndarray | None = None):
+        self._groups = groups
+        self._buckets = buckets
+        self._items = items
+        self._data = data
+
+    def load(self) -> None:
+        pass
+
+    def get_groups(self):
+        return self._groups
+
+    def get_buckets(self):
+        return self._buckets
+
+    def get_items(self):
+        return self._items
+
+    def get_data(self):
+        return self._data
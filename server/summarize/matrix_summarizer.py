@@ -0,0 +1,23 @@
+from summarize.matrix_summary import MatrixSummary
+from summarize.i_summary_source import ISummarySource
+from summarize.summary_accumulator import SummaryAccumulator
+
+
+class MatrixSummarizer:
+    """ Creates a MatrixSummary, given a source """
+
+    @staticmethod
+    def execute(source: ISummarySource) -> MatrixSummary:
+
+        buckets = source.get_buckets()
+        groups = source.get_groups()
+
+        # the source may have summed its items already
+        data = source.get_data()
+        if data is None:
+            # sum every item into its cell
+            accumulator = SummaryAccumulator(groups, len(buckets))
+            accumulator.add_items(source.get_items())
+            data = accumulator.data
+
+        return MatrixSummary(buckets, groups.keys(), groups.values(), data)
@@ -0,0 +1,69 @@
+import typing
+import numpy
+
+
+class MatrixSummary:
+    """ A summary held in a single 2-D array of groups x buckets, rather than
+    in one SummaryForOneGroup per group. Row i of data is the group whose ID
+    is group_ids[i]. """
+
+    # row idx => group ID / group name
+    group_ids: typing.List[int]
+    group_names: typing.List[str]
+
+    buckets: typing.List[str]
+
+    # the datapoints (sums), shape (groups count, buckets count)
+    data: numpy.ndarray
+
+    # filled by the CalcTotals postprocessor
+    group_totals: numpy.ndarray
+    bucket_totals: typing.List[float]
+    sum_total: float
+
+    def __init__(self, buckets, group_ids, group_names, data):
+        self.buckets = buckets
+        self.group_ids = list(group_ids)
+        self.group_names = list(group_names)
+        self.data = data
+        self.group_totals = None
+        self.bucket_totals = None
+        self.sum_total = None
+
+    def get_buckets_count(self):
+        return len(self.buckets)
+
+    def get_groups_count(self):
+        return len(self.group_ids)
+
+    def add_group(self, group_id, group_name, data):
+        """ Add a group (row) with the given data at the end """
+        self.group_ids.append(group_id)
+        self.group_names.append(group_name)
+        self.data = numpy.vstack([self.data, data])
+
+    def keep_groups(self, rows):
+        """ Keep only the groups at the given rows (a boolean mask or an array
+        of row indexes), in that order """
+        rows = numpy.flatnonzero(rows) if rows.dtype == bool else rows
+        self.group_ids = [self.group_ids[i] for i in rows]
+        self.group_names = [self.group_names[i] for i in rows]
+        self.data = self.data[rows]
+        if self.group_totals is not None:
+            self.group_totals = self.group_totals[rows]
+
+    def __repr__(self):
+        return str(self.buckets) + '\n' + str(
+            {g_id: f"'{name}': {data.tolist()}"
+             for g_id, name, data in zip(self.group_ids, self.group_names, self.data)})
+
+    def get_transposed_str(self):
+        res = ''
+        for bucket_idx, bucket in enumerate(self.buckets):
+            res += f'{bucket}: '
+            for name, value in zip(self.group_names, self.data[:, bucket_idx]):
+                res += f'{name}={value} '
+            if bucket_idx < self.get_buckets_count() - 1:
+                res += '\n'
+
+        return res
@@ -0,0 +1,65 @@
+import datetime
+import sqlalchemy
+import db.schema
+import util
+import summarize.options
+import summarize.tracing
+from summarize.aggregated_transactions_source import AggregatedTransactionsSource
+
+
+class MonthlyRollupSource(AggregatedTransactionsSource):
+    """ Concrete class - the summary source for transactions that reads the
+    sums of whole months from the monthly_rollup table. Only the days of a
+    partial first/last month are summed from the transactions, so loading
+    depends on the number of months and subcategories rather than on the
+    number of transactions.
+
+    Quarters and years are made of whole months, so they're read from the
+    rollup too. """
+
+    @staticmethod
+    def supports(options: summarize.options.SummaryOptions) -> bool:
+        return options.bucket_by.name in ('month', 'quarter', 'year', 'range')
+
+    async def _load_sums(self):
+        (first_date, last_date) = util.get_whole_months(self._start_date, self._end_date)
+        if first_date > last_date:
+            # less than a whole month
+            return await self._load_sums_of_transactions(self._start_date, self._end_date)
+
+        sums = await self._load_sums_of_rollup(first_date, last_date)
+
+        # the days before the first whole month and after the last one.
+        # With bucket_by 'range' this gives up to 3 sums per subcategory,
+        # which the summarizer adds up.
+        if self._start_date < first_date:
+            sums += await self._load_sums_of_transactions(
+                self._start_date, first_date - datetime.timedelta(days=1))
+        if last_date < self._end_date:
+            sums += await self._load_sums_of_transactions(
+                last_date + datetime.timedelta(days=1), self._end_date)
+
+        return sums
+
+    async def _load_sums_of_rollup(self, first_date, last_date):
+        """ Same as _load_sums(), for the whole months from first_date to
+        last_date """
+
+        rollup = db.schema.MonthlyRollup
+        subcategory_ids = self._subcategory_id_to_category_id.keys()
+
+        bucket_number = self._get_bucket_number_sql(rollup.month)
+
+        sql = sqlalchemy.select(
+            rollup.subcategory_id,
+            bucket_number,
+            sqlalchemy.func.sum(rollup.sum)) \
+            .where(rollup.month >= first_date.strftime('%Y-%m')) \
+            .where(rollup.month <= last_date.strftime('%Y-%m')) \
+            .where(rollup.subcategory_id.in_(subcategory_ids)) \
+            .group_by(rollup.subcategory_id, bucket_number)
+
+        with summarize.tracing.stage('_load_sums_of_rollup') as stage:
+            res = (await self._session.execute(sql)).all()
+            stage.rows = len(res)
+        return res
@@ -6,17 +6,34 @@ import enum
 class SummaryGroupBy(enum.Enum):
     category = "category"
     subcategory = "subcategory"
+    payee = "payee"
+    account = "account"
 
 
 @dataclasses.dataclass
 class SummaryBucketBy(enum.Enum):
+    day = "day"
+    week = "week"
     month = "month"
+    quarter = "quarter"
+    year = "year"
     range = "range"
 
 
 @dataclasses.dataclass
 class SummaryOptions:
-    is_expense: bool
+    # None - both expenses and income (see TransactionsSource.split_by_is_expense())
+    is_expense: bool | None
     group_by: SummaryGroupBy
     bucket_by: SummaryBucketBy
     merge_under_threshold: bool
+    # see MatrixMergeUnderThreshold
+    merge_threshold_percentage: int = 10
+    # None - no limit on the number of groups
+    top_k: int | None = None
+    # if given, every bucket holds the total of the rolling_window buckets
+    # that end with it (e.g. the last 12 months), rather than of itself
+    rolling_window: int | None = None
+    # every bucket holds the total of its dates this many years earlier
+    # (e.g. 1, to compare every bucket with the same bucket last year)
+    years_ago: int = 0
@@ -3,8 +3,14 @@ from summarize.summary import Summary
 
 
 class FixPrecision(IPostprocessor):
+    """ Round every value to a whole number of units. scale is the number of
+    source units per unit, e.g. util.MINOR_UNITS_PER_UNIT for amounts in
+    minor units. """
+
+    def __init__(self, scale: int = 1):
+        self._scale = scale
 
     def execute(self, summary: Summary) -> None:
         for g_id, g in summary.groups.items():
             for i in range(len(g.data)):
-                g.set(i, round(g.get(i)))
+                g.set(i, round(g.get(i) / self._scale))
@@ -0,0 +1,14 @@
+import abc
+from summarize.postprocess.i_postprocessor import IPostprocessor
+
+
+class IFusablePostprocessor(IPostprocessor):
+    """ Base class for element-wise postprocessors of a MatrixSummary, which
+    MatrixPipeline can fuse with their neighbours into a single
+    MatrixFusedPass over the data """
+
+    @abc.abstractmethod
+    def fuse(self, fused_pass) -> bool:
+        """ Add this postprocessor to the given MatrixFusedPass. Return False
+        if it can't be added to it (so that it starts a new pass). """
+        pass
@@ -0,0 +1,20 @@
+from summarize.postprocess.i_fusable_postprocessor import IFusablePostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixCalcTotals(IFusablePostprocessor):
+    """ CalcTotals for a MatrixSummary """
+
+    def execute(self, summary: MatrixSummary) -> None:
+
+        # calc total per group
+        summary.group_totals = summary.data.sum(axis=1)
+
+        # calc total per bucket
+        summary.bucket_totals = summary.data.sum(axis=0).tolist()
+
+        # calc total
+        summary.sum_total = sum(summary.bucket_totals)
+
+    def fuse(self, fused_pass) -> bool:
+        return fused_pass.add_calc_totals()
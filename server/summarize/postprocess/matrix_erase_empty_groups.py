@@ -0,0 +1,13 @@
+from summarize.postprocess.i_fusable_postprocessor import IFusablePostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixEraseEmptyGroups(IFusablePostprocessor):
+    """ EraseEmptyGroups for a MatrixSummary """
+
+    def execute(self, summary: MatrixSummary) -> None:
+        """ Erase groups that are all zeros """
+        summary.keep_groups(summary.data.any(axis=1))
+
+    def fuse(self, fused_pass) -> bool:
+        return fused_pass.add_erase_empty_groups()
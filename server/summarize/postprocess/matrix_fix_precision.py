@@ -0,0 +1,17 @@
+import numpy
+from summarize.postprocess.i_fusable_postprocessor import IFusablePostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixFixPrecision(IFusablePostprocessor):
+    """ FixPrecision for a MatrixSummary. The values become integers. """
+
+    def __init__(self, scale: int = 1):
+        self._scale = scale
+
+    def execute(self, summary: MatrixSummary) -> None:
+        # rint rounds half to even, same as round()
+        summary.data = numpy.rint(summary.data / self._scale).astype(numpy.int64)
+
+    def fuse(self, fused_pass) -> bool:
+        return fused_pass.add_fix_precision(self._scale)
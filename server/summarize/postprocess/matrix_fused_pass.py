@@ -0,0 +1,77 @@
+import numpy
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixFusedPass:
+    """ Does the work of several element-wise postprocessors at once: scales
+    and rounds the values (MatrixFixPrecision), negates them
+    (MatrixReverseSign), erases the empty groups (MatrixEraseEmptyGroups) and
+    calculates the totals (MatrixCalcTotals), whichever were added to it.
+
+    The values are transformed in one divide-and-round into a single new
+    array, and the totals and empty groups are all taken from it before any
+    group is erased, so the data isn't copied between the steps. """
+
+    def __init__(self):
+        self.names = []
+
+        # values are divided by _scale * _sign, and rounded if _round
+        self._scale = 1
+        self._sign = 1
+        self._round = False
+
+        self._erase_empty_groups = False
+        self._calc_totals = False
+
+    def add_fix_precision(self, scale) -> bool:
+        if self._is_reducing():
+            # the values have to be fixed before the groups are reduced
+            return False
+        if self._round:
+            # rounding twice isn't rounding once by the product of the
+            # scales (149 / 10 / 10 is 2, but 149 / 100 is 1)
+            return False
+        self._scale *= scale
+        self._round = True
+        return True
+
+    def add_reverse_sign(self) -> bool:
+        if self._is_reducing():
+            return False
+        self._sign = -self._sign
+        return True
+
+    def add_erase_empty_groups(self) -> bool:
+        self._erase_empty_groups = True
+        return True
+
+    def add_calc_totals(self) -> bool:
+        self._calc_totals = True
+        return True
+
+    def execute(self, summary: MatrixSummary) -> None:
+        data = summary.data
+
+        if self._round:
+            # rint rounds half to even, same as round(). Rounding is
+            # symmetric, so negating before it is the same as after it.
+            data = numpy.true_divide(data, self._scale * self._sign)
+            numpy.rint(data, out=data)
+            data = data.astype(numpy.int64)
+        elif self._sign == -1:
+            data = numpy.negative(data)
+        summary.data = data
+
+        if self._calc_totals:
+            # erasing all-zero groups doesn't change the totals, so they're
+            # taken before the groups are erased
+            summary.group_totals = data.sum(axis=1)
+            summary.bucket_totals = data.sum(axis=0).tolist()
+            summary.sum_total = sum(summary.bucket_totals)
+
+        if self._erase_empty_groups:
+            # also erases their group_totals
+            summary.keep_groups(data.any(axis=1))
+
+    def _is_reducing(self):
+        return self._erase_empty_groups or self._calc_totals
@@ -0,0 +1,96 @@
+import numpy
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixMergeUnderThreshold(IPostprocessor):
+    """ MergeUnderThreshold for a MatrixSummary, merging groups into an
+    "Other" group by either or both of:
+
+    - threshold_percentage: in every bucket, the smallest positive values
+      that together are at most this percentage of the bucket's positive sum
+      are merged (if there are at least two of them). All buckets are
+      handled at once.
+    - top_k: only the top_k groups with the largest totals are kept, the
+      rest are merged (if there are at least two of them). The top groups
+      are found by partial selection rather than by sorting all groups.
+
+    With both, the threshold is applied first. (Summaries by payee or
+    account keep their top groups before this runs, see
+    TransactionsSummarizer._summarize_sparse().) """
+
+    def __init__(self, threshold_percentage: int | None = 10, top_k: int | None = None):
+        if top_k is not None and top_k < 1:
+            raise Exception(f'Invalid top_k: {top_k}')
+
+        self._threshold_percentage = threshold_percentage
+        self._top_k = top_k
+
+    def execute(self, summary: MatrixSummary) -> None:
+        other = numpy.zeros(summary.get_buckets_count(), dtype=summary.data.dtype)
+
+        if self._threshold_percentage is not None:
+            self._merge_under_threshold(summary, other)
+
+        if self._top_k is not None:
+            self._merge_all_but_top_k(summary, other)
+
+        # add the "Other" group to the summary if it is not empty (or add
+        # to it, if the summary already has one)
+        if 0 in summary.group_ids:
+            summary.data[summary.group_ids.index(0)] += other
+        elif other.any():
+            summary.add_group(0, "Other", other)
+
+    def _merge_under_threshold(self, summary: MatrixSummary, other) -> None:
+        data = summary.data
+        positive = data > 0
+
+        # sort every column by value (only positive values count), with the
+        # non-positive values last. Stable, so that (as in MergeUnderThreshold)
+        # equal values keep the order of their groups.
+        order = numpy.argsort(numpy.where(positive, data, numpy.inf), axis=0, kind='stable')
+        sorted_data = numpy.take_along_axis(numpy.where(positive, data, 0), order, axis=0)
+        sorted_positive = numpy.take_along_axis(positive, order, axis=0)
+
+        # the threshold of every bucket
+        threshold = numpy.trunc(sorted_data.sum(axis=0) * self._threshold_percentage / 100)
+
+        # the smallest values whose partial sum is at most the threshold
+        under_threshold = sorted_positive & (sorted_data.cumsum(axis=0) <= threshold)
+
+        # merge only in buckets where there's more than one to merge
+        under_threshold &= under_threshold.sum(axis=0) > 1
+
+        # back to the rows of the groups
+        merged = numpy.zeros_like(under_threshold)
+        numpy.put_along_axis(merged, order, under_threshold, axis=0)
+
+        other += numpy.where(merged, data, 0).sum(axis=0)
+        summary.data = numpy.where(merged, 0, data)
+
+    def _merge_all_but_top_k(self, summary: MatrixSummary, other) -> None:
+        data = summary.data
+
+        # only groups that still have values compete for the top
+        totals = data.sum(axis=1)
+        candidates = numpy.flatnonzero(data.any(axis=1))
+
+        # merge only if there's more than one to merge
+        if len(candidates) - self._top_k < 2:
+            return
+
+        # the k-th largest total, found in linear time. Groups with a larger
+        # total are in the top; groups with exactly that total fill the
+        # remaining places in the order of the groups.
+        candidate_totals = totals[candidates]
+        kth_total = numpy.partition(candidate_totals, len(candidates) - self._top_k)[
+            len(candidates) - self._top_k]
+        top = candidate_totals > kth_total
+        ties = numpy.flatnonzero(candidate_totals == kth_total)
+        top[ties[:self._top_k - top.sum()]] = True
+
+        merged = candidates[~top]
+        other += data[merged].sum(axis=0)
+        summary.data = data.copy()
+        summary.data[merged] = 0
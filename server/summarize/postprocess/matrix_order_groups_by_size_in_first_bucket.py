@@ -0,0 +1,11 @@
+import numpy
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixOrderGroupsBySizeInFirstBucket(IPostprocessor):
+    """ OrderGroupsBySizeInFirstBucket for a MatrixSummary """
+
+    def execute(self, summary: MatrixSummary) -> None:
+        # descending, and stable - groups of the same size keep their order
+        summary.keep_groups(numpy.argsort(-summary.data[:, 0], kind='stable'))
@@ -0,0 +1,57 @@
+import time
+import logging
+import typing
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.postprocess.i_fusable_postprocessor import IFusablePostprocessor
+from summarize.postprocess.matrix_fused_pass import MatrixFusedPass
+from summarize.matrix_summary import MatrixSummary
+import summarize.tracing
+
+
+class MatrixPipeline:
+    """ Runs postprocessors on a MatrixSummary, in order. Consecutive
+    fusable postprocessors (IFusablePostprocessor) run as a single
+    MatrixFusedPass; any other IPostprocessor runs on its own.
+
+    The time of every stage (a fused pass or a single postprocessor) is kept
+    in timings, and logged (and traced, see summarize.tracing). """
+
+    def __init__(self, postprocessors: typing.List[IPostprocessor]):
+        # list of (stage name, stage), see _make_stages()
+        self._stages = self._make_stages(postprocessors)
+
+        # list of (stage name, seconds) of the last execute()
+        self.timings = []
+
+    def get_stage_names(self):
+        return [name for name, stage in self._stages]
+
+    def execute(self, summary: MatrixSummary) -> None:
+        self.timings = []
+        for name, stage in self._stages:
+            start = time.perf_counter()
+            with summarize.tracing.stage(name):
+                stage.execute(summary)
+            self.timings.append((name, time.perf_counter() - start))
+
+        logging.debug('Postprocessing: ' + ', '.join(
+            f'{name} {seconds * 1000:.2f} ms' for name, seconds in self.timings))
+
+    @staticmethod
+    def _make_stages(postprocessors):
+        stages = []
+        fused_pass = None
+        for p in postprocessors:
+            if not isinstance(p, IFusablePostprocessor):
+                stages.append((type(p).__name__, p))
+                fused_pass = None
+                continue
+
+            if fused_pass is None or not p.fuse(fused_pass):
+                fused_pass = MatrixFusedPass()
+                stages.append((None, fused_pass))
+                p.fuse(fused_pass)
+            fused_pass.names.append(type(p).__name__)
+
+        # name every fused pass by its postprocessors
+        return [(name or '+'.join(stage.names), stage) for name, stage in stages]
@@ -0,0 +1,12 @@
+from summarize.postprocess.i_fusable_postprocessor import IFusablePostprocessor
+from summarize.matrix_summary import MatrixSummary
+
+
+class MatrixReverseSign(IFusablePostprocessor):
+    """ ReverseSign for a MatrixSummary """
+
+    def execute(self, summary: MatrixSummary) -> None:
+        summary.data = -summary.data
+
+    def fuse(self, fused_pass) -> bool:
+        return fused_pass.add_reverse_sign()
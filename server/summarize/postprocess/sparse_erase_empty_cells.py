@@ -0,0 +1,10 @@
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.sparse_summary import SparseSummary
+
+
+class SparseEraseEmptyCells(IPostprocessor):
+    """ Erase the cells whose value is zero (e.g. after FixPrecision), so
+    that groups with no other cells are empty """
+
+    def execute(self, summary: SparseSummary) -> None:
+        summary.keep_cells(summary.values != 0)
@@ -0,0 +1,14 @@
+import numpy
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.sparse_summary import SparseSummary
+
+
+class SparseFixPrecision(IPostprocessor):
+    """ FixPrecision for a SparseSummary. The values become integers. """
+
+    def __init__(self, scale: int = 1):
+        self._scale = scale
+
+    def execute(self, summary: SparseSummary) -> None:
+        # rint rounds half to even, same as round()
+        summary.values = numpy.rint(summary.values / self._scale).astype(numpy.int64)
@@ -0,0 +1,57 @@
+import numpy
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.sparse_summary import SparseSummary
+
+
+class SparseMergeAllButTopK(IPostprocessor):
+    """ Keep only the top_k groups of a SparseSummary with the largest
+    totals, and merge the cells of the rest into an "Other" group (if there
+    are at least two of them) - as MatrixMergeUnderThreshold with top_k.
+    Only the cells are touched, not the (possibly many) empty groups. """
+
+    def __init__(self, top_k: int):
+        if top_k < 1:
+            raise Exception(f'Invalid top_k: {top_k}')
+
+        self._top_k = top_k
+
+    def execute(self, summary: SparseSummary) -> None:
+        totals = summary.get_group_totals()
+
+        # only groups that have cells compete for the top
+        candidates = numpy.unique(summary.rows)
+
+        # merge only if there's more than one to merge
+        if len(candidates) - self._top_k < 2:
+            return
+
+        # the k-th largest total, found in linear time. Groups with a larger
+        # total are in the top; groups with exactly that total fill the
+        # remaining places in the order of the groups.
+        candidate_totals = totals[candidates]
+        kth_total = numpy.partition(candidate_totals, len(candidates) - self._top_k)[
+            len(candidates) - self._top_k]
+        top = candidate_totals > kth_total
+        ties = numpy.flatnonzero(candidate_totals == kth_total)
+        top[ties[:self._top_k - top.sum()]] = True
+
+        is_top_row = numpy.zeros(summary.get_groups_count(), dtype=bool)
+        is_top_row[candidates[top]] = True
+        merged = ~is_top_row[summary.rows]
+
+        # the cells of "Other": the sums of the merged cells per bucket
+        other = numpy.bincount(summary.columns[merged], weights=summary.values[merged],
+                               minlength=summary.get_buckets_count()).astype(summary.values.dtype)
+        other_columns = numpy.flatnonzero(other)
+
+        summary.keep_cells(~merged)
+
+        # add the "Other" group to the summary if it is not empty
+        if len(other_columns) > 0:
+            summary.group_ids.append(0)
+            summary.group_names.append("Other")
+            other_row = summary.get_groups_count() - 1
+            summary.rows = numpy.concatenate(
+                [summary.rows, numpy.full(len(other_columns), other_row)])
+            summary.columns = numpy.concatenate([summary.columns, other_columns])
+            summary.values = numpy.concatenate([summary.values, other[other_columns]])
@@ -0,0 +1,9 @@
+from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.sparse_summary import SparseSummary
+
+
+class SparseReverseSign(IPostprocessor):
+    """ ReverseSign for a SparseSummary """
+
+    def execute(self, summary: SparseSummary) -> None:
+        summary.values = -summary.values
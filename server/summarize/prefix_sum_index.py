@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import typing
+import numpy
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+import db.schema
+import db.data_version
+import summarize.tracing
+
+# In-process index of the cumulative sums of the categorized transactions,
+# per subcategory and day, built from the daily_totals table (see
+# db.daily_totals). It's built on first use and rebuilt when the data
+# version changes (as the summary cache is dropped, see summarize.summary_cache).
+
+_version = None
+_index = None
+
+# held while the index is built, so that the requests that find it stale
+# wait for one build rather than each building it
+_lock = asyncio.Lock()
+
+# julianday() of the day before 0001-01-01, whose ordinal is 1
+_JULIAN_DAY_OF_ORDINAL_0 = 1721424.5
+
+
+class PrefixSumIndex:
+    """ The total of any subcategory over any range of days is the
+    difference between two of its cumulative sums. """
+
+    def __init__(self,
+                 first_date: datetime.date | None,
+                 subcategory_ids: typing.List[int],
+                 sums: numpy.ndarray):
+        """ sums has a row per subcategory (in the order of subcategory_ids)
+        and a column per day, starting with first_date """
+
+        self._first_ordinal = first_date.toordinal() if first_date is not None else 0
+
+        # subcategory ID => row idx
+        self._subcategory_id_to_row = {s_id: row for row, s_id in enumerate(subcategory_ids)}
+
+        # column i is the sum of the days before first_date + i days
+        # (column 0 is all zeros)
+        (rows_count, days_count) = sums.shape
+        self._cumsums = numpy.zeros((rows_count, days_count + 1), dtype=numpy.int64)
+        numpy.cumsum(sums, axis=1, out=self._cumsums[:, 1:])
+
+    def get_row(self, subcategory_id: int) -> int | None:
+        """ Return the row of the given subcategory in the totals, or None if
+        it has no transactions """
+        return self._subcategory_id_to_row.get(subcategory_id)
+
+    def get_totals(self, start_ordinals: numpy.ndarray, end_ordinals: numpy.ndarray) -> numpy.ndarray:
+        """ Return the totals of every subcategory (row) over every range
+        (column) from start_ordinals[i] to end_ordinals[i] (inclusive) """
+        days_count = self._cumsums.shape[1] - 1
+        start_columns = numpy.clip(start_ordinals - self._first_ordinal, 0, days_count)
+        end_columns = numpy.clip(end_ordinals - self._first_ordinal + 1, 0, days_count)
+        return self._cumsums[:, end_columns] - self._cumsums[:, start_columns]
+
+
+async def get_index(session: AsyncSession) -> PrefixSumIndex:
+    """ Return the index of the current data, building it if needed (using
+    the given session) """
+
+    global _version, _index
+
+    version = await db.data_version.get_data_version(session)
+    if _index is not None and version == _version:
+        return _index
+
+    async with _lock:
+        # it may have been built while waiting for the lock
+        version = await db.data_version.get_data_version(session)
+        if _index is not None and version == _version:
+            return _index
+
+        index = await _build_index(session)
+
+        # don't keep an index that may be stale
+        if version == await db.data_version.get_data_version(session):
+            (_version, _index) = (version, index)
+
+    return index
+
+
+def reset() -> None:
+    """ Drop the index (e.g. when switching to another db) """
+
+    global _version, _index, _lock
+
+    (_version, _index) = (None, None)
+
+    # (a lock is bound to the event loop it's first waited for in)
+    _lock = asyncio.Lock()
+
+
+async def _build_index(session: AsyncSession) -> PrefixSumIndex:
+    daily_total = db.schema.DailyTotal
+
+    # the ordinal of every date (as in datetime.date.toordinal()) is
+    # computed by the db, rather than parsing every date
+    ordinal = sqlalchemy.cast(
+        sqlalchemy.func.julianday(daily_total.date) - _JULIAN_DAY_OF_ORDINAL_0, sqlalchemy.Integer)
+    sql = sqlalchemy.select(daily_total.subcategory_id, ordinal, daily_total.sum)
+    # (numpy converts plain tuples much faster than rows)
+    with summarize.tracing.stage('_build_index') as stage:
+        rows = numpy.array([tuple(row) for row in (await session.execute(sql)).all()],
+                           dtype=numpy.int64).reshape(-1, 3)
+        stage.rows = len(rows)
+    if len(rows) == 0:
+        return PrefixSumIndex(None, [], numpy.zeros((0, 0), dtype=numpy.int64))
+
+    (subcategory_ids, ordinals, sums) = rows.T
+    first_ordinal = int(ordinals.min())
+
+    # a row per subcategory, a column per day
+    (subcategory_ids_list, rows_idxs) = numpy.unique(subcategory_ids, return_inverse=True)
+    data = numpy.zeros((len(subcategory_ids_list), int(ordinals.max()) - first_ordinal + 1),
+                       dtype=numpy.int64)
+    data[rows_idxs, ordinals - first_ordinal] = sums
+
+    return PrefixSumIndex(datetime.date.fromordinal(first_ordinal), subcategory_ids_list.tolist(), data)
@@ -0,0 +1,101 @@
+import datetime
+import numpy
+import summarize.options
+import summarize.prefix_sum_index
+import summarize.tracing
+from summarize.summary_accumulator import SummaryAccumulator
+from summarize.transactions_source import TransactionsSource
+import util
+
+
+class PrefixSumSource(TransactionsSource):
+    """ Concrete class - the summary source for transactions that takes the
+    total of every bucket and subcategory from the cumulative sums of the
+    daily totals (see summarize.prefix_sum_index): two lookups per bucket
+    and subcategory, however long the bucket is.
+
+    It also makes the summaries whose buckets hold the totals of other dates
+    than their own (rolling_window and years_ago, see SummaryOptions). """
+
+    @staticmethod
+    def supports(options: summarize.options.SummaryOptions) -> bool:
+        """ Return whether the summary with the given options should be made
+        from the cumulative sums: daily and weekly buckets (which the monthly
+        rollup can't make), and rolling / years-ago buckets (which only this
+        source can make).
+
+        A range is summed from the monthly rollup and its partial months (see
+        MonthlyRollupSource), which needs no index: the index is rebuilt
+        after every write, and ranges are the most common summaries. """
+        return options.bucket_by.name in ('day', 'week') \
+            or options.rolling_window is not None or options.years_ago != 0
+
+    async def load(self):
+
+        # init _category_id_to_name
+        await self._load_categories()
+
+        # init _subcategory_id_to_name and _subcategory_id_to_category_id
+        await self._load_subcategories()
+
+        # init _accumulator
+        self._accumulator = SummaryAccumulator(self.get_groups(), len(self._buckets))
+
+        # the totals of every subcategory that has transactions, per bucket
+        with summarize.tracing.stage('get_index'):
+            index = await summarize.prefix_sum_index.get_index(self._session)
+        with summarize.tracing.stage('get_totals') as stage:
+            (start_ordinals, end_ordinals) = self._get_bucket_ordinals()
+            totals = index.get_totals(start_ordinals, end_ordinals)
+            stage.items = totals.size
+
+        # add them to the rows of their groups
+        group_ids = []
+        rows = []
+        for subcategory_id, group_id in self._get_subcategory_id_to_group_id().items():
+            row = index.get_row(subcategory_id)
+            if row is not None:
+                group_ids.append(group_id)
+                rows.append(row)
+
+        self._accumulator.add_rows(group_ids, totals[rows])
+
+    def _get_bucket_ordinals(self):
+        """ Return (start ordinals, end ordinals) of the dates whose total
+        every bucket holds """
+
+        rolling_window = self._options.rolling_window
+        if rolling_window is not None and rolling_window < 1:
+            raise Exception(f'Invalid rolling_window: {rolling_window}')
+        if self._is_bucket_by_range():
+            if rolling_window is not None:
+                raise Exception('rolling_window requires buckets')
+            ranges = [(self._start_date, self._end_date)]
+        else:
+            bucket_by = self._options.bucket_by.name
+            ranges = []
+            for bucket_number in range(self._first_bucket_number,
+                                       self._first_bucket_number + len(self._buckets)):
+                # the dates of the bucket, or of the window that ends with it
+                first_bucket_number = bucket_number
+                if rolling_window is not None:
+                    first_bucket_number -= rolling_window - 1
+                start_date = util.get_bucket_first_date(first_bucket_number, bucket_by)
+                end_date = util.get_bucket_first_date(bucket_number + 1, bucket_by) - \
+                    datetime.timedelta(days=1)
+
+                # the first and last buckets are cut by the summary's range (the
+                # first window starts before it)
+                if rolling_window is None:
+                    start_date = max(start_date, self._start_date)
+                end_date = min(end_date, self._end_date)
+
+                ranges.append((start_date, end_date))
+
+        years_ago = self._options.years_ago
+        if years_ago != 0:
+            ranges = [(util.add_years(s, -years_ago), util.add_years(e, -years_ago)) for s, e in ranges]
+
+        start_ordinals = numpy.array([s.toordinal() for s, e in ranges], dtype=numpy.int64)
+        end_ordinals = numpy.array([e.toordinal() for s, e in ranges], dtype=numpy.int64)
+        return start_ordinals, end_ordinals
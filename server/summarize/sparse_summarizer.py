@@ -0,0 +1,28 @@
+import numpy
+from summarize.sparse_summary import SparseSummary
+from summarize.i_summary_source import ISummarySource
+
+
+class SparseSummarizer:
+    """ Creates a SparseSummary, given a source """
+
+    @staticmethod
+    def execute(source: ISummarySource) -> SparseSummary:
+
+        buckets = source.get_buckets()
+        groups = source.get_groups()
+        items = source.get_items()
+
+        # the row of every item's group
+        group_id_to_row = {g_id: row for row, g_id in enumerate(groups)}
+        rows = numpy.fromiter(
+            map(group_id_to_row.__getitem__, items.group_ids), numpy.intp, len(items))
+        columns = numpy.frombuffer(items.bucket_idxs, numpy.int64).astype(numpy.intp)
+        values = numpy.frombuffer(items.values, numpy.float64)
+
+        # sum the items of the same cell
+        (cells, item_cells) = numpy.unique(rows * len(buckets) + columns, return_inverse=True)
+        values = numpy.bincount(item_cells, weights=values, minlength=len(cells))
+
+        return SparseSummary(buckets, groups.keys(), groups.values(),
+                             cells // len(buckets), cells % len(buckets), values)
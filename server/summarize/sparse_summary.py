@@ -0,0 +1,55 @@
+import typing
+import numpy
+from summarize.matrix_summary import MatrixSummary
+
+
+class SparseSummary:
+    """ A summary held as its non-zero cells only, for groups that are many
+    but each have values in few buckets (e.g. payees). Cell i is the value
+    values[i] of the group at row rows[i], in the bucket at column
+    columns[i]; no two cells have the same row and column. """
+
+    # row idx => group ID / group name
+    group_ids: typing.List[int]
+    group_names: typing.List[str]
+
+    buckets: typing.List[str]
+
+    # the cells
+    rows: numpy.ndarray
+    columns: numpy.ndarray
+    values: numpy.ndarray
+
+    def __init__(self, buckets, group_ids, group_names, rows, columns, values):
+        self.buckets = buckets
+        self.group_ids = list(group_ids)
+        self.group_names = list(group_names)
+        self.rows = rows
+        self.columns = columns
+        self.values = values
+
+    def get_buckets_count(self):
+        return len(self.buckets)
+
+    def get_groups_count(self):
+        return len(self.group_ids)
+
+    def get_group_totals(self) -> numpy.ndarray:
+        return numpy.bincount(self.rows, weights=self.values, minlength=self.get_groups_count())
+
+    def keep_cells(self, cells: numpy.ndarray) -> None:
+        """ Keep only the given cells (a boolean mask) """
+        self.rows = self.rows[cells]
+        self.columns = self.columns[cells]
+        self.values = self.values[cells]
+
+    def to_matrix(self) -> MatrixSummary:
+        """ Return the MatrixSummary of the groups that have cells (in the
+        order of their rows) """
+        (rows, group_rows) = numpy.unique(self.rows, return_inverse=True)
+        data = numpy.zeros((len(rows), self.get_buckets_count()), dtype=self.values.dtype)
+        data[group_rows, self.columns] = self.values
+        return MatrixSummary(self.buckets,
+                             [self.group_ids[row] for row in rows],
+                             [self.group_names[row] for row in rows],
+                             data)
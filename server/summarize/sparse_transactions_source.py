@@ -0,0 +1,90 @@
+import sqlalchemy
+import db.schema
+import summarize.options
+import summarize.tracing
+from summarize.summary_items import SummaryItems
+from summarize.aggregated_transactions_source import AggregatedTransactionsSource
+
+
+class SparseTransactionsSource(AggregatedTransactionsSource):
+    """ Concrete class - the summary source for transactions grouped by
+    payee or account. There may be thousands of groups (payees), most of
+    them with no transactions in the range, so the items are the sums of
+    the groups and buckets that have transactions (summed in the db), and
+    only their groups are loaded. They're summarized by SparseSummarizer.
+
+    Only categorized transactions are included, by the is_expense and
+    'excluded from reports' of their category, as in other summaries. """
+
+    @staticmethod
+    def supports(options: summarize.options.SummaryOptions) -> bool:
+        return options.group_by.name in ('payee', 'account')
+
+    async def load(self):
+        if self._options.rolling_window is not None or self._options.years_ago != 0:
+            raise Exception('rolling_window and years_ago require group_by category or subcategory')
+
+        # init _category_id_to_name
+        await self._load_categories()
+
+        # init _subcategory_id_to_name and _subcategory_id_to_category_id
+        await self._load_subcategories()
+
+        # get the sums from the db
+        sums = await self._load_group_sums()
+        with summarize.tracing.stage('_accumulate_sums') as stage:
+            self._items = SummaryItems()
+            for (group_id, bucket_number, amount) in sums:
+                bucket_idx = 0 if self._is_bucket_by_range() else bucket_number - self._first_bucket_number
+                self._items.add(group_id, bucket_idx, amount)
+            stage.items = len(self._items)
+
+        # init _group_id_to_name, for the groups that have sums
+        await self._load_group_names(set(self._items.group_ids))
+
+    def get_groups(self):
+        return self._group_id_to_name
+
+    def get_items(self):
+        return self._items
+
+    def get_data(self):
+        return None
+
+    async def _load_group_sums(self):
+        """ Return (group_id, bucket number, sum of amounts) for every group
+        and bucket that has transactions included in the summary """
+
+        transaction = db.schema.Transaction
+        subcategory_ids = self._subcategory_id_to_category_id.keys()
+
+        group_id = self._get_group_id_column(transaction)
+        bucket_number = self._get_bucket_number_sql(transaction.date)
+
+        sql = sqlalchemy.select(
+            group_id,
+            bucket_number,
+            sqlalchemy.func.sum(transaction.amount)) \
+            .where(transaction.date >= self._start_date) \
+            .where(transaction.date <= self._end_date) \
+            .where(transaction.effective_subcategory_id.in_(subcategory_ids)) \
+            .group_by(group_id, bucket_number)
+
+        with summarize.tracing.stage('_load_group_sums') as stage:
+            res = (await self._session.execute(sql)).all()
+            stage.rows = len(res)
+        return res
+
+    async def _load_group_names(self, group_ids):
+        table = db.schema.Payee if self._options.group_by.name == 'payee' else db.schema.Account
+        sql = sqlalchemy.select(table.id, table.name) \
+            .where(table.id.in_(group_ids)) \
+            .order_by(table.name)
+        with summarize.tracing.stage('_load_group_names') as stage:
+            self._group_id_to_name = dict((await self._session.execute(sql)).all())
+            stage.rows = len(self._group_id_to_name)
+
+    def _get_group_id_column(self, transaction):
+        if self._options.group_by.name == 'payee':
+            return transaction.payee_id
+        return transaction.account_id
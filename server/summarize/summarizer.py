@@ -2,6 +2,7 @@ import typing
 from summarize.summary import Summary
 from summarize.i_summary_source import ISummarySource
 from summarize.postprocess.i_postprocessor import IPostprocessor
+from summarize.summary_accumulator import SummaryAccumulator
 
 
 class Summarizer:
@@ -18,9 +19,16 @@ class Summarizer:
         for group_id, group_name in groups.items():
             summary.add_group(group_id, group_name)
 
-        # process every item into the summary
-        items = source.get_items()
-        for item in items:
-            summary.add(item.group_id, item.bucket_idx, item.value)
+        # the source may have summed its items already
+        data = source.get_data()
+        if data is None:
+            # sum every item into its cell
+            accumulator = SummaryAccumulator(groups, summary.get_buckets_count())
+            accumulator.add_items(source.get_items())
+            data = accumulator.data
+
+        # set the data of every group at once
+        for group, group_data in zip(summary.groups.values(), data.tolist()):
+            group.data = group_data
 
         return summary
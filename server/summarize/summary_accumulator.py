@@ -0,0 +1,38 @@
+import typing
+import numpy
+from summarize.summary_items import SummaryItems
+
+
+class SummaryAccumulator:
+    """ Sums the items of a summary source into a groups x buckets array.
+    Sources push their items into it as they load them (in chunks of
+    SummaryItems), so no item has to be kept once it's summed. """
+
+    # the sums, rows in the order of the groups given to the constructor
+    data: numpy.ndarray
+
+    def __init__(self, groups: typing.Iterable[int], buckets_count: int):
+        # group ID => row idx
+        self._group_id_to_row = {g_id: row for row, g_id in enumerate(groups)}
+        self.data = numpy.zeros((len(self._group_id_to_row), buckets_count))
+
+    def add_items(self, items: SummaryItems) -> None:
+        """ Add the given items to their cells """
+        if len(items) == 0:
+            return
+
+        rows = numpy.fromiter(
+            map(self._group_id_to_row.__getitem__, items.group_ids), numpy.intp, len(items))
+        columns = numpy.frombuffer(items.bucket_idxs, numpy.int64)
+        values = numpy.frombuffer(items.values, numpy.float64)
+        numpy.add.at(self.data, (rows, columns), values)
+
+    def add_rows(self, group_ids: typing.List[int], rows: numpy.ndarray) -> None:
+        """ Add the given rows (a value per bucket) to the rows of the given
+        groups, one group per row """
+        if len(group_ids) == 0:
+            return
+
+        group_rows = numpy.fromiter(
+            map(self._group_id_to_row.__getitem__, group_ids), numpy.intp, len(group_ids))
+        numpy.add.at(self.data, group_rows, rows)
@@ -0,0 +1,157 @@
+import collections
+import dataclasses
+from typing import Any, Awaitable, Callable, Hashable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+import db.data_version
+import summarize.options
+
+# In-process LRU cache of summary results (summary and balance summary),
+# keyed by their arguments. All cached results were computed at _version of
+# the data; they're dropped as soon as the data version changes (every
+# mutation and every sync that stored transactions bumps it).
+
+# the max number of cached results
+MAX_SIZE = 128
+
+_version = None
+_results: collections.OrderedDict[Hashable, Any] = collections.OrderedDict()
+
+# counters, see get_stats()
+_hits = 0
+_misses = 0
+_warmed = 0
+
+
+@dataclasses.dataclass
+class SummaryCacheStats:
+    # how many results were found in the cache / had to be made
+    hits: int
+    misses: int
+    # how many results were made ahead of a request (see warm_up())
+    warmed: int
+    # how many results are cached
+    size: int
+
+
+def make_summary_key(start_date, end_date, options: summarize.options.SummaryOptions) -> Hashable:
+    """ Return the cache key of a summary """
+    # SummaryOptions isn't hashable, and its enums may be either the
+    # summarize or the api ones - so key by their values
+    return ('summary', start_date, end_date,
+            options.is_expense, options.group_by.value, options.bucket_by.value,
+            options.merge_under_threshold, options.merge_threshold_percentage, options.top_k,
+            options.rolling_window, options.years_ago)
+
+
+def make_balance_summary_key(start_date, end_date, group_by: summarize.options.SummaryGroupBy) -> Hashable:
+    """ Return the cache key of a balance summary """
+    return ('balance_summary', start_date, end_date, group_by.value)
+
+
+async def get_summary(session: AsyncSession,
+                      key: Hashable,
+                      make_summary: Callable[[], Awaitable[Any]],
+                      bypass: bool = False) -> Any:
+    """ Return the cached result for the given key, or make it (using the
+    given session) and cache it. If bypass is True, the result is always
+    made and the cache isn't used. """
+
+    async def make_summaries(keys):
+        return [await make_summary()]
+
+    return (await get_summaries(session, [key], make_summaries, bypass))[0]
+
+
+async def get_summaries(session: AsyncSession,
+                        keys: List[Hashable],
+                        make_summaries: Callable[[List[Hashable]], Awaitable[List[Any]]],
+                        bypass: bool = False) -> List[Any]:
+    """ Same as get_summary(), for several keys at once: return the results
+    for the given keys, in the same order. make_summaries is called (once)
+    with the keys whose results aren't cached, and returns their results in
+    the same order. """
+
+    global _hits, _misses
+
+    if bypass:
+        return await make_summaries(keys)
+
+    version = await _check_version(session)
+
+    res = [_results.get(key) for key in keys]
+    missing = [i for i, r in enumerate(res) if r is None]
+    _hits += len(keys) - len(missing)
+    _misses += len(missing)
+    for key, r in zip(keys, res):
+        if r is not None:
+            _results.move_to_end(key)
+
+    if len(missing) == 0:
+        return res
+
+    made = await make_summaries([keys[i] for i in missing])
+    for i, r in zip(missing, made):
+        res[i] = r
+
+    for i in missing:
+        _store(version, keys[i], res[i])
+
+    return res
+
+
+async def warm_up(session: AsyncSession,
+                  key: Hashable,
+                  make_summary: Callable[[], Awaitable[Any]]) -> None:
+    """ Make the result for the given key (using the given session) and
+    cache it, unless it's cached already - ahead of a request for it (see
+    summarize.summary_warm_up). Doesn't count as a hit or a miss. """
+
+    global _warmed
+
+    version = await _check_version(session)
+    if key in _results:
+        return
+
+    _warmed += 1
+    _store(version, key, await make_summary())
+
+
+def get_stats() -> SummaryCacheStats:
+    return SummaryCacheStats(hits=_hits, misses=_misses, warmed=_warmed, size=len(_results))
+
+
+def reset() -> None:
+    """ Drop all results and zero the counters (e.g. when switching to
+    another db, whose data version may be the same) """
+
+    global _version, _hits, _misses, _warmed
+
+    _results.clear()
+    _version = None
+    (_hits, _misses, _warmed) = (0, 0, 0)
+
+
+async def _check_version(session: AsyncSession) -> int:
+    """ Drop all results if the data changed since they were made. Return
+    the current data version. """
+
+    global _version
+
+    version = await db.data_version.get_data_version(session)
+    if version != _version:
+        _results.clear()
+        _version = version
+
+    return version
+
+
+def _store(version: int, key: Hashable, res: Any) -> None:
+    """ Cache the given result, made at the given data version """
+
+    # don't cache the result if the data changed while it was made
+    if version != _version:
+        return
+
+    _results[key] = res
+    if len(_results) > MAX_SIZE:
+        _results.popitem(last=False)
@@ -0,0 +1,38 @@
+import array
+
+
+class SummaryItems:
+    """ The items of a summary source, in columns: item i adds values[i] to
+    group group_ids[i] in bucket bucket_idxs[i]. Items are kept in three
+    typed arrays rather than as one object per item.
+
+    In hot loops, append to the arrays directly (e.g. with their bound
+    append methods), rather than calling add() for every item. """
+
+    def __init__(self):
+        self.group_ids = array.array('q')
+        self.bucket_idxs = array.array('q')
+        self.values = array.array('d')
+
+    @staticmethod
+    def from_tuples(items) -> "SummaryItems":
+        """ Return the items for the given (group_id, bucket_idx, value) tuples """
+        res = SummaryItems()
+        for (group_id, bucket_idx, value) in items:
+            res.add(group_id, bucket_idx, value)
+        return res
+
+    def add(self, group_id: int, bucket_idx: int, value: float) -> None:
+        self.group_ids.append(group_id)
+        self.bucket_idxs.append(bucket_idx)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        """ Iterate over the items as (group_id, bucket_idx, value) tuples """
+        return zip(self.group_ids, self.bucket_idxs, self.values)
+
+    def __repr__(self):
+        return str(list(self))
@@ -0,0 +1,139 @@
+import asyncio
+import collections
+import logging
+import typing
+from sqlalchemy.ext.asyncio import AsyncSession
+import db.globals
+import db.data_version
+import summarize.summary_cache
+
+# Warms up the summary cache after the data changes (a sync, or a mutation
+# that categorizes many transactions at once): the summaries that are
+# requested most often are made ahead of the next request for them, so that
+# it's served from the cache.
+#
+# The shapes of the requested summaries (their cache keys, see
+# summarize.summary_cache) are recorded in-process, with how to make them.
+
+# how many of the most requested summaries to make on warm-up
+WARM_UP_COUNT = 10
+
+# the max number of recorded summary shapes (the least requested are dropped)
+MAX_HISTORY = 1000
+
+# how often (in seconds) watch_data_version() checks the data version
+WATCH_INTERVAL = 5
+
+# a function that makes a summary using the given session
+MakeSummary = typing.Callable[[AsyncSession], typing.Awaitable[typing.Any]]
+
+# cache key => how many times it was requested
+_counts = collections.Counter()
+
+# cache key => how to make it
+_makers = {}
+
+# whether a warm-up is running, and whether another one is due once it ends
+_running = False
+_pending = False
+
+# the background tasks (referenced until they end, see _schedule())
+_tasks = set()
+
+
+def record(key: typing.Hashable, make_summary: MakeSummary) -> None:
+    """ Record a request for the summary of the given key """
+
+    _counts[key] += 1
+    _makers[key] = make_summary
+
+    if len(_counts) > MAX_HISTORY:
+        # drop the least requested half (but the one just requested)
+        for old_key, _ in _counts.most_common()[MAX_HISTORY // 2:]:
+            if old_key != key:
+                del _counts[old_key]
+                del _makers[old_key]
+
+
+async def warm_up() -> None:
+    """ Make the most requested summaries that aren't cached. If a warm-up
+    is running already, another one runs once it ends (the data may have
+    changed since it started). """
+
+    global _running, _pending
+
+    if _running:
+        _pending = True
+        return
+
+    _running = True
+    try:
+        _pending = True
+        while _pending:
+            _pending = False
+            await _warm_up_once()
+    finally:
+        _running = False
+
+
+def schedule_warm_up() -> None:
+    """ Run warm_up() in the background, without waiting for it """
+    _schedule(warm_up())
+
+
+def start_watching() -> None:
+    """ Run watch_data_version() in the background """
+    _schedule(watch_data_version())
+
+
+async def watch_data_version() -> None:
+    """ Warm up whenever the data version changes. This also catches the
+    changes made by other processes (a sync runs in a process of its own,
+    see kitmi.py). Runs forever. """
+
+    version = None
+    while True:
+        try:
+            async with db.globals.reader_session_maker() as session:
+                new_version = await db.data_version.get_data_version(session)
+            if new_version != version:
+                version = new_version
+                await warm_up()
+        except Exception as e:
+            logging.exception(str(e))
+
+        await asyncio.sleep(WATCH_INTERVAL)
+
+
+def reset() -> None:
+    """ Forget the recorded requests (e.g. when switching to another db) """
+    _counts.clear()
+    _makers.clear()
+
+
+def _schedule(coro) -> None:
+    task = asyncio.get_running_loop().create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _warm_up_once() -> None:
+    keys = [key for key, _ in _counts.most_common(WARM_UP_COUNT)]
+    if len(keys) == 0:
+        return
+
+    logging.info(f'Warming up the summary cache with {len(keys)} summaries')
+
+    async with db.globals.reader_session_maker() as session:
+        for key in keys:
+            make_summary = _makers[key]
+            try:
+                await summarize.summary_cache.warm_up(
+                    session, key, lambda: make_summary(session))
+            except Exception as e:
+                # the next request for it will fail (or succeed) by itself
+                logging.exception(str(e))
+
+            # end the read transaction, so that every summary is made from
+            # the latest data
+            await session.commit()
@@ -0,0 +1,116 @@
+import contextlib
+import contextvars
+import dataclasses
+import time
+import typing
+
+# Lightweight tracing of the stages of making summaries (loading, summing,
+# post-processing): their wall time, how many rows they read from the db and
+# how many items (values) they allocated.
+#
+# A trace is started per request (see api.summarize_tracing_extension) and
+# every stage within it - in the same task or in tasks started by it - is
+# recorded into it. Stages nest: each is named by the path of the stages
+# it runs within. Outside of a trace, stages aren't recorded.
+
+
+@dataclasses.dataclass
+class TraceStage:
+    # the names of the stages this stage runs within, and its own, joined by '/'
+    name: str
+
+    # wall time
+    seconds: float = 0
+
+    # how many rows the stage read from the db (None if it doesn't read any)
+    rows: int | None = None
+
+    # how many items (values) the stage allocated (None if not counted)
+    items: int | None = None
+
+
+class Trace:
+    """ The stages recorded between start_trace() and end_trace() """
+
+    def __init__(self):
+        self.stages: typing.List[TraceStage] = []
+        self.seconds = 0
+        self._start = time.perf_counter()
+        self._token = None
+        self._ended = False
+
+    def get_stages(self) -> typing.List[TraceStage]:
+        """ Return the stages in the order they started, but with the stages
+        within every top-level stage together (stages that run concurrently
+        are recorded interleaved) """
+        first_idxs = {}
+        for idx, s in enumerate(self.stages):
+            first_idxs.setdefault(s.name.split('/')[0], idx)
+        return sorted(self.stages, key=lambda s: first_idxs[s.name.split('/')[0]])
+
+    def to_dict(self) -> dict:
+        return {
+            'ms': round(self.seconds * 1000, 3),
+            'stages': [{'name': s.name,
+                        'ms': round(s.seconds * 1000, 3),
+                        'rows': s.rows,
+                        'items': s.items} for s in self.get_stages()]
+        }
+
+    def format(self) -> str:
+        """ Return a line per stage, for the log """
+        return '\n'.join(
+            f'  {s.name}: {s.seconds * 1000:.2f} ms' +
+            (f', {s.rows} rows' if s.rows is not None else '') +
+            (f', {s.items} items' if s.items is not None else '')
+            for s in self.get_stages())
+
+
+# the trace of the current request
+_trace = contextvars.ContextVar('summarize_trace', default=None)
+
+# the name of the current stage
+_stage_name = contextvars.ContextVar('summarize_trace_stage_name', default=None)
+
+
+def start_trace() -> Trace:
+    """ Start recording the stages that run in the current context (and in
+    the tasks started from it) """
+    trace = Trace()
+    trace._token = _trace.set(trace)
+    return trace
+
+
+def end_trace(trace: Trace) -> None:
+    """ Stop recording into the given trace (stages that are still running,
+    e.g. in background tasks started within it, are no longer recorded) """
+    trace.seconds = time.perf_counter() - trace._start
+    trace._ended = True
+    _trace.reset(trace._token)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> typing.Iterator[TraceStage]:
+    """ Record the stage that runs within the with block. Yield its
+    TraceStage, to set its rows / items. """
+
+    trace = _trace.get()
+    if trace is None or trace._ended:
+        # not traced
+        yield TraceStage(name)
+        return
+
+    parent_name = _stage_name.get()
+    if parent_name is not None:
+        name = f'{parent_name}/{name}'
+
+    s = TraceStage(name)
+    trace.stages.append(s)
+
+    token = _stage_name.set(name)
+    start = time.perf_counter()
+    try:
+        yield s
+    finally:
+        s.seconds = time.perf_counter() - start
+        _stage_name.reset(token)
@@ -1,34 +1,48 @@
 import datetime
+import numpy
 import summarize.i_summary_source
-import summarize.summary_source_item
+import summarize.list_summary_source
+from summarize.summary_items import SummaryItems
+from summarize.summary_accumulator import SummaryAccumulator
 import sqlalchemy
 import db.schema
 import util
 import summarize.options
+import summarize.tracing
 
 
 class TransactionsSource(summarize.i_summary_source.ISummarySource):
-    """ Concrete class - the summary source for transactions """
+    """ Concrete class - the summary source for transactions.
+
+    The transactions are summed into a groups x buckets array (see
+    get_data()) as they're loaded. If chunk_size is given, they're streamed
+    from the db chunk_size rows at a time, and each chunk is summed before
+    the next is fetched - so memory stays bounded however many transactions
+    are in the range. Otherwise they're all loaded at once. """
 
     def __init__(self, session,
                  start_date: datetime.date,
                  end_date: datetime.date,
-                 options: summarize.options.SummaryOptions):
+                 options: summarize.options.SummaryOptions,
+                 chunk_size: int | None = None):
         self._session = session
         self._start_date = start_date
         self._end_date = end_date
         self._options = options
+        self._chunk_size = chunk_size
 
-        if self._is_bucket_by_month():
-            self._buckets = util.get_months(start_date, end_date)
-            self._bucket_name_to_bucket_idx = \
-                {bucket: idx for idx, bucket in enumerate(self._buckets)}
-        else:
-            # bucket_by is 'range' - there's only one bucket for the whole range
+        if self._is_bucket_by_range():
+            # there's only one bucket for the whole range
             self._buckets = ['']
+        else:
+            self._buckets = util.get_buckets(start_date, end_date, options.bucket_by.name)
+            # the buckets are consecutive, starting with the bucket of
+            # start_date (see util.get_bucket_number_fn())
+            self._first_bucket_number = \
+                util.get_bucket_number_fn(options.bucket_by.name)(start_date)
 
-        # will be filled by the load() function
-        self._items = []
+        # will be created by the load() function, once the groups are known
+        self._accumulator = None
 
         # dict of category_id => category_name for each category that should be
         # included in the summary, ordered by category order
@@ -42,6 +56,10 @@ class TransactionsSource(summarize.i_summary_source.ISummarySource):
         # should be included in the summary
         self._subcategory_id_to_category_id = {}
 
+        # dict of category_id => is_expense for each category that should be
+        # included in the summary
+        self._category_id_to_is_expense = {}
+
     async def load(self):
 
         # init _category_id_to_name
@@ -50,15 +68,22 @@ class TransactionsSource(summarize.i_summary_source.ISummarySource):
         # init _subcategory_id_to_name and _subcategory_id_to_category_id
         await self._load_subcategories()
 
-        # get transactions data from the db (includes the payee's subcategory_id)
+        # init _accumulator
+        self._accumulator = SummaryAccumulator(self.get_groups(), len(self._buckets))
+
+        if self._chunk_size is not None:
+            await self._stream_transactions_data()
+            return
+
+        # get transactions data from the db
         transactions_data = \
             await self._load_transactions_data(
                 self._session,
                 self._start_date,
                 self._end_date)
 
-        # init _items
-        self._fill_items(transactions_data)
+        with summarize.tracing.stage('_accumulate') as stage:
+            stage.items = self._accumulate(transactions_data)
 
     def get_groups(self):
         if self._is_group_by_category():
@@ -70,24 +95,118 @@ class TransactionsSource(summarize.i_summary_source.ISummarySource):
         return self._buckets
 
     def get_items(self):
-        return self._items
+        # the items are pushed into _accumulator as they're loaded
+        return SummaryItems()
+
+    def get_data(self):
+        return self._accumulator.data
+
+    def split_by_is_expense(self):
+        """ Return (income source, expenses source) - the groups and sums of
+        this source split by whether their category is an expense. For a
+        source loaded with is_expense None, so that both are loaded at once. """
+
+        def is_expense(group_id):
+            category_id = group_id if self._is_group_by_category() \
+                else self._subcategory_id_to_category_id[group_id]
+            return self._category_id_to_is_expense[category_id]
+
+        # the groups and their rows in the data, by is_expense
+        split = {False: ({}, []), True: ({}, [])}
+        for row, (group_id, group_name) in enumerate(self.get_groups().items()):
+            (groups, rows) = split[is_expense(group_id)]
+            groups[group_id] = group_name
+            rows.append(row)
+
+        data = self.get_data()
+        return tuple(summarize.list_summary_source.ListSummarySource(
+                         groups, self._buckets, SummaryItems(), data[rows])
+                     for groups, rows in split.values())
+
+    def derive(self,
+               start_date: datetime.date,
+               end_date: datetime.date,
+               options: summarize.options.SummaryOptions):
+        """ Return the source of a summary with the given dates and options,
+        made from the sums of this source rather than loaded again. For a
+        source loaded with is_expense None and group_by subcategory, whose
+        range contains the given one, with buckets (days or months) that
+        each fall within a single bucket of the given options (see
+        BatchSummarizer). """
+
+        # this source's buckets within the range
+        base_bucket_by = self._options.bucket_by.name
+        get_base_number = util.get_bucket_number_fn(base_bucket_by)
+        first_column = get_base_number(start_date) - self._first_bucket_number
+        last_column = get_base_number(end_date) - self._first_bucket_number
+        columns = range(first_column, last_column + 1)
+
+        # the bucket_idx of each of them
+        if options.bucket_by.name == 'range':
+            buckets = ['']
+            bucket_idxs = [0] * len(columns)
+        else:
+            buckets = util.get_buckets(start_date, end_date, options.bucket_by.name)
+            get_number = util.get_bucket_number_fn(options.bucket_by.name)
+            first_number = get_number(start_date)
+            bucket_idxs = [get_number(util.get_bucket_first_date(
+                               self._first_bucket_number + column, base_bucket_by)) - first_number
+                           for column in columns]
+
+        # the groups, and the group_idx of each of this source's groups
+        # (subcategories) that is included
+        def is_included(category_id):
+            return options.is_expense is None or \
+                self._category_id_to_is_expense[category_id] == options.is_expense
+
+        if options.group_by.name == 'category':
+            groups = {c_id: name for c_id, name in self._category_id_to_name.items()
+                      if is_included(c_id)}
+        else:
+            groups = {s_id: name for s_id, name in self._subcategory_id_to_name.items()
+                      if is_included(self._subcategory_id_to_category_id[s_id])}
+        group_id_to_group_idx = {group_id: idx for idx, group_id in enumerate(groups)}
+
+        rows = []
+        group_idxs = []
+        for row, subcategory_id in enumerate(self._subcategory_id_to_name):
+            category_id = self._subcategory_id_to_category_id[subcategory_id]
+            if is_included(category_id):
+                rows.append(row)
+                group_idxs.append(group_id_to_group_idx[
+                    category_id if options.group_by.name == 'category' else subcategory_id])
+
+        # sum the rows into their groups and the columns into their buckets
+        data = numpy.zeros((len(groups), len(buckets)))
+        if len(rows) > 0 and len(columns) > 0:
+            numpy.add.at(data,
+                         (numpy.array(group_idxs)[:, None], numpy.array(bucket_idxs)[None, :]),
+                         self.get_data()[rows, first_column:last_column + 1])
+
+        return summarize.list_summary_source.ListSummarySource(groups, buckets, SummaryItems(), data)
 
     async def _load_categories(self):
-        # Get all expense/income categories (depending on is_expense)
-        # that are not 'excluded from reports'
+        # Get all expense/income categories (depending on is_expense, both
+        # if it's None) that are not 'excluded from reports'
         sql = sqlalchemy.select(db.schema.Category) \
-            .where(db.schema.Category.is_expense == self._options.is_expense) \
             .where(db.schema.Category.exclude_from_reports == False) \
             .order_by(db.schema.Category.order)
-        categories = (await self._session.execute(sql)).scalars().unique().all()
+        if self._options.is_expense is not None:
+            sql = sql.where(db.schema.Category.is_expense == self._options.is_expense)
+        with summarize.tracing.stage('_load_categories') as stage:
+            categories = (await self._session.execute(sql)).scalars().unique().all()
+            stage.rows = len(categories)
 
-        # map these categories: id => name
+        # map these categories: id => name and id => is_expense
         self._category_id_to_name = {c.id: c.name for c in categories}
+        self._category_id_to_is_expense = {c.id: c.is_expense for c in categories}
 
     async def _load_subcategories(self):
         # Get all subcategories that belong to the given categories
         sql = sqlalchemy.select(db.schema.Subcategory)
-        all_subcategories = (await self._session.execute(sql)).scalars().unique().all()
+        with summarize.tracing.stage('_load_subcategories') as stage:
+            all_subcategories = (await self._session.execute(sql)).scalars().unique().all()
+            stage.rows = len(all_subcategories)
 
         # The following allows ordering subcategories by the categories' order
         # and filtering only the subcategories that belong to the given
@@ -107,66 +226,89 @@ class TransactionsSource(summarize.i_summary_source.ISummarySource):
                 self._subcategory_id_to_category_id[s.id] = s.category_id
 
     @staticmethod
-    async def _load_transactions_data(session, start_date, end_date):
-        # get transaction amount, date, subcategory_id, override_subcategory
-        # payees.subcategory_id
+    def _get_transactions_data_sql(start_date, end_date):
+        # get transaction amount, date and effective_subcategory_id
         # for all transactions whose date is between start_date and end_date
-        sql = sqlalchemy.select(
+        return sqlalchemy.select(
             db.schema.Transaction.amount,
             db.schema.Transaction.date,
-            db.schema.Transaction.subcategory_id,
-            db.schema.Transaction.override_subcategory,
-            db.schema.Payee.subcategory_id) \
-            .join_from(db.schema.Transaction,
-                       db.schema.Payee) \
+            db.schema.Transaction.effective_subcategory_id) \
             .filter(db.schema.Transaction.date >= start_date) \
             .filter(db.schema.Transaction.date <= end_date)
-        return (await session.execute(sql)).all()
-
-    def _fill_items(self, transactions_data):
-        """ Fill _items with transactions that are included in the summary """
-
-        for td in transactions_data:
-            (amount,
-             date,
-             transaction_subcategory_id,
-             override_subcategory,
-             payee_subcategory_id) = td
-
-            # Determine the actual subcategory_id for the transaction
-            # (either of the payee or of the transaction)
-            subcategory_id = payee_subcategory_id
-            if override_subcategory:
-                subcategory_id = transaction_subcategory_id
-
-            # Determine the category_id for the transaction
-            category_id = self._subcategory_id_to_category_id.get(subcategory_id)
-
-            # add the transaction to the list only if its category is not
-            # filtered out
-            if category_id is not None:
-
-                # the group_id of this item
-                group_id = category_id
-                if not self._is_group_by_category():
-                    group_id = subcategory_id
-
-                item = summarize.summary_source_item.SummarySourceItem(
-                    value=amount,
-                    bucket_idx=self._get_bucket_idx(date),
-                    group_id=group_id)
-                self._items.append(item)
-
-    def _get_bucket_idx(self, date):
-        if self._is_bucket_by_month():
-            month_and_year = date.strftime('%Y-%m')
-            return self._bucket_name_to_bucket_idx[month_and_year]
-
-        # bucket_by is 'range'. There's only one bucket.
-        return 0
-
-    def _is_bucket_by_month(self):
-        return self._options.bucket_by.name == 'month'
+
+    @staticmethod
+    async def _load_transactions_data(session, start_date, end_date):
+        sql = TransactionsSource._get_transactions_data_sql(start_date, end_date)
+        with summarize.tracing.stage('_load_transactions_data') as stage:
+            res = (await session.execute(sql)).all()
+            stage.rows = len(res)
+        return res
+
+    async def _stream_transactions_data(self):
+        """ Sum the transactions into _accumulator, chunk_size transactions
+        at a time """
+        sql = self._get_transactions_data_sql(self._start_date, self._end_date) \
+            .execution_options(yield_per=self._chunk_size)
+        with summarize.tracing.stage('_stream_transactions_data') as stage:
+            res = await self._session.stream(sql)
+
+            # (the chunks are traced as a whole)
+            (stage.rows, stage.items) = (0, 0)
+            async for chunk in res.partitions(self._chunk_size):
+                stage.rows += len(chunk)
+                stage.items += self._accumulate(chunk)
+
+    def _accumulate(self, transactions_data):
+        """ Sum the transactions that are included in the summary into
+        _accumulator. Return how many were included. """
+
+        items = SummaryItems()
+
+        # everything that doesn't depend on the transaction is looked up
+        # once, rather than for every transaction
+        get_group_id = self._get_subcategory_id_to_group_id().get
+        get_bucket_idx = self._get_bucket_idx_fn()
+        add_group_id = items.group_ids.append
+        add_bucket_idx = items.bucket_idxs.append
+        add_value = items.values.append
+
+        for (amount, date, subcategory_id) in transactions_data:
+
+            # add the transaction only if its category is not filtered out
+            group_id = get_group_id(subcategory_id)
+            if group_id is not None:
+                add_group_id(group_id)
+                add_bucket_idx(get_bucket_idx(date))
+                add_value(amount)
+
+        self._accumulator.add_items(items)
+        return len(items)
+
+    def _get_subcategory_id_to_group_id(self):
+        """ Return a dict of subcategory_id => group_id for each subcategory
+        that should be included in the summary """
+        if self._is_group_by_category():
+            return self._subcategory_id_to_category_id
+
+        return {s_id: s_id for s_id in self._subcategory_id_to_category_id}
+
+    def _get_bucket_idx_fn(self):
+        """ Return a function that returns the bucket_idx of a date """
+        if self._is_bucket_by_range():
+            # there's only one bucket
+            def get_range_idx(date):
+                return 0
+            return get_range_idx
+
+        get_bucket_number = util.get_bucket_number_fn(self._options.bucket_by.name)
+        first_bucket_number = self._first_bucket_number
+
+        def get_bucket_idx(date):
+            return get_bucket_number(date) - first_bucket_number
+        return get_bucket_idx
+
+    def _is_bucket_by_range(self):
+        return self._options.bucket_by.name == 'range'
 
     def _is_group_by_category(self):
         return self._options.group_by.name == 'category'
@@ -1,14 +1,32 @@
 import datetime
 
 import summarize.transactions_source
-import summarize.summarizer
-from summarize.postprocess.erase_empty_groups import EraseEmptyGroups
-from summarize.postprocess.fix_precision import FixPrecision
-from summarize.postprocess.reverse_sign import ReverseSign
-from summarize.postprocess.merge_under_threshold import MergeUnderThreshold
-from summarize.postprocess.calc_totals import CalcTotals
-from summarize.postprocess.order_groups_by_size_in_first_bucket import OrderGroupsBySizeInFirstBucket
+from summarize.aggregated_transactions_source import AggregatedTransactionsSource
+from summarize.monthly_rollup_source import MonthlyRollupSource
+from summarize.prefix_sum_source import PrefixSumSource
+from summarize.sparse_transactions_source import SparseTransactionsSource
+from summarize.sparse_summarizer import SparseSummarizer
+import summarize.matrix_summarizer
+from summarize.postprocess.matrix_erase_empty_groups import MatrixEraseEmptyGroups
+from summarize.postprocess.matrix_fix_precision import MatrixFixPrecision
+from summarize.postprocess.matrix_reverse_sign import MatrixReverseSign
+from summarize.postprocess.matrix_merge_under_threshold import MatrixMergeUnderThreshold
+from summarize.postprocess.matrix_calc_totals import MatrixCalcTotals
+from summarize.postprocess.matrix_order_groups_by_size_in_first_bucket import \
+    MatrixOrderGroupsBySizeInFirstBucket
+from summarize.postprocess.matrix_pipeline import MatrixPipeline
+from summarize.postprocess.sparse_fix_precision import SparseFixPrecision
+from summarize.postprocess.sparse_reverse_sign import SparseReverseSign
+from summarize.postprocess.sparse_erase_empty_cells import SparseEraseEmptyCells
+from summarize.postprocess.sparse_merge_all_but_top_k import SparseMergeAllButTopK
 import summarize.options
+import summarize.tracing
+from summarize.i_summary_source import ISummarySource
+import util
+
+# the number of groups in a summary by payee or account, when top_k isn't
+# given (the rest are merged into "Other")
+SPARSE_TOP_K = 20
 
 
 class TransactionsSummarizer:
@@ -20,30 +38,108 @@ class TransactionsSummarizer:
                       options: summarize.options.SummaryOptions):
 
         # load source data
-        source = summarize.transactions_source.TransactionsSource(
-            session, start_date, end_date, options)
-        await source.load()
+        source = TransactionsSummarizer.make_source(session, start_date, end_date, options)
+        await TransactionsSummarizer.load_source(source)
+
+        return TransactionsSummarizer.summarize(source, options)
+
+    @staticmethod
+    async def load_source(source: ISummarySource) -> None:
+        """ Load the given source (traced as a stage, see summarize.tracing) """
+        with summarize.tracing.stage(f'{type(source).__name__}.load'):
+            await source.load()
+
+    @staticmethod
+    def make_source(session,
+                    start_date: datetime.date,
+                    end_date: datetime.date,
+                    options: summarize.options.SummaryOptions) \
+            -> summarize.transactions_source.TransactionsSource:
+        """ Return the (not yet loaded) source for the summary. Take the totals
+        of arbitrary dates from the cumulative daily sums, and the monthly
+        sums from the rollup table, when possible, otherwise sum the
+        transactions in the db (every bucket_by can be summed in the db, see
+        AggregatedTransactionsSource), rather than loading every transaction. """
+        if SparseTransactionsSource.supports(options):
+            return SparseTransactionsSource(session, start_date, end_date, options)
+
+        if PrefixSumSource.supports(options):
+            return PrefixSumSource(session, start_date, end_date, options)
+
+        if MonthlyRollupSource.supports(options):
+            return MonthlyRollupSource(session, start_date, end_date, options)
+
+        return AggregatedTransactionsSource(session, start_date, end_date, options)
+
+    @staticmethod
+    def _summarize_sparse(source: ISummarySource, options: summarize.options.SummaryOptions):
+        """ Return the MatrixSummary of the top groups (and "Other") of the
+        given loaded source of many groups (see SparseTransactionsSource).
+        Only their non-zero cells are post-processed.
+
+        Unlike in other summaries, the top groups are kept before the
+        threshold merge (which summarize() then applies to them and "Other"),
+        so that the other groups are never made into a matrix. """
 
-        # summarize
-        summarizer = summarize.summarizer.Summarizer()
-        summary = summarizer.execute(source)
+        with summarize.tracing.stage('SparseSummarizer') as stage:
+            summary = SparseSummarizer.execute(source)
+            stage.items = len(summary.values)
 
-        # post-process
-        postprocessors = [FixPrecision()]
+        postprocessors = [SparseFixPrecision(util.MINOR_UNITS_PER_UNIT)]
 
         if options.is_expense:
-            postprocessors.append(ReverseSign())
+            postprocessors.append(SparseReverseSign())
 
-        if options.merge_under_threshold:
-            postprocessors.append(MergeUnderThreshold())
+        postprocessors.append(SparseEraseEmptyCells())
+        postprocessors.append(SparseMergeAllButTopK(
+            options.top_k if options.top_k is not None else SPARSE_TOP_K))
 
-        postprocessors.append(EraseEmptyGroups())
-        postprocessors.append(CalcTotals())
+        for p in postprocessors:
+            with summarize.tracing.stage(type(p).__name__):
+                p.execute(summary)
+
+        with summarize.tracing.stage('SparseSummary.to_matrix') as stage:
+            res = summary.to_matrix()
+            stage.items = res.data.size
+
+        return res
+
+    @staticmethod
+    def summarize(source: ISummarySource, options: summarize.options.SummaryOptions):
+        """ Return the summary of the given loaded source """
+
+        top_k = options.top_k
+        if SparseTransactionsSource.supports(options):
+            # only the top groups are made into a matrix, already post-processed
+            summary = TransactionsSummarizer._summarize_sparse(source, options)
+            postprocessors = []
+            top_k = None
+        else:
+            # summarize into a groups x buckets matrix
+            with summarize.tracing.stage('MatrixSummarizer') as stage:
+                summarizer = summarize.matrix_summarizer.MatrixSummarizer()
+                summary = summarizer.execute(source)
+                stage.items = summary.data.size
+
+            # post-process
+            # (the amounts are in minor units)
+            postprocessors = [MatrixFixPrecision(util.MINOR_UNITS_PER_UNIT)]
+
+            if options.is_expense:
+                postprocessors.append(MatrixReverseSign())
+
+        if options.merge_under_threshold or top_k is not None:
+            threshold_percentage = options.merge_threshold_percentage \
+                if options.merge_under_threshold else None
+            postprocessors.append(MatrixMergeUnderThreshold(threshold_percentage, top_k))
+
+        postprocessors.append(MatrixEraseEmptyGroups())
+        postprocessors.append(MatrixCalcTotals())
 
         if options.bucket_by.name == 'range':
-            postprocessors.append(OrderGroupsBySizeInFirstBucket())
+            postprocessors.append(MatrixOrderGroupsBySizeInFirstBucket())
 
-        for p in postprocessors:
-            p.execute(summary)
+        # consecutive element-wise postprocessors run as a single pass
+        MatrixPipeline(postprocessors).execute(summary)
 
         return summary
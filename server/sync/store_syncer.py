@@ -26,13 +26,16 @@ class StoreSyncer:
 
         # load all accounts and payees from db
         logging.info('Loading accounts and payees from the db')
-        (accounts, payees) = await asyncio.gather(
-            get_all(self._session, Account),
-            get_all(self._session, Payee)
-        )
+        # (one after the other - a session can't be used concurrently)
+        accounts = await get_all(self._session, Account)
+        payees = await get_all(self._session, Payee)
 
         logging.info(f'Loaded {len(accounts)} accounts and {len(payees)} payees')
 
+        # end the read transaction to release the db writer connection,
+        # the sync of each account uses a session of its own
+        await self._session.commit()
+
         if logging.DEBUG >= logging.root.level:
             logging.debug(f'{len(accounts)} accounts:')
             for a in accounts:
@@ -6,6 +6,8 @@ import logging
 import db.transaction
 import db.schema
 import db.payee
+import db.data_version
+import util
 from fetch.i_account_data_fetcher import IAccountDataFetcher
 
 
@@ -30,6 +32,14 @@ class StoreSyncerForOneAccount:
         start_date = self._determine_start_date()
         end_date = datetime.datetime.today().date()
 
+        # Get the transactions for this account from the source.
+        # This is done before touching the db, so that the (single) db writer
+        # connection isn't held while waiting for the source.
+        logging.info(f"{self._account.name}: Fetching account data between {start_date} and {end_date}...")
+        transactions = await self._fetcher.fetch(start_date, end_date)
+        count = len(transactions)
+        logging.info(f"{self._account.name}: Done fetching account data ({count} transactions).")
+
         # Load all transaction ids for this account newer than the start_date
         # (to avoid inserting duplicates)
 
@@ -37,21 +47,16 @@ class StoreSyncerForOneAccount:
                       f"Getting all stored transaction IDs for this account starting at "
                       f"{start_date}")
 
-        transaction_ids = await db.transaction.get_all_transaction_ids(
-            session, self._account.id, start_date)
+        transaction_ids = set(await db.transaction.get_all_transaction_external_ids(
+            session, self._account.id, start_date))
 
         logging.info(f'{self._account.name}: Loaded {len(transaction_ids)} transaction IDs')
         if logging.DEBUG >= logging.root.level:
             for id_ in transaction_ids:
                 logging.debug(f'{id_}')
 
-        # Get the transactions for this account from the source
-        logging.info(f"{self._account.name}: Fetching account data between {start_date} and {end_date}...")
-        transactions = await self._fetcher.fetch(start_date, end_date)
-        count = len(transactions)
-        logging.info(f"{self._account.name}: Done fetching account data ({count} transactions).")
-
         # Filter out any transactions that have already been stored
+        # (the fetched transaction's ID is stored as its external_id)
         transactions = [t for t in transactions if t.id not in transaction_ids]
         logging.info(f"{self._account.name}: {len(transactions)} out of {count} transactions haven't already been stored")
 
@@ -71,6 +76,10 @@ class StoreSyncerForOneAccount:
         await session.execute(sql)
         await session.commit()
 
+        if len(transactions) > 0:
+            # invalidate results cached from the previous data
+            await db.data_version.bump_data_version(session)
+
         logging.info(f"{self._account.name}: Done. Stored {len(transactions)} transactions")
 
     async def _store_new_payees(self, session: AsyncSession, transactions):
@@ -125,9 +134,9 @@ class StoreSyncerForOneAccount:
 
         for t in transactions:
             rec = db.schema.Transaction(
-                id=t.id,
+                external_id=t.id,
                 date=t.date,
-                amount=t.amount,
+                amount=util.to_minor_units(t.amount),
                 account_id=self._account.id,
                 payee_id=payees[t.payee])
 
@@ -135,6 +144,11 @@ class StoreSyncerForOneAccount:
             logging.debug(f"{rec}")
             session.add(rec)
 
+        # new transactions belong to their payee's subcategory
+        await session.flush()
+        await db.transaction.update_effective_subcategory_ids(
+            session, db.schema.Transaction.external_id.in_([t.id for t in transactions]))
+
         await session.commit()
 
     def _determine_start_date(self):
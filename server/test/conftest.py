@@ -0,0 +1,98 @@
+import contextlib
+import datetime
+import itertools
+import random
+import pytest
+import sqlalchemy
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import db.schema
+from db.schema import Account, AccountSource, Category, Subcategory, Payee, Transaction
+import summarize.prefix_sum_index
+import summarize.summary_cache
+import summarize.summary_warm_up
+
+# The db of the tests that need one: an in-memory db with the schema (and
+# its triggers), seeded with the given rows. A row is a dict of column
+# values by name, and only needs its id and the columns the test cares
+# about: the rest are filled in from _DEFAULTS.
+
+# table => the default values of a row, given its id
+_DEFAULTS = {
+    Account: lambda id_: {'name': f'a{id_}', 'source': AccountSource.max, 'username': '', 'password': ''},
+    Category: lambda id_: {'name': f'c{id_}', 'is_expense': True, 'order': id_},
+    Subcategory: lambda id_: {'name': f's{id_}', 'category_id': 1},
+    Payee: lambda id_: {'name': f'p{id_}'},
+    Transaction: lambda id_: {'external_id': str(id_), 'amount': -100, 'account_id': 1, 'payee_id': 1},
+}
+
+
+@contextlib.asynccontextmanager
+async def _seeded_db(accounts=({'id': 1},),
+                     categories=(),
+                     subcategories=(),
+                     payees=({'id': 1},),
+                     transactions=()):
+    """ Create the db, seeded with the given rows (by default, one account
+    and one payee, which transactions refer to by default), and yield its
+    session maker """
+
+    # the caches of another test's db would have the same data version
+    summarize.prefix_sum_index.reset()
+    summarize.summary_cache.reset()
+    summarize.summary_warm_up.reset()
+
+    engine = create_async_engine('sqlite+aiosqlite://')
+    async with engine.begin() as conn:
+        await conn.run_sync(db.schema.Base.metadata.create_all)
+        for class_, rows in [(Account, accounts), (Category, categories), (Subcategory, subcategories),
+                             (Payee, payees), (Transaction, transactions)]:
+            rows = [{**_DEFAULTS[class_](row['id']), **row} for row in rows]
+            # (an executemany inserts only the columns of its first row)
+            for _, same_columns_rows in itertools.groupby(rows, key=sorted):
+                await conn.execute(sqlalchemy.insert(class_), list(same_columns_rows))
+
+    try:
+        yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def seeded_db():
+    """ Return a function that creates a seeded db, to use within the test's
+    event loop: async with seeded_db(transactions=[...]) as session_maker """
+    return _seeded_db
+
+
+@pytest.fixture
+def summary_db():
+    """ Return a function that creates a seeded db for summaries: 2000
+    random transactions in 2022, in 12 subcategories of 4 categories (an
+    income category, and an expense category that is excluded from
+    reports) """
+
+    def make():
+        rnd = random.Random(0)
+
+        # (name, is_expense, exclude_from_reports)
+        categories = [('Food', True, False), ('Car', True, False),
+                      ('Salary', False, False), ('Transfers', True, True)]
+        transactions = []
+        for t in range(1, 2001):
+            subcategory_id = rnd.randint(1, 12)
+            is_income = (subcategory_id - 1) % 4 == 2
+            transactions.append({
+                'id': t,
+                'date': datetime.date(2022, 1, 1) + datetime.timedelta(days=rnd.randrange(365)),
+                'amount': rnd.randrange(1, 1000000) if is_income else -rnd.randrange(1, 100000),
+                'effective_subcategory_id': subcategory_id})
+
+        return _seeded_db(
+            categories=[{'id': i + 1, 'name': name, 'is_expense': is_expense, 'order': i,
+                         'exclude_from_reports': exclude}
+                        for i, (name, is_expense, exclude) in enumerate(categories)],
+            subcategories=[{'id': s, 'category_id': (s - 1) % 4 + 1} for s in range(1, 13)],
+            transactions=transactions)
+
+    return make
@@ -0,0 +1,41 @@
+import asyncio
+import datetime
+import summarize.options
+from summarize.balance_summarizer import BalanceSummarizer
+from summarize.transactions_summarizer import TransactionsSummarizer
+
+
+def _to_dict(summary):
+    return {g_id: data for g_id, data in zip(summary.group_ids, summary.data.tolist())}
+
+
+async def _test_balance_summary(summary_db):
+    async with summary_db() as session_maker:
+        start_date = datetime.date(2022, 1, 15)
+        end_date = datetime.date(2022, 12, 31)
+        for group_by in summarize.options.SummaryGroupBy:
+            async with session_maker() as session:
+                summary = await BalanceSummarizer().execute(session, start_date, end_date, group_by)
+
+                # the same as two separate summaries
+                for is_expense, res in [(False, summary.income), (True, summary.expenses)]:
+                    options = summarize.options.SummaryOptions(
+                        is_expense=is_expense,
+                        group_by=group_by,
+                        bucket_by=summarize.options.SummaryBucketBy.month,
+                        merge_under_threshold=False)
+                    expected = await TransactionsSummarizer().execute(session, start_date, end_date, options)
+                    assert _to_dict(res) == _to_dict(expected)
+                    assert res.bucket_totals == expected.bucket_totals
+
+            assert summary.savings == [i - e for i, e in zip(
+                summary.income.bucket_totals, summary.expenses.bucket_totals)]
+            assert summary.savings_percentages == [int(100 * s / i) for s, i in zip(
+                summary.savings, summary.income.bucket_totals)]
+
+            # the excluded category isn't in either
+            assert 4 not in summary.income.group_ids + summary.expenses.group_ids
+
+
+def test_balance_summary(summary_db):
+    asyncio.run(_test_balance_summary(summary_db))
@@ -0,0 +1,60 @@
+import asyncio
+import datetime
+import summarize.options
+from summarize.batch_summarizer import BatchSummarizer
+from summarize.transactions_summarizer import TransactionsSummarizer
+
+
+def _to_dict(summary):
+    return {g_id: data for g_id, data in zip(summary.group_ids, summary.data.tolist())}
+
+
+async def _test_batch_summary(summary_db):
+    async with summary_db() as session_maker:
+        def options(is_expense, group_by, bucket_by, top_k=None):
+            return summarize.options.SummaryOptions(
+                is_expense=is_expense,
+                group_by=summarize.options.SummaryGroupBy(group_by),
+                bucket_by=summarize.options.SummaryBucketBy(bucket_by),
+                merge_under_threshold=True,
+                top_k=top_k)
+
+        # a dashboard: this month (to date) and the last 12 months
+        this_month = (datetime.date(2022, 11, 1), datetime.date(2022, 11, 20))
+        last_12_months = (datetime.date(2021, 12, 1), datetime.date(2022, 11, 20))
+        dashboard = [
+            (*this_month, options(True, 'category', 'range')),
+            (*this_month, options(True, 'subcategory', 'range', top_k=2)),
+            (*this_month, options(False, 'category', 'range')),
+            (*last_12_months, options(True, 'category', 'month')),
+            (*last_12_months, options(True, 'subcategory', 'quarter')),
+            (*last_12_months, options(False, 'subcategory', 'month')),
+        ]
+        # months cut in the middle, days and weeks
+        other = dashboard + [
+            (datetime.date(2022, 3, 10), datetime.date(2022, 5, 17), options(True, 'category', 'month')),
+            (datetime.date(2022, 6, 1), datetime.date(2022, 6, 30), options(True, 'subcategory', 'day')),
+            (datetime.date(2022, 2, 3), datetime.date(2022, 9, 4), options(False, 'category', 'week')),
+        ]
+
+        async with session_maker() as session:
+            for requests, expected_plan in [
+                    (dashboard, [('month', [0, 1, 2, 3, 4, 5])]),
+                    (other, [('month', [0, 1, 2, 3, 4, 5]), ('day', [7, 8]), ('month', [6])])]:
+                plan = [(bucket_by.name, idxs) for bucket_by, idxs in BatchSummarizer._plan(requests)]
+                assert plan == expected_plan
+
+                res = await BatchSummarizer.execute(session, requests)
+                assert len(res) == len(requests)
+
+                # the same as separate summaries
+                for summary, (start_date, end_date, o) in zip(res, requests):
+                    expected = await TransactionsSummarizer().execute(session, start_date, end_date, o)
+                    assert summary.buckets == expected.buckets
+                    assert summary.group_names == expected.group_names
+                    assert _to_dict(summary) == _to_dict(expected)
+                    assert summary.bucket_totals == expected.bucket_totals
+
+
+def test_batch_summary(summary_db):
+    asyncio.run(_test_batch_summary(summary_db))
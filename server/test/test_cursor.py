@@ -0,0 +1,67 @@
+import asyncio
+import datetime
+import pytest
+import sqlalchemy
+import db.transaction
+import db.utils
+from db.cursor import encode_cursor, decode_cursor
+from db.schema import Transaction, Payee
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime.date(2022, 3, 15), 12)
+    assert decode_cursor(cursor, Transaction.date) == (datetime.date(2022, 3, 15), 12)
+
+    cursor = encode_cursor('some payee', 34)
+    assert decode_cursor(cursor, Payee.name) == ('some payee', 34)
+
+
+def test_invalid_cursor():
+    with pytest.raises(Exception, match='invalid cursor'):
+        decode_cursor('not a cursor', Payee.name)
+
+
+async def _test_paginate_nullable_column(seeded_db):
+    # a third of the transactions have no subcategory
+    transactions = [{'id': t, 'date': datetime.date(2022, 1, t),
+                     'subcategory_id': None if t % 3 == 0 else t % 3} for t in range(1, 31)]
+    async with seeded_db(categories=[{'id': 1}],
+                         subcategories=[{'id': s} for s in range(1, 4)],
+                         transactions=transactions) as session_maker:
+        async with session_maker() as session:
+            for descending in [False, True]:
+                expected = (await session.execute(db.utils.paginate(
+                    sqlalchemy.select(Transaction), Transaction, 'subcategory_id', descending,
+                    None, 0, None))).scalars().all()
+
+                # page through all of them, 4 at a time
+                ids = []
+                cursor = None
+                while True:
+                    sql = db.utils.paginate(sqlalchemy.select(Transaction), Transaction, 'subcategory_id',
+                                            descending, 4, 0, cursor)
+                    window = db.utils.make_pagination_window(
+                        (await session.execute(sql)).scalars().all(), 'subcategory_id', 4, None)
+                    ids += [t.id for t in window.items]
+                    if not window.has_more:
+                        break
+                    cursor = window.next_cursor
+
+                assert ids == [t.id for t in expected]
+                assert len(ids) == 30
+
+            # the same through get_transactions()
+            ids = []
+            cursor = None
+            while True:
+                window = await db.transaction.get_transactions(
+                    session, 'subcategory_id', None, 4, 0, cursor, with_count=False)
+                ids += [t.id for t in window.items]
+                if not window.has_more:
+                    break
+                cursor = window.next_cursor
+            assert len(ids) == 30
+
+
+def test_paginate_nullable_column(seeded_db):
+    asyncio.run(_test_paginate_nullable_column(seeded_db))
@@ -0,0 +1,39 @@
+import asyncio
+import sqlalchemy
+import db.utils
+from db.schema import Payee
+
+
+async def _test_update_many_values(seeded_db):
+    async with seeded_db(categories=[{'id': 1}],
+                         subcategories=[{'id': s} for s in range(1, 4)],
+                         payees=[{'id': p} for p in range(1, 6)]) as session_maker:
+        async def get_payees():
+            async with session_maker() as session:
+                sql = sqlalchemy.select(Payee.id, Payee.subcategory_id, Payee.note).order_by(Payee.id)
+                return [tuple(row) for row in (await session.execute(sql)).all()]
+
+        # several rows in one call, some of them updating other columns
+        async with session_maker() as session:
+            assert await db.utils.update_many_values(session, Payee, {
+                1: {'subcategory_id': 1},
+                2: {'subcategory_id': 2},
+                3: {'subcategory_id': 3, 'note': 'n3'},
+                4: {'note': 'n4'},
+            }) is None
+        assert await get_payees() == [
+            (1, 1, ''), (2, 2, ''), (3, 3, 'n3'), (4, None, 'n4'), (5, None, '')]
+
+        # an unknown subcategory: the record is reported, and nothing is written
+        async with session_maker() as session:
+            assert await db.utils.update_many_values(session, Payee, {
+                1: {'subcategory_id': 2},
+                2: {'subcategory_id': 99},
+                5: {'subcategory_id': None},
+            }) == {2: 'Foreign key constraint failed.'}
+        assert await get_payees() == [
+            (1, 1, ''), (2, 2, ''), (3, 3, 'n3'), (4, None, 'n4'), (5, None, '')]
+
+
+def test_update_many_values(seeded_db):
+    asyncio.run(_test_update_many_values(seeded_db))
@@ -0,0 +1,73 @@
+import asyncio
+import datetime
+import sqlalchemy
+import db.payee
+import db.transaction
+from db.payees_filter import PayeesFilter
+from db.transactions_filter import TransactionsFilter
+from db.fts import to_match_query
+
+
+def test_to_match_query():
+    assert to_match_query('sup mar') == '"sup"* "mar"*'
+
+    # FTS5 query syntax is quoted
+    assert to_match_query('a"b OR') == '"a""b"* "OR"*'
+
+    assert to_match_query('   ') is None
+
+
+async def _test_fts(seeded_db):
+    payees = [{'id': 1, 'name': 'Super Market'}, {'id': 2, 'name': 'Cafe', 'note': 'near the supermarket'},
+              {'id': 3, 'name': 'Gas Station'}]
+    transactions = [{'id': t, 'date': datetime.date.fromisoformat(date), 'note': note}
+                    for (t, date, note) in [(1, '2022-01-01', 'birthday cake'), (2, '2022-03-01', 'cake for work'),
+                                            (3, '2022-05-01', ''), (4, '2022-04-01', 'gift')]]
+    async with seeded_db(payees=payees, transactions=transactions) as session_maker:
+        async def match(table, query):
+            async with session_maker() as session:
+                res = await session.execute(sqlalchemy.text(
+                    f'SELECT rowid FROM {table} WHERE {table} MATCH :query ORDER BY rowid'), {'query': query})
+                return [row[0] for row in res.all()]
+
+        async def execute(*statements):
+            async with session_maker() as session:
+                for statement in statements:
+                    await session.execute(sqlalchemy.text(statement))
+                await session.commit()
+
+        # inserts
+        assert await match('payees_fts', 'super*') == [1, 2]
+        assert await match('transactions_fts', 'cake') == [1, 2]
+
+        # updates and deletes
+        await execute("UPDATE payees SET name = 'Fuel' WHERE id = 3",
+                      "UPDATE payees SET note = '' WHERE id = 2",
+                      "UPDATE transactions SET note = 'cake' WHERE id = 3",
+                      "UPDATE transactions SET note = '' WHERE id = 1",
+                      "DELETE FROM transactions WHERE id = 4")
+        assert await match('payees_fts', 'super*') == [1]
+        assert await match('payees_fts', 'gas') == []
+        assert await match('payees_fts', 'fuel') == [3]
+        assert await match('transactions_fts', 'cake') == [2, 3]
+        assert await match('transactions_fts', 'gift') == []
+
+        await execute("UPDATE payees SET note = 'near the supermarket' WHERE id = 2",
+                      "DELETE FROM payees WHERE id = 3")
+        assert await match('payees_fts', 'fuel') == []
+
+        async with session_maker() as session:
+            # payees are ranked: a match in the name before a match in the note
+            window = await db.payee.get_payees(
+                session, 'name', PayeesFilter(categorized=None, search='sup'), with_count=False)
+            assert [p.id for p in window.items] == [1, 2]
+
+            # transactions are in date order (newest first), not ranked
+            window = await db.transaction.get_transactions(
+                session, 'date', TransactionsFilter(categorized=None, payee_id=None, search='cak'),
+                with_count=False)
+            assert [t.id for t in window.items] == [3, 2]
+
+
+def test_fts(seeded_db):
+    asyncio.run(_test_fts(seeded_db))
@@ -0,0 +1,184 @@
+import random
+import numpy
+from summarize.i_summary_source import ISummarySource
+from summarize.summary_items import SummaryItems
+from summarize.summarizer import Summarizer
+from summarize.matrix_summarizer import MatrixSummarizer
+from summarize.matrix_summary import MatrixSummary
+from summarize.postprocess.fix_precision import FixPrecision
+from summarize.postprocess.reverse_sign import ReverseSign
+from summarize.postprocess.erase_empty_groups import EraseEmptyGroups
+from summarize.postprocess.merge_under_threshold import MergeUnderThreshold
+from summarize.postprocess.calc_totals import CalcTotals
+from summarize.postprocess.order_groups_by_size_in_first_bucket import OrderGroupsBySizeInFirstBucket
+from summarize.postprocess.matrix_fix_precision import MatrixFixPrecision
+from summarize.postprocess.matrix_reverse_sign import MatrixReverseSign
+from summarize.postprocess.matrix_erase_empty_groups import MatrixEraseEmptyGroups
+from summarize.postprocess.matrix_merge_under_threshold import MatrixMergeUnderThreshold
+from summarize.postprocess.matrix_calc_totals import MatrixCalcTotals
+from summarize.postprocess.matrix_order_groups_by_size_in_first_bucket import \
+    MatrixOrderGroupsBySizeInFirstBucket
+from summarize.postprocess.matrix_pipeline import MatrixPipeline
+from summarize.sparse_summarizer import SparseSummarizer
+from summarize.postprocess.sparse_fix_precision import SparseFixPrecision
+from summarize.postprocess.sparse_reverse_sign import SparseReverseSign
+from summarize.postprocess.sparse_erase_empty_cells import SparseEraseEmptyCells
+from summarize.postprocess.sparse_merge_all_but_top_k import SparseMergeAllButTopK
+
+
+class RandomSummarySource(ISummarySource):
+
+    def __init__(self, seed, groups_count, buckets_count, items_count):
+        self._rnd = random.Random(seed)
+        self._groups = {g_id: f'Group {g_id}' for g_id in range(1, groups_count + 1)}
+        self._buckets = [f'Bucket {b}' for b in range(buckets_count)]
+        self._items_count = items_count
+        self._items = None
+
+    def load(self) -> None:
+        # mostly expenses, a few of them large, and some refunds. Some
+        # groups get no items at all.
+        group_ids = list(self._groups)[:-2]
+        self._items = SummaryItems.from_tuples(
+            (self._rnd.choice(group_ids),
+             self._rnd.randrange(len(self._buckets)),
+             self._rnd.choice([-1, -1, -1, -100, 1]) * self._rnd.randrange(1, 10000))
+            for _ in range(self._items_count))
+
+    def get_groups(self):
+        return self._groups
+
+    def get_buckets(self):
+        return self._buckets
+
+    def get_items(self):
+        return self._items
+
+
+def test_matrix_summary():
+    for seed in range(20):
+        source = RandomSummarySource(seed, groups_count=30, buckets_count=12, items_count=300)
+        source.load()
+
+        expected = Summarizer().execute(source)
+        for p in [FixPrecision(100), ReverseSign(), MergeUnderThreshold(),
+                  EraseEmptyGroups(), CalcTotals(), OrderGroupsBySizeInFirstBucket()]:
+            p.execute(expected)
+
+        summary = MatrixSummarizer().execute(source)
+        for p in [MatrixFixPrecision(100), MatrixReverseSign(), MatrixMergeUnderThreshold(),
+                  MatrixEraseEmptyGroups(), MatrixCalcTotals(), MatrixOrderGroupsBySizeInFirstBucket()]:
+            p.execute(summary)
+
+        assert summary.group_ids == list(expected.groups)
+        assert summary.group_names == [g.name for g in expected.groups.values()]
+        assert summary.data.tolist() == [g.data for g in expected.groups.values()]
+        assert summary.group_totals.tolist() == [g.total for g in expected.groups.values()]
+        assert summary.bucket_totals == expected.bucket_totals
+        assert summary.sum_total == expected.sum_total
+
+        # the "Other" group
+        assert 0 in summary.group_ids
+
+
+def test_matrix_pipeline():
+    def make_postprocessors(merge_under_threshold):
+        return [MatrixFixPrecision(100), MatrixReverseSign()] + \
+            ([MatrixMergeUnderThreshold()] if merge_under_threshold else []) + \
+            [MatrixEraseEmptyGroups(), MatrixCalcTotals(), MatrixOrderGroupsBySizeInFirstBucket()]
+
+    assert MatrixPipeline(make_postprocessors(False)).get_stage_names() == [
+        'MatrixFixPrecision+MatrixReverseSign+MatrixEraseEmptyGroups+MatrixCalcTotals',
+        'MatrixOrderGroupsBySizeInFirstBucket']
+    assert MatrixPipeline(make_postprocessors(True)).get_stage_names() == [
+        'MatrixFixPrecision+MatrixReverseSign', 'MatrixMergeUnderThreshold',
+        'MatrixEraseEmptyGroups+MatrixCalcTotals', 'MatrixOrderGroupsBySizeInFirstBucket']
+
+    # a fused pipeline gives the same summary as running the postprocessors
+    # one by one
+    for seed in range(20):
+        for merge_under_threshold in [False, True]:
+            source = RandomSummarySource(seed, groups_count=30, buckets_count=12, items_count=300)
+            source.load()
+
+            expected = MatrixSummarizer().execute(source)
+            for p in make_postprocessors(merge_under_threshold):
+                p.execute(expected)
+
+            summary = MatrixSummarizer().execute(source)
+            pipeline = MatrixPipeline(make_postprocessors(merge_under_threshold))
+            pipeline.execute(summary)
+
+            assert summary.group_ids == expected.group_ids
+            assert summary.group_names == expected.group_names
+            assert summary.data.dtype == expected.data.dtype
+            assert summary.data.tolist() == expected.data.tolist()
+            assert summary.group_totals.tolist() == expected.group_totals.tolist()
+            assert summary.bucket_totals == expected.bucket_totals
+            assert summary.sum_total == expected.sum_total
+            assert len(pipeline.timings) == len(pipeline.get_stage_names())
+
+    # every rounding is a pass of its own
+    pipeline = MatrixPipeline([MatrixFixPrecision(10), MatrixReverseSign(), MatrixFixPrecision(10)])
+    assert pipeline.get_stage_names() == ['MatrixFixPrecision+MatrixReverseSign', 'MatrixFixPrecision']
+    summary = MatrixSummary(['Bucket 0'], [1], ['Group 1'], numpy.array([[149]], dtype=numpy.int64))
+    pipeline.execute(summary)
+    assert summary.data.tolist() == [[-2]]
+
+
+def test_matrix_top_k():
+    for seed in range(20):
+        source = RandomSummarySource(seed, groups_count=30, buckets_count=12, items_count=300)
+        source.load()
+
+        summary = MatrixSummarizer().execute(source)
+        MatrixFixPrecision(100).execute(summary)
+        original = summary.data.copy()
+        MatrixMergeUnderThreshold(threshold_percentage=None, top_k=8).execute(summary)
+        MatrixEraseEmptyGroups().execute(summary)
+
+        # the top 8 by total (ties in the order of the groups), as with a full sort
+        totals = original.sum(axis=1)
+        non_empty = [row for row in range(len(totals)) if original[row].any()]
+        top = sorted(sorted(non_empty, key=lambda row: -totals[row])[:8])
+
+        assert summary.group_ids == [row + 1 for row in top] + [0]
+        assert summary.data[:-1].tolist() == original[top].tolist()
+        assert summary.data.sum(axis=0).tolist() == original.sum(axis=0).tolist()
+
+        # with the threshold too: at most 8 groups and "Other"
+        summary = MatrixSummarizer().execute(source)
+        MatrixFixPrecision(100).execute(summary)
+        MatrixMergeUnderThreshold(threshold_percentage=20, top_k=8).execute(summary)
+        MatrixEraseEmptyGroups().execute(summary)
+        assert len(summary.group_ids) <= 9
+        assert summary.data.sum(axis=0).tolist() == original.sum(axis=0).tolist()
+
+
+def test_sparse_summary():
+    for seed in range(20):
+        # many groups, most of them with no items
+        source = RandomSummarySource(seed, groups_count=2000, buckets_count=12, items_count=300)
+        source.load()
+
+        expected = MatrixSummarizer().execute(source)
+        for p in [MatrixFixPrecision(100), MatrixReverseSign(),
+                  MatrixMergeUnderThreshold(threshold_percentage=None, top_k=20),
+                  MatrixEraseEmptyGroups(), MatrixCalcTotals()]:
+            p.execute(expected)
+
+        sparse = SparseSummarizer().execute(source)
+        for p in [SparseFixPrecision(100), SparseReverseSign(), SparseEraseEmptyCells(),
+                  SparseMergeAllButTopK(20)]:
+            p.execute(sparse)
+        assert (sparse.values != 0).all()
+
+        summary = sparse.to_matrix()
+        for p in [MatrixEraseEmptyGroups(), MatrixCalcTotals()]:
+            p.execute(summary)
+
+        assert summary.group_ids == expected.group_ids
+        assert summary.group_names == expected.group_names
+        assert summary.data.tolist() == expected.data.tolist()
+        assert summary.bucket_totals == expected.bucket_totals
+        assert len(summary.group_ids) == 21
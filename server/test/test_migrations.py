@@ -0,0 +1,111 @@
+import shutil
+import sqlite3
+import db.migrations
+
+# the schema of a DB file before the first migration (string UUID IDs,
+# amounts in whole units)
+_BASELINE_DDL = [
+    'CREATE TABLE accounts ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, source VARCHAR(5) NOT NULL, '
+    'username VARCHAR NOT NULL, password VARCHAR NOT NULL, last_synced DATE, '
+    'PRIMARY KEY (id), UNIQUE (name))',
+    'CREATE TABLE categories ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, is_expense BOOLEAN NOT NULL, '
+    '"order" INTEGER NOT NULL, exclude_from_reports BOOLEAN NOT NULL, '
+    'PRIMARY KEY (id), UNIQUE (name))',
+    'CREATE TABLE subcategories ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, category_id INTEGER NOT NULL, '
+    'PRIMARY KEY (id), UNIQUE (name), '
+    'FOREIGN KEY(category_id) REFERENCES categories (id))',
+    'CREATE TABLE payees ('
+    'id VARCHAR NOT NULL, name VARCHAR NOT NULL, subcategory_id INTEGER, note VARCHAR, '
+    'PRIMARY KEY (id), UNIQUE (name), '
+    'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)',
+    'CREATE TABLE transactions ('
+    'id VARCHAR NOT NULL, date DATE NOT NULL, amount FLOAT NOT NULL, '
+    'account_id INTEGER NOT NULL, payee_id INTEGER NOT NULL, '
+    'override_subcategory BOOLEAN NOT NULL, subcategory_id INTEGER, note VARCHAR, '
+    'PRIMARY KEY (id), '
+    'FOREIGN KEY(account_id) REFERENCES accounts (id), '
+    'FOREIGN KEY(payee_id) REFERENCES payees (id), '
+    'FOREIGN KEY(subcategory_id) REFERENCES subcategories (id) ON DELETE SET NULL)',
+]
+
+
+def _create_baseline_db(filename):
+    conn = sqlite3.connect(filename)
+    for statement in _BASELINE_DDL:
+        conn.execute(statement)
+    conn.execute("INSERT INTO accounts VALUES ('acc-uuid', 'a', 'max', 'u', 'p', NULL)")
+    conn.execute("INSERT INTO categories VALUES ('food-uuid', 'Food', 1, 0, 0)")
+    conn.execute("INSERT INTO subcategories VALUES ('sup-uuid', 'Supermarket', 'food-uuid')")
+    conn.execute("INSERT INTO subcategories VALUES ('rest-uuid', 'Restaurants', 'food-uuid')")
+    conn.execute("INSERT INTO payees VALUES ('shop-uuid', 'Shop', 'sup-uuid', '')")
+    conn.execute("INSERT INTO payees VALUES ('cafe-uuid', 'Cafe', NULL, '')")
+    # (external ID, date, amount, payee, override_subcategory, subcategory)
+    for t in [('t1', '2022-01-05', -12.34, 'shop-uuid', 0, None),
+              ('t2', '2022-01-20', -20.5, 'cafe-uuid', 1, 'rest-uuid'),
+              ('t3', '2022-02-01', 0.1, 'shop-uuid', 0, None)]:
+        conn.execute("INSERT INTO transactions VALUES (?, ?, ?, 'acc-uuid', ?, ?, ?, '')", t)
+    conn.commit()
+    conn.close()
+
+
+def _dump(filename):
+    """ Return the schema and all rows of the given DB file """
+    conn = sqlite3.connect(filename)
+    schema = conn.execute('SELECT type, name, sql FROM sqlite_master ORDER BY name').fetchall()
+    rows = {name: sorted(conn.execute(f'SELECT * FROM "{name}"').fetchall(), key=repr)
+            for (type_, name, _) in schema if type_ == 'table' and not name.startswith('sqlite_')}
+    version = db.migrations.get_version(conn)
+    conn.close()
+    return version, schema, rows
+
+
+def test_migrations(tmp_path):
+    baseline = tmp_path / 'baseline.db'
+    _create_baseline_db(baseline)
+
+    # migrate a copy of the baseline DB to the latest version
+    filename = tmp_path / 'kitmi.db'
+    shutil.copy(baseline, filename)
+    db.migrations.migrate(str(filename))
+
+    conn = sqlite3.connect(filename)
+    assert db.migrations.get_version(conn) == db.migrations.LATEST_VERSION
+
+    # integer IDs, and integer foreign keys that point to the same rows
+    columns = {row[1]: row[2] for row in conn.execute('PRAGMA table_info(transactions)')}
+    assert columns['id'] == 'INTEGER'
+    assert columns['amount'] == 'INTEGER'
+    assert columns['external_id'] == 'VARCHAR'
+    sql = 'SELECT t.external_id, typeof(t.id), a.name, p.name, s.name, e.name, t.amount, typeof(t.amount) ' \
+          'FROM transactions t ' \
+          'JOIN accounts a ON a.id = t.account_id ' \
+          'JOIN payees p ON p.id = t.payee_id ' \
+          'LEFT JOIN subcategories s ON s.id = t.subcategory_id ' \
+          'LEFT JOIN subcategories e ON e.id = t.effective_subcategory_id ' \
+          'ORDER BY t.external_id'
+    # the amounts are in minor units
+    assert conn.execute(sql).fetchall() == [
+        ('t1', 'integer', 'a', 'Shop', None, 'Supermarket', -1234, 'integer'),
+        ('t2', 'integer', 'a', 'Cafe', 'Restaurants', 'Restaurants', -2050, 'integer'),
+        ('t3', 'integer', 'a', 'Shop', None, 'Supermarket', 10, 'integer'),
+    ]
+    assert conn.execute(
+        'SELECT s.name, c.name FROM subcategories s JOIN categories c ON c.id = s.category_id '
+        'ORDER BY s.name').fetchall() == [('Restaurants', 'Food'), ('Supermarket', 'Food')]
+    assert conn.execute('PRAGMA foreign_key_check').fetchall() == []
+
+    # the tables that are derived from the transactions are populated
+    assert conn.execute('SELECT month, sum FROM monthly_rollup ORDER BY month, sum').fetchall() == \
+        [('2022-01', -2050), ('2022-01', -1234), ('2022-02', 10)]
+    assert conn.execute('SELECT SUM(sum) FROM daily_totals').fetchone() == (-3274,)
+    assert conn.execute("SELECT name FROM payees_fts WHERE payees_fts MATCH 'cafe'").fetchall() == \
+        [('Cafe',)]
+    conn.close()
+
+    # migrating again changes nothing
+    migrated = _dump(filename)
+    db.migrations.migrate(str(filename))
+    assert _dump(filename) == migrated
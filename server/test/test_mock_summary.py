@@ -1,6 +1,6 @@
 import datetime
 from summarize.i_summary_source import ISummarySource
-from summarize.summary_source_item import SummarySourceItem
+from summarize.summary_items import SummaryItems
 from summarize.summarizer import Summarizer
 from summarize.postprocess.fix_precision import FixPrecision
 from summarize.postprocess.reverse_sign import ReverseSign
@@ -17,16 +17,16 @@ class MockSummarySource(ISummarySource):
         self._buckets = None
 
     def load(self) -> None:
-        self._items = [
-            SummarySourceItem(1, 0, -100.99),
-            SummarySourceItem(1, 0, -50.20),
-            SummarySourceItem(2, 0, -20.32),
-            SummarySourceItem(2, 1, -1.3),
-            SummarySourceItem(3, 0, -1000.66),
-            SummarySourceItem(3, 1, -10.1),
-            SummarySourceItem(1, 1, -1.1),
-            SummarySourceItem(1, 1, -240.6),
-        ]
+        self._items = SummaryItems.from_tuples([
+            (1, 0, -100.99),
+            (1, 0, -50.20),
+            (2, 0, -20.32),
+            (2, 1, -1.3),
+            (3, 0, -1000.66),
+            (3, 1, -10.1),
+            (1, 1, -1.1),
+            (1, 1, -240.6),
+        ])
 
         self._groups = {
             1: "One",
@@ -0,0 +1,75 @@
+import random
+import datetime
+import sqlalchemy
+import db.schema
+import db.monthly_rollup
+import db.daily_totals
+
+_ROLLUP = 'SELECT month, subcategory_id, account_id, sum, count FROM monthly_rollup ORDER BY 1, 2, 3'
+_DAILY_TOTALS = 'SELECT date, subcategory_id, sum, count FROM daily_totals ORDER BY 1, 2'
+
+
+def _recompute(conn):
+    """ Return the rollup of the current transactions, computed from scratch """
+    for statement in db.monthly_rollup.ROLLUP_POPULATE:
+        conn.exec_driver_sql(statement)
+    return conn.exec_driver_sql(_ROLLUP).all()
+
+
+def _assert_daily_totals(conn):
+    """ Assert that the daily totals are those of the current transactions """
+    daily_totals = conn.exec_driver_sql(_DAILY_TOTALS).all()
+    for statement in db.daily_totals.DAILY_TOTALS_POPULATE:
+        conn.exec_driver_sql(statement)
+    assert daily_totals == conn.exec_driver_sql(_DAILY_TOTALS).all()
+
+
+def test_monthly_rollup():
+    engine = sqlalchemy.create_engine('sqlite://')
+    db.schema.Base.metadata.create_all(engine)
+    rnd = random.Random(0)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql('PRAGMA foreign_keys = ON')
+        conn.exec_driver_sql("INSERT INTO categories VALUES (1, 'c', 1, 1, 0)")
+        for s in range(1, 6):
+            conn.exec_driver_sql(f"INSERT INTO subcategories VALUES ({s}, 's{s}', 1)")
+        for a in range(1, 3):
+            conn.exec_driver_sql(f"INSERT INTO accounts VALUES ({a}, 'a{a}', 'max', '', '', NULL)")
+        for p in range(1, 11):
+            conn.exec_driver_sql(f"INSERT INTO payees VALUES ({p}, 'p{p}', {rnd.randint(1, 5)}, '')")
+
+        # inserted uncategorized, then categorized (as when syncing)
+        for t in range(1, 501):
+            date = datetime.date(2022, 1, 1) + datetime.timedelta(days=rnd.randrange(365))
+            conn.exec_driver_sql(
+                'INSERT INTO transactions (id, external_id, date, amount, account_id, payee_id, '
+                'override_subcategory) VALUES (?, ?, ?, ?, ?, ?, 0)',
+                (t, str(t), date.isoformat(), -rnd.randrange(1, 10000),
+                 rnd.randint(1, 2), rnd.randint(1, 10)))
+        conn.exec_driver_sql(
+            'UPDATE transactions SET effective_subcategory_id = '
+            '(SELECT subcategory_id FROM payees WHERE payees.id = payee_id)')
+        rollup = conn.exec_driver_sql(_ROLLUP).all()
+        assert len(rollup) > 0
+        assert rollup == _recompute(conn)
+        assert len(conn.exec_driver_sql(_DAILY_TOTALS).all()) > 0
+        _assert_daily_totals(conn)
+
+        # recategorize a payee, override some transactions
+        conn.exec_driver_sql('UPDATE transactions SET effective_subcategory_id = 3 WHERE payee_id = 1')
+        conn.exec_driver_sql('UPDATE transactions SET effective_subcategory_id = NULL WHERE id % 7 = 0')
+        assert conn.exec_driver_sql(_ROLLUP).all() == _recompute(conn)
+        _assert_daily_totals(conn)
+
+        # deleting a subcategory sets effective_subcategory_id to NULL
+        conn.exec_driver_sql('UPDATE payees SET subcategory_id = NULL WHERE subcategory_id = 2')
+        conn.exec_driver_sql('DELETE FROM subcategories WHERE id = 2')
+        rollup = conn.exec_driver_sql(_ROLLUP).all()
+        assert all(r.subcategory_id != 2 for r in rollup)
+        assert rollup == _recompute(conn)
+        _assert_daily_totals(conn)
+
+        conn.exec_driver_sql('DELETE FROM transactions WHERE id % 3 = 0')
+        assert conn.exec_driver_sql(_ROLLUP).all() == _recompute(conn)
+        _assert_daily_totals(conn)
@@ -0,0 +1,87 @@
+import asyncio
+import datetime
+import pytest
+import db.data_version
+import summarize.options
+import summarize.prefix_sum_index
+import summarize.tracing
+from summarize.transactions_summarizer import TransactionsSummarizer
+from summarize.matrix_summarizer import MatrixSummarizer
+from summarize.aggregated_transactions_source import AggregatedTransactionsSource
+from summarize.monthly_rollup_source import MonthlyRollupSource
+from summarize.prefix_sum_source import PrefixSumSource
+
+
+def _to_dict(summary):
+    return {g_id: data for g_id, data in zip(summary.group_ids, summary.data.tolist())}
+
+
+async def _test_prefix_sum_source(summary_db):
+    async with summary_db() as session_maker:
+        def options(bucket_by, rolling_window=None, years_ago=0):
+            return summarize.options.SummaryOptions(
+                is_expense=True,
+                group_by=summarize.options.SummaryGroupBy.category,
+                bucket_by=summarize.options.SummaryBucketBy(bucket_by),
+                merge_under_threshold=False,
+                rolling_window=rolling_window,
+                years_ago=years_ago)
+
+        async def load(source_class, start_date, end_date, o):
+            async with session_maker() as session:
+                source = source_class(session, start_date, end_date, o)
+                await source.load()
+                return source.get_buckets(), _to_dict(MatrixSummarizer.execute(source))
+
+        # the same as summing the transactions in the db
+        start_date = datetime.date(2022, 2, 17)
+        end_date = datetime.date(2022, 10, 3)
+        for bucket_by in ['day', 'week', 'month', 'quarter', 'range']:
+            assert await load(PrefixSumSource, start_date, end_date, options(bucket_by)) == \
+                await load(AggregatedTransactionsSource, start_date, end_date, options(bucket_by))
+
+        # rolling 3 months: every month is the sum of itself and the two before it
+        (buckets, rolling) = await load(
+            PrefixSumSource, datetime.date(2022, 3, 1), end_date, options('month', rolling_window=3))
+        (_, monthly) = await load(
+            AggregatedTransactionsSource, datetime.date(2022, 1, 1), end_date, options('month'))
+        assert buckets[0] == '2022-03'
+        assert rolling == {g_id: [sum(data[i:i + 3]) for i in range(len(data) - 2)]
+                           for g_id, data in monthly.items()}
+
+        # a year ago: same buckets, the sums of 2022 (the db's only year)
+        (buckets, year_ago) = await load(
+            PrefixSumSource, datetime.date(2023, 2, 17), datetime.date(2023, 10, 3),
+            options('month', years_ago=1))
+        assert buckets[0] == '2023-02'
+        assert year_ago == (await load(AggregatedTransactionsSource, start_date, end_date, options('month')))[1]
+
+        # a window of less than one bucket
+        for rolling_window in [0, -2]:
+            with pytest.raises(Exception, match='Invalid rolling_window'):
+                await load(PrefixSumSource, start_date, end_date, options('month', rolling_window=rolling_window))
+
+        # ranges are summed from the monthly rollup, which isn't rebuilt after writes
+        assert type(TransactionsSummarizer.make_source(None, start_date, end_date, options('range'))) \
+            is MonthlyRollupSource
+        assert type(TransactionsSummarizer.make_source(None, start_date, end_date, options('day'))) \
+            is PrefixSumSource
+
+        # after a write, concurrent requests build the index once
+        async with session_maker() as session:
+            await db.data_version.bump_data_version(session)
+            await session.commit()
+
+        async def get_index():
+            async with session_maker() as session:
+                return await summarize.prefix_sum_index.get_index(session)
+
+        trace = summarize.tracing.start_trace()
+        indexes = await asyncio.gather(*[get_index() for _ in range(3)])
+        summarize.tracing.end_trace(trace)
+        assert [s.name for s in trace.stages] == ['_build_index']
+        assert indexes[0] is indexes[1] is indexes[2]
+
+
+def test_prefix_sum_source(summary_db):
+    asyncio.run(_test_prefix_sum_source(summary_db))
@@ -0,0 +1,19 @@
+import pytest
+from api.public_id import encode_id, decode_id, PAYEE, SUBCATEGORY
+
+
+def test_public_id_round_trip():
+    public_id = encode_id(PAYEE, 12)
+    assert public_id != '12'
+    assert decode_id(PAYEE, public_id) == 12
+    assert encode_id(PAYEE, None) is None
+    assert decode_id(PAYEE, None) is None
+
+
+def test_invalid_public_id():
+    with pytest.raises(Exception, match='invalid Payee ID'):
+        decode_id(PAYEE, 'not an id')
+
+    # an ID of another type
+    with pytest.raises(Exception, match='invalid Payee ID'):
+        decode_id(PAYEE, encode_id(SUBCATEGORY, 12))
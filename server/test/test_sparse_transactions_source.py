@@ -0,0 +1,99 @@
+import asyncio
+import collections
+import datetime
+import random
+import summarize.options
+from summarize.balance_summarizer import BalanceSummarizer
+from summarize.transactions_summarizer import TransactionsSummarizer
+
+_START_DATE = datetime.date(2022, 1, 15)
+_END_DATE = datetime.date(2022, 12, 31)
+
+
+def _make_rows():
+    rnd = random.Random(0)
+
+    # (name, is_expense, exclude_from_reports)
+    categories = [('Food', True, False), ('Salary', False, False), ('Transfers', True, True)]
+    transactions = []
+    for t in range(1, 1001):
+        # some of them uncategorized
+        subcategory_id = rnd.choice([1, 1, 1, 2, 3, None])
+        transactions.append({
+            'id': t,
+            'date': datetime.date(2022, 1, 1) + datetime.timedelta(days=rnd.randrange(365)),
+            'amount': rnd.randrange(1, 1000000) if subcategory_id == 2 else -rnd.randrange(1, 100000),
+            'account_id': rnd.randint(1, 3),
+            'payee_id': rnd.randint(1, 40),
+            'effective_subcategory_id': subcategory_id})
+
+    return {
+        'accounts': [{'id': a} for a in range(1, 4)],
+        'categories': [{'id': i + 1, 'name': name, 'is_expense': is_expense, 'exclude_from_reports': exclude}
+                       for i, (name, is_expense, exclude) in enumerate(categories)],
+        'subcategories': [{'id': s, 'category_id': s} for s in range(1, 4)],
+        'payees': [{'id': p} for p in range(1, 41)],
+        'transactions': transactions,
+    }
+
+
+def _get_expected(transactions, column, is_expense):
+    """ Return {group ID: monthly sums (in whole units)} of the transactions
+    in the summaries, summed in Python """
+
+    sums = collections.defaultdict(lambda: [0] * 12)
+    subcategory_id = 1 if is_expense else 2
+    for t in transactions:
+        if t['effective_subcategory_id'] == subcategory_id and _START_DATE <= t['date'] <= _END_DATE:
+            sums[t[column]][t['date'].month - 1] += t['amount']
+
+    sign = -1 if is_expense else 1
+    return {g_id: [sign * round(s / 100) for s in data] for g_id, data in sums.items()}
+
+
+def _to_dict(summary):
+    return {g_id: data for g_id, data in zip(summary.group_ids, summary.data.tolist())}
+
+
+async def _test_sparse_transactions_source(seeded_db):
+    rows = _make_rows()
+    expected_by_payee = _get_expected(rows['transactions'], 'payee_id', True)
+
+    async with seeded_db(**rows) as session_maker:
+        async with session_maker() as session:
+            def options(group_by, top_k):
+                return summarize.options.SummaryOptions(
+                    is_expense=True,
+                    group_by=summarize.options.SummaryGroupBy(group_by),
+                    bucket_by=summarize.options.SummaryBucketBy.month,
+                    merge_under_threshold=False,
+                    top_k=top_k)
+
+            # every payee, with its name
+            summary = await TransactionsSummarizer.execute(
+                session, _START_DATE, _END_DATE, options('payee', 100))
+            assert _to_dict(summary) == expected_by_payee
+            assert summary.group_names == [f'p{g_id}' for g_id in summary.group_ids]
+            assert summary.buckets[0] == '2022-01'
+            assert len(summary.buckets) == 12
+
+            # the top payees, and the rest in "Other"
+            summary = await TransactionsSummarizer.execute(
+                session, _START_DATE, _END_DATE, options('payee', 5))
+            top = sorted(expected_by_payee, key=lambda g_id: sum(expected_by_payee[g_id]), reverse=True)[:5]
+            assert sorted(summary.group_ids) == sorted(top + [0])
+            assert {g_id: data for g_id, data in _to_dict(summary).items() if g_id != 0} == \
+                {g_id: expected_by_payee[g_id] for g_id in top}
+            assert _to_dict(summary)[0] == [sum(data[i] for g_id, data in expected_by_payee.items()
+                                                if g_id not in top) for i in range(12)]
+
+            # the income and the expenses of every account
+            summary = await BalanceSummarizer().execute(
+                session, _START_DATE, _END_DATE, summarize.options.SummaryGroupBy.account)
+            assert _to_dict(summary.income) == _get_expected(rows['transactions'], 'account_id', False)
+            assert _to_dict(summary.expenses) == _get_expected(rows['transactions'], 'account_id', True)
+            assert summary.expenses.group_names == [f'a{g_id}' for g_id in summary.expenses.group_ids]
+
+
+def test_sparse_transactions_source(seeded_db):
+    asyncio.run(_test_sparse_transactions_source(seeded_db))
@@ -0,0 +1,34 @@
+import asyncio
+import datetime
+import summarize.options
+from summarize.transactions_source import TransactionsSource
+from summarize.matrix_summarizer import MatrixSummarizer
+
+
+def _to_dict(summary):
+    return {g_id: data for g_id, data in zip(summary.group_ids, summary.data.tolist())}
+
+
+async def _test_streaming_source(summary_db):
+    async with summary_db() as session_maker:
+        start_date = datetime.date(2022, 1, 15)
+        end_date = datetime.date(2022, 12, 31)
+        options = summarize.options.SummaryOptions(
+            is_expense=None,
+            group_by=summarize.options.SummaryGroupBy.subcategory,
+            bucket_by=summarize.options.SummaryBucketBy.month,
+            merge_under_threshold=False)
+
+        async with session_maker() as session:
+            summaries = []
+            for chunk_size in [None, 7, 1000]:
+                source = TransactionsSource(session, start_date, end_date, options, chunk_size)
+                await source.load()
+                summaries.append([_to_dict(MatrixSummarizer.execute(s))
+                                  for s in source.split_by_is_expense()])
+
+            assert summaries[0] == summaries[1] == summaries[2]
+
+
+def test_streaming_source(summary_db):
+    asyncio.run(_test_streaming_source(summary_db))
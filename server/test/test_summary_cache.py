@@ -0,0 +1,99 @@
+import asyncio
+import db.globals
+import db.data_version
+import summarize.summary_cache as summary_cache
+import summarize.summary_warm_up as summary_warm_up
+
+
+async def _test_summary_cache(seeded_db):
+    async with seeded_db() as session_maker:
+        made = []
+
+        def make(key):
+            async def make_summary():
+                made.append(key)
+                return f'summary {key}'
+            return make_summary
+
+        async with session_maker() as session:
+            assert await summary_cache.get_summary(session, 1, make(1)) == 'summary 1'
+            assert await summary_cache.get_summary(session, 1, make(1)) == 'summary 1'
+            assert made == [1]
+
+            # bypass
+            assert await summary_cache.get_summary(session, 1, make(1), bypass=True) == 'summary 1'
+            assert made == [1, 1]
+
+            # least recently used is evicted
+            for key in range(2, summary_cache.MAX_SIZE + 2):
+                await summary_cache.get_summary(session, key, make(key))
+            await summary_cache.get_summary(session, 1, make(1))
+            assert made[-1] == 1
+
+            # a write drops everything
+            stats = summary_cache.get_stats()
+            await db.data_version.bump_data_version(session)
+            await summary_cache.get_summary(session, 3, make(3))
+            assert made[-1] == 3
+            assert summary_cache.get_stats().misses == stats.misses + 1
+            assert summary_cache.get_stats().size == 1
+
+            # several at once: only the missing ones are made, in one call
+            async def make_summaries(keys):
+                made.append(keys)
+                return [f'summary {key}' for key in keys]
+
+            assert await summary_cache.get_summaries(session, [4, 3, 5], make_summaries) == \
+                ['summary 4', 'summary 3', 'summary 5']
+            assert made[-1] == [4, 5]
+            assert await summary_cache.get_summaries(session, [5, 4], make_summaries) == \
+                ['summary 5', 'summary 4']
+            assert made[-1] == [4, 5]
+
+
+def test_summary_cache(seeded_db):
+    asyncio.run(_test_summary_cache(seeded_db))
+
+
+async def _test_summary_warm_up(seeded_db):
+    async with seeded_db() as session_maker:
+        made = []
+
+        def make(key):
+            async def make_summary(session):
+                made.append(key)
+                return f'summary {key}'
+            return make_summary
+
+        # the warm-up reads from the reader sessions
+        reader_session_maker = db.globals.reader_session_maker
+        db.globals.reader_session_maker = session_maker
+        try:
+            # the most requested shapes are warmed up
+            for key in range(summary_warm_up.WARM_UP_COUNT + 5):
+                for _ in range(key):
+                    summary_warm_up.record(key, make(key))
+
+            async with session_maker() as session:
+                await db.data_version.bump_data_version(session)
+
+            await summary_warm_up.warm_up()
+            assert sorted(made) == list(range(5, summary_warm_up.WARM_UP_COUNT + 5))
+            assert summary_cache.get_stats().warmed == summary_warm_up.WARM_UP_COUNT
+
+            # ... and then served from the cache
+            async with session_maker() as session:
+                assert await summary_cache.get_summary(session, 14, make(14)) == 'summary 14'
+            assert made.count(14) == 1
+            assert summary_cache.get_stats().hits == 1
+            assert summary_cache.get_stats().misses == 0
+
+            # nothing to make if the data didn't change
+            await summary_warm_up.warm_up()
+            assert len(made) == summary_warm_up.WARM_UP_COUNT
+        finally:
+            db.globals.reader_session_maker = reader_session_maker
+
+
+def test_summary_warm_up(seeded_db):
+    asyncio.run(_test_summary_warm_up(seeded_db))
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+import logging
+from strawberry.schema import Schema
+import db.globals
+import summarize.options
+from summarize.balance_summarizer import BalanceSummarizer
+import summarize.tracing
+import api.summarize_tracing_extension
+from api.summarize_tracing_extension import SummarizeTracingExtension
+from api.query import Query
+from api.mutation import Mutation
+from api.context import Context
+
+
+async def _test_tracing(summary_db):
+    async with summary_db() as session_maker:
+        async with session_maker() as session:
+            # not traced
+            await BalanceSummarizer().execute(session, datetime.date(2022, 1, 15), datetime.date(2022, 10, 20),
+                                              summarize.options.SummaryGroupBy.category)
+
+            trace = summarize.tracing.start_trace()
+            with summarize.tracing.stage('balance'):
+                await BalanceSummarizer().execute(session, datetime.date(2022, 1, 15), datetime.date(2022, 10, 20),
+                                                  summarize.options.SummaryGroupBy.category)
+            summarize.tracing.end_trace(trace)
+
+            # stages after the end of the trace aren't recorded
+            with summarize.tracing.stage('after'):
+                pass
+
+        stages = {s.name: s for s in trace.get_stages()}
+        assert list(stages)[:2] == ['balance', 'balance/MonthlyRollupSource.load']
+        assert stages['balance/MonthlyRollupSource.load/_load_categories'].rows == 3
+        assert stages['balance/MonthlyRollupSource.load/_load_subcategories'].rows == 12
+        assert stages['balance/MonthlyRollupSource.load/_load_sums_of_rollup'].rows > 0
+        assert stages['balance/expenses/MatrixSummarizer'].items == 2 * 10
+        assert 'after' not in stages
+        assert all(s.seconds <= trace.seconds for s in trace.stages)
+        assert trace.to_dict()['stages'][0]['name'] == 'balance'
+
+
+def test_tracing(summary_db):
+    asyncio.run(_test_tracing(summary_db))
+
+
+_DASHBOARD = '''
+query Dashboard {
+    balanceSummary(startDate: "2022-01-15", endDate: "2022-10-20", groupBy: category, bypassCache: true) {
+        savingsTotal
+    }
+    categories {
+        name
+    }
+}
+'''
+
+
+async def _test_summarize_tracing_extension(summary_db, monkeypatch, caplog):
+    schema = Schema(query=Query, mutation=Mutation, extensions=[SummarizeTracingExtension])
+
+    async with summary_db() as session_maker:
+        reader_session_maker = db.globals.reader_session_maker
+        db.globals.reader_session_maker = session_maker
+        try:
+            # the trace is in the response
+            monkeypatch.setattr(api.summarize_tracing_extension, 'SLOW_REQUEST_SECONDS', 60)
+            res = await schema.execute(_DASHBOARD, context_value=Context())
+            assert res.errors is None
+            trace = res.extensions['summarizeTrace']
+            names = [s['name'] for s in trace['stages']]
+            assert names[:2] == ['balanceSummary', 'balanceSummary/MonthlyRollupSource.load']
+            assert 'categories' in names
+            assert all(s['ms'] <= trace['ms'] for s in trace['stages'])
+            assert 'Slow request' not in caplog.text
+
+            # ... and in the log, if the request is slow
+            monkeypatch.setattr(api.summarize_tracing_extension, 'SLOW_REQUEST_SECONDS', 0)
+            with caplog.at_level(logging.WARNING):
+                res = await schema.execute(_DASHBOARD, context_value=Context())
+            assert res.errors is None
+            assert 'operation: Dashboard' in caplog.text
+            assert 'balanceSummary/MonthlyRollupSource.load/_load_sums_of_rollup: ' in caplog.text
+        finally:
+            db.globals.reader_session_maker = reader_session_maker
+
+
+def test_summarize_tracing_extension(summary_db, monkeypatch, caplog):
+    asyncio.run(_test_summarize_tracing_extension(summary_db, monkeypatch, caplog))
@@ -0,0 +1,36 @@
+import asyncio
+import datetime
+import db.transaction
+from api.transactions_filter import TransactionsFilter
+
+
+async def _test_transactions_filter(seeded_db):
+    # (id, date, amount in minor units)
+    transactions = [{'id': t, 'date': datetime.date.fromisoformat(date), 'amount': amount}
+                    for (t, date, amount) in [(1, '2022-01-01', 1233), (2, '2022-01-02', 1234),
+                                              (3, '2022-01-03', 1235), (4, '2022-01-04', 29),
+                                              (5, '2022-01-05', -1234)]]
+    async with seeded_db(transactions=transactions) as session_maker:
+        async def get_ids(**kwargs):
+            async with session_maker() as session:
+                window = await db.transaction.get_transactions(
+                    session, 'date', TransactionsFilter(**kwargs).to_db_filter(), with_count=False)
+                return sorted(t.id for t in window.items)
+
+        # the bounds are inclusive, and the amounts (in whole units) are
+        # converted to exactly the minor units of the stored amounts
+        assert await get_ids(min_amount=12.34) == [2, 3]
+        assert await get_ids(max_amount=12.34) == [1, 2, 4, 5]
+        assert await get_ids(min_amount=12.34, max_amount=12.34) == [2]
+        # (0.29 * 100 is 28.999999999999996)
+        assert await get_ids(min_amount=0.29, max_amount=0.29) == [4]
+        assert await get_ids(max_amount=-12.34) == [5]
+
+        # the dates are inclusive
+        assert await get_ids(start_date=datetime.date(2022, 1, 2),
+                             end_date=datetime.date(2022, 1, 4)) == [2, 3, 4]
+        assert await get_ids(start_date=datetime.date(2022, 1, 2), min_amount=12.34) == [2, 3]
+
+
+def test_transactions_filter(seeded_db):
+    asyncio.run(_test_transactions_filter(seeded_db))
@@ -0,0 +1,39 @@
+import datetime
+import util
+
+
+def test_get_buckets():
+    start_date = datetime.date(2021, 12, 30)
+    end_date = datetime.date(2022, 1, 4)
+
+    assert util.get_buckets(start_date, end_date, 'day') == \
+        ['2021-12-30', '2021-12-31', '2022-01-01', '2022-01-02', '2022-01-03', '2022-01-04']
+    assert util.get_buckets(start_date, end_date, 'week') == ['2021-W52', '2022-W01']
+    assert util.get_buckets(start_date, end_date, 'month') == ['2021-12', '2022-01']
+    assert util.get_buckets(start_date, end_date, 'quarter') == ['2021-Q4', '2022-Q1']
+    assert util.get_buckets(start_date, end_date, 'year') == ['2021', '2022']
+    assert util.get_months(datetime.date(2022, 11, 5), datetime.date(2023, 2, 1)) == \
+        ['2022-11', '2022-12', '2023-01', '2023-02']
+
+
+def test_bucket_numbers():
+    # every date's bucket index matches its bucket's name
+    start_date = datetime.date(2019, 5, 17)
+    end_date = datetime.date(2023, 3, 2)
+    formats = {
+        'day': lambda d: d.isoformat(),
+        'week': lambda d: f'{d.isocalendar().year}-W{d.isocalendar().week:02d}',
+        'month': lambda d: d.strftime('%Y-%m'),
+        'quarter': lambda d: f'{d.year}-Q{(d.month - 1) // 3 + 1}',
+        'year': lambda d: str(d.year),
+    }
+    for bucket_by, format_date in formats.items():
+        buckets = util.get_buckets(start_date, end_date, bucket_by)
+        get_number = util.get_bucket_number_fn(bucket_by)
+        first_number = get_number(start_date)
+
+        date = start_date
+        while date <= end_date:
+            assert buckets[get_number(date) - first_number] == format_date(date)
+            date += datetime.timedelta(days=1)
+        assert get_number(end_date) - first_number == len(buckets) - 1
@@ -1,38 +1,151 @@
 import datetime
 
+# Amounts are stored in the db as an integer number of minor units (agorot),
+# so that they can be summed exactly.
+MINOR_UNITS_PER_UNIT = 100
+
+
+def to_minor_units(amount: float) -> int:
+    return round(amount * MINOR_UNITS_PER_UNIT)
+
+
+def from_minor_units(amount: int) -> float:
+    return amount / MINOR_UNITS_PER_UNIT
+
 
 def json_datetime_to_date(dt):
     dt = dt[:10]
     return datetime.date.fromisoformat(dt)
 
 
+# Summaries bucket dates by day, week (starting on Monday), month, quarter or
+# year. Every bucket has a number, and consecutive buckets have consecutive
+# numbers - so the index of a date's bucket in a summary is the number of its
+# bucket minus the number of the first bucket, with no string formatting or
+# lookups per date.
+
+def _get_day_number(date):
+    return date.toordinal()
+
+
+def _get_week_number(date):
+    # the ordinal of 0001-01-01 (a Monday) is 1
+    return (date.toordinal() - 1) // 7
+
+
+def _get_month_number(date):
+    return date.year * 12 + date.month - 1
+
+
+def _get_quarter_number(date):
+    return date.year * 4 + (date.month - 1) // 3
+
+
+def _get_year_number(date):
+    return date.year
+
+
+def _get_day_name(number):
+    return datetime.date.fromordinal(number).isoformat()
+
+
+def _get_week_name(number):
+    # the ISO week of the week's Monday, e.g. '2022-W05'
+    (year, week, _) = datetime.date.fromordinal(number * 7 + 1).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def _get_month_name(number):
+    return format_month_and_year(number % 12 + 1, number // 12)
+
+
+def _get_quarter_name(number):
+    return f'{number // 4}-Q{number % 4 + 1}'
+
+
+def _get_year_name(number):
+    return str(number)
+
+
+def _get_day_first_date(number):
+    return datetime.date.fromordinal(number)
+
+
+def _get_week_first_date(number):
+    return datetime.date.fromordinal(number * 7 + 1)
+
+
+def _get_month_first_date(number):
+    return datetime.date(number // 12, number % 12 + 1, 1)
+
+
+def _get_quarter_first_date(number):
+    return datetime.date(number // 4, number % 4 * 3 + 1, 1)
+
+
+def _get_year_first_date(number):
+    return datetime.date(number, 1, 1)
+
+
+# bucket_by => (function from a date to its bucket number,
+#               function from a bucket number to its name,
+#               function from a bucket number to its first date)
+_BUCKET_FNS = {
+    'day': (_get_day_number, _get_day_name, _get_day_first_date),
+    'week': (_get_week_number, _get_week_name, _get_week_first_date),
+    'month': (_get_month_number, _get_month_name, _get_month_first_date),
+    'quarter': (_get_quarter_number, _get_quarter_name, _get_quarter_first_date),
+    'year': (_get_year_number, _get_year_name, _get_year_first_date),
+}
+
+
+def get_bucket_number_fn(bucket_by: str):
+    """ Return the function that returns the number of the bucket of a date,
+    for the given bucket_by ('day', 'week', 'month', 'quarter' or 'year') """
+    return _BUCKET_FNS[bucket_by][0]
+
+
+def get_bucket_first_date(number: int, bucket_by: str):
+    """ Return the first date of the bucket with the given number """
+    return _BUCKET_FNS[bucket_by][2](number)
+
+
+def get_buckets(start_date, end_date, bucket_by: str):
+    """ Return the names of the buckets from the one of start_date to the one
+    of end_date (inclusive), e.g. '2022-03-07' (day), '2022-W10' (week),
+    '2022-03' (month), '2022-Q1' (quarter) or '2022' (year) """
+    (get_number, get_name, _) = _BUCKET_FNS[bucket_by]
+    return [get_name(n) for n in range(get_number(start_date), get_number(end_date) + 1)]
+
+
 def get_months(start_date, end_date):
-    (start_month, start_year) = (start_date.month, start_date.year)
-    (end_month, end_year) = (end_date.month, end_date.year)
+    return get_buckets(start_date, end_date, 'month')
 
-    if start_year > end_year:
-        return []
 
-    if start_year == end_year:
-        return _get_months_of_one_year(start_year, start_month, end_month)
+def get_whole_months(start_date: datetime.date, end_date: datetime.date):
+    """ Return (first_date, last_date) of the whole months within the range
+    from start_date to end_date (inclusive). first_date > last_date if there
+    are none. """
+    first_date = start_date
+    if first_date.day != 1:
+        first_date = (first_date.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
 
-    # start_year < end_year.
-    # Add the months of start_year
-    res = _get_months_of_one_year(start_year, start_month, 12)
+    last_date = end_date
+    if (last_date + datetime.timedelta(days=1)).day != 1:
+        last_date = last_date.replace(day=1) - datetime.timedelta(days=1)
 
-    # Add all the months of any middle years
-    for year in range(start_year + 1, end_year):
-        res += _get_months_of_one_year(year, 1, 12)
+    return first_date, last_date
 
-    # Add the months of end_year
-    res += _get_months_of_one_year(end_year, 1, end_month)
 
-    return res
+def add_years(date: datetime.date, years: int) -> datetime.date:
+    """ Return the same day the given number of years later (earlier if
+    negative). February 29th becomes February 28th in a non-leap year. """
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        return date.replace(year=date.year + years, day=28)
 
 
 def format_month_and_year(month, year):
     return f'{year}-{month:02d}'
 
-
-def _get_months_of_one_year(year, start_month, end_month):
-    return [format_month_and_year(m, year) for m in range(start_month, end_month + 1)]